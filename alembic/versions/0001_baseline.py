@@ -0,0 +1,194 @@
+"""baseline schema and composite indexes for the filter queries
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+Les bases existantes ont été créées par Base.metadata.create_all : chaque table,
+colonne et index n'est créé que s'il manque, pour pouvoir appliquer cette
+révision aussi bien sur une base vide que sur une base déjà en service.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index composites choisis d'après les requêtes des routeurs
+COMPOSITE_INDEXES = [
+    # boats/filter et boats/nearby filtrent sur le propriétaire
+    ("ix_boats_owner_id", "boats", ["owner_id"]),
+    # trips/filter : organisateur puis tri keyset (price, id)
+    ("ix_trips_organizer_price", "trips", ["organizer_id", "price"]),
+    ("ix_trips_boat_id", "trips", ["boat_id"]),
+    # create_reservation et le registre des places : (trip_id, reservation_date)
+    ("ix_reservations_trip_date", "reservations", ["trip_id", "reservation_date"]),
+    # reservations/filter : réservations de l'utilisateur, tri (reservation_date, id)
+    ("ix_reservations_user_date", "reservations", ["user_id", "reservation_date"]),
+    # logs/filter : pages de l'utilisateur, tri (catch_date desc, id)
+    ("ix_logs_user_catch_date", "logs", ["user_id", "catch_date"]),
+]
+
+
+def _tables():
+    return {
+        "users": lambda: op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100)),
+            sa.Column("firstname", sa.String(100)),
+            sa.Column("email", sa.String(150), nullable=False),
+            sa.Column("password", sa.String(255), nullable=False),
+            sa.Column("phone", sa.String(20)),
+            sa.Column("picture", sa.String(255)),
+            sa.Column("boat_license", sa.BigInteger()),
+            sa.Column("insurance", sa.String(255)),
+            sa.Column("company_name", sa.String(255)),
+            sa.Column("siret", sa.String(14)),
+            sa.Column("rcs", sa.String(14)),
+            sa.Column("status", sa.Enum("INDIVIDUAL", "PROFESSIONAL", name="statusenum"), nullable=False),
+            sa.Column("role", sa.String(50), nullable=False),
+        ),
+        "boats": lambda: op.create_table(
+            "boats",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100)),
+            sa.Column("description", sa.Text()),
+            sa.Column("brand", sa.String(100)),
+            sa.Column("fabrication_year", sa.Integer()),
+            sa.Column("photo_url", sa.String(100)),
+            sa.Column("nb_passenger", sa.Integer()),
+            sa.Column("nb_seat", sa.Integer()),
+            sa.Column("port", sa.String(100)),
+            sa.Column("latitude", sa.Float()),
+            sa.Column("longitude", sa.Float()),
+            sa.Column("geohash", sa.String(12)),
+            sa.Column("motor_power", sa.Integer()),
+            sa.Column("motor", sa.Enum("DIESEL", "GASOLINE", "NOTHING", name="motorenum")),
+            sa.Column("license", sa.Enum("COASTAL", "INLAND", name="licenseenum")),
+            sa.Column(
+                "boat_type",
+                sa.Enum("OPEN", "CABIN", "CATAMARAN", "VOILER", "JETSKI", "CANOE", name="boattypeenum"),
+            ),
+            sa.Column("equipment", sa.String(255)),
+            sa.Column("caution", sa.Float()),
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id")),
+        ),
+        "trips": lambda: op.create_table(
+            "trips",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(100), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("practical_info", sa.Text()),
+            sa.Column("trip_type", sa.Enum("DAILY", "RECURRING", name="triptypeenum"), nullable=False),
+            sa.Column("pricing_type", sa.Enum("GLOBAL", "PER_PERSON", name="pricingtypeenum"), nullable=False),
+            sa.Column("dates", sa.JSON()),
+            sa.Column("schedules", sa.JSON()),
+            sa.Column("nb_passengers", sa.Integer(), nullable=False),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("organizer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("boat_id", sa.Integer(), sa.ForeignKey("boats.id"), nullable=False),
+        ),
+        "trip_dates": lambda: op.create_table(
+            "trip_dates",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("start", sa.Date(), nullable=False),
+            sa.Column("end", sa.Date(), nullable=False),
+        ),
+        "trip_schedules": lambda: op.create_table(
+            "trip_schedules",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("departure", sa.Time(), nullable=False),
+            sa.Column("arrival", sa.Time(), nullable=False),
+        ),
+        "reservations": lambda: op.create_table(
+            "reservations",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("reservation_date", sa.Date(), nullable=False),
+            sa.Column("nb_seats", sa.Integer(), nullable=False),
+            sa.Column("total_price", sa.Float(), nullable=False),
+        ),
+        "trip_seat_inventory": lambda: op.create_table(
+            "trip_seat_inventory",
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("date", sa.Date(), primary_key=True),
+            sa.Column("seats_taken", sa.Integer(), nullable=False),
+        ),
+        "logs": lambda: op.create_table(
+            "logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("fish_name", sa.String(100), nullable=False),
+            sa.Column("picture_url", sa.String(255)),
+            sa.Column("comment", sa.String(500)),
+            sa.Column("size", sa.Float()),
+            sa.Column("weight", sa.Float()),
+            sa.Column("location", sa.String(255)),
+            sa.Column("catch_date", sa.Date(), nullable=False),
+            sa.Column("released", sa.Boolean()),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        ),
+    }
+
+
+# Index posés par create_all (index=True / Index(...) des modèles) avant cette révision
+EXISTING_INDEXES = [
+    ("ix_users_id", "users", ["id"], False),
+    ("ix_users_email", "users", ["email"], True),
+    ("ix_boats_id", "boats", ["id"], False),
+    ("ix_boats_geohash", "boats", ["geohash"], False),
+    ("ix_trips_id", "trips", ["id"], False),
+    ("ix_trip_dates_trip_start_end", "trip_dates", ["trip_id", "start", "end"], False),
+    ("ix_trip_dates_start_end", "trip_dates", ["start", "end"], False),
+    ("ix_trip_schedules_trip_departure", "trip_schedules", ["trip_id", "departure"], False),
+    ("ix_trip_schedules_departure_arrival", "trip_schedules", ["departure", "arrival"], False),
+    ("ix_reservations_id", "reservations", ["id"], False),
+    ("ix_logs_id", "logs", ["id"], False),
+]
+
+
+def _inspector():
+    """None en mode --sql : le script généré cible alors une base vide."""
+    return None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+
+def _existing_indexes(inspector, table: str) -> set:
+    if inspector is None:
+        return set()
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    inspector = _inspector()
+    existing_tables = set(inspector.get_table_names()) if inspector else set()
+    for name, create in _tables().items():
+        if name not in existing_tables:
+            create()
+
+    # Colonne ajoutée après la création des premières bases
+    inspector = _inspector()
+    if inspector and "geohash" not in {column["name"] for column in inspector.get_columns("boats")}:
+        op.add_column("boats", sa.Column("geohash", sa.String(12)))
+
+    for name, table, columns, unique in EXISTING_INDEXES:
+        if name not in _existing_indexes(inspector, table):
+            op.create_index(name, table, columns, unique=unique)
+    for name, table, columns in COMPOSITE_INDEXES:
+        if name not in _existing_indexes(inspector, table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    # Seuls les index composites sont retirés : les tables préexistaient à la révision
+    for name, table, _ in reversed(COMPOSITE_INDEXES):
+        op.drop_index(name, table_name=table)
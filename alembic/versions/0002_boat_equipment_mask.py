@@ -0,0 +1,76 @@
+"""store boat equipment as a bitmask
+
+Revision ID: 0002_boat_equipment_mask
+Revises: 0001_baseline
+Create Date: 2026-10-18 14:00:00.000000
+
+La colonne texte equipment ("GPS,RADIO") est remplacée par equipment_mask, un
+entier dont chaque bit correspond à une valeur de EquipmentEnum. Le filtre
+equipment= de /v1/boats/filter devient un ET bit à bit évalué en SQL.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_boat_equipment_mask"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Figé à la date de la révision (ordre de EquipmentEnum), indépendamment du code applicatif
+EQUIPMENT_BITS = {
+    "FISHFINDER": 1,
+    "LIVEWELL": 2,
+    "LADDER": 4,
+    "GPS": 8,
+    "ROD_HOLDERS": 16,
+    "RADIO": 32,
+}
+
+
+def _boat_columns() -> set:
+    """Colonnes actuelles de boats ; en mode --sql, celles laissées par 0001."""
+    if context.is_offline_mode():
+        return {"equipment"}
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("boats")}
+
+
+def _concat(*parts: str) -> str:
+    """Concaténation SQL : || est un OU logique sous MySQL."""
+    if op.get_context().dialect.name == "mysql":
+        return f"concat({', '.join(parts)})"
+    return " || ".join(parts)
+
+
+def upgrade() -> None:
+    columns = _boat_columns()
+    if "equipment_mask" not in columns:
+        op.add_column("boats", sa.Column("equipment_mask", sa.Integer(), nullable=False, server_default="0"))
+    if "equipment" not in columns:
+        return
+
+    # Une requête par équipement : ",GPS,RADIO," contient ",GPS," (espaces ignorés)
+    padded = _concat("','", "replace(equipment, ' ', '')", "','")
+    for value, bit in EQUIPMENT_BITS.items():
+        op.execute(
+            f"UPDATE boats SET equipment_mask = equipment_mask | {bit} "
+            f"WHERE equipment IS NOT NULL AND {padded} LIKE '%,{value},%'"
+        )
+    op.drop_column("boats", "equipment")
+
+
+def downgrade() -> None:
+    op.add_column("boats", sa.Column("equipment", sa.String(255)))
+    for value, bit in EQUIPMENT_BITS.items():
+        # Les valeurs sont concaténées dans l'ordre des bits, séparées par des virgules
+        appended = _concat("equipment", f"',{value}'")
+        op.execute(
+            f"UPDATE boats SET equipment = CASE WHEN equipment IS NULL OR equipment = '' "
+            f"THEN '{value}' ELSE {appended} END "
+            f"WHERE equipment_mask & {bit} = {bit}"
+        )
+    op.drop_column("boats", "equipment_mask")
@@ -0,0 +1,46 @@
+"""version and updated_at columns for conditional GET
+
+Revision ID: 0003_resource_versions
+Revises: 0002_boat_equipment_mask
+Create Date: 2026-10-18 16:00:00.000000
+
+version sert d'ETag (incrémentée par l'ORM à chaque UPDATE, version_id_col),
+updated_at de Last-Modified. Les lignes existantes partent de la version 1,
+modifiées à la date de la migration.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_resource_versions"
+down_revision: Union[str, None] = "0002_boat_equipment_mask"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ["boats", "trips", "reservations", "logs"]
+
+
+def _columns(table: str) -> set:
+    if context.is_offline_mode():
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    for table in VERSIONED_TABLES:
+        columns = _columns(table)
+        if "version" not in columns:
+            op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        if "updated_at" not in columns:
+            op.add_column(table, sa.Column("updated_at", sa.DateTime()))
+            op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+
+def downgrade() -> None:
+    for table in reversed(VERSIONED_TABLES):
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "version")
@@ -0,0 +1,75 @@
+"""inverted index for trip full-text search
+
+Revision ID: 0004_trip_search_terms
+Revises: 0003_resource_versions
+Create Date: 2026-10-18 20:00:00.000000
+
+Table trip_terms (term, trip_id, weight) : un posting par mot et par trip, tenu à
+jour par create_trip / update_trip et lu par /v1/trips/search. Les trips existants
+sont indexés par lots ; en mode --sql, l'index reste à remplir par
+app.utils.seed.backfill_trip_search_terms.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.search import MAX_TERM_LENGTH, term_weights
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_trip_search_terms"
+down_revision: Union[str, None] = "0003_resource_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def _tables() -> set:
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _backfill(trip_terms):
+    """Indexe les trips sans postings, par lots de BATCH_SIZE dans l'ordre des id."""
+    bind = op.get_bind()
+    trips = sa.table(
+        "trips", sa.column("id"), sa.column("title"), sa.column("description"), sa.column("practical_info"),
+    )
+    indexed = sa.select(trip_terms.c.trip_id).where(trip_terms.c.trip_id == trips.c.id).exists()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(trips).where(trips.c.id > last_id, ~indexed).order_by(trips.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        postings = [
+            {"trip_id": row["id"], "term": term, "weight": weight}
+            for row in rows
+            for term, weight in term_weights(row).items()
+        ]
+        if postings:
+            bind.execute(trip_terms.insert(), postings)
+        last_id = rows[-1]["id"]
+
+
+def upgrade() -> None:
+    if "trip_terms" not in _tables():
+        op.create_table(
+            "trip_terms",
+            sa.Column("term", sa.String(MAX_TERM_LENGTH), primary_key=True),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("weight", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_trip_terms_trip_id", "trip_terms", ["trip_id"])
+    if not context.is_offline_mode():
+        _backfill(sa.table("trip_terms", sa.column("trip_id"), sa.column("term"), sa.column("weight")))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_terms_trip_id", table_name="trip_terms")
+    op.drop_table("trip_terms")
@@ -0,0 +1,135 @@
+"""species catalog referenced by fishing logs
+
+Revision ID: 0005_species_catalog
+Revises: 0004_trip_search_terms
+Create Date: 2026-10-18 22:00:00.000000
+
+Tables species (nom canonique) et species_aliases (clé normalisée -> espèce) ; logs
+référence l'espèce par species_id, indexée avec catch_date pour le filtre fish_name=.
+Le catalogue initial (app.utils.species.DEFAULT_SPECIES) est ajouté, puis chaque
+fish_name distinct des logs est rattaché à une espèce (créée si inconnue) et
+remplacé par son nom canonique. En mode --sql, ces deux étapes restent à faire par
+app.utils.seed.seed_species_catalog / backfill_log_species.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.species import DEFAULT_SPECIES, MAX_SPECIES_NAME_LENGTH, display_name, species_key
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_species_catalog"
+down_revision: Union[str, None] = "0004_trip_search_terms"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table (et non sa.table) : inserted_primary_key a besoin de connaître la clé primaire
+species = sa.Table(
+    "species", sa.MetaData(),
+    sa.Column("id", sa.Integer(), primary_key=True), sa.Column("name", sa.String()), sa.Column("scientific_name", sa.String()),
+)
+species_aliases = sa.table("species_aliases", sa.column("key"), sa.column("name"), sa.column("species_id"))
+logs = sa.table("logs", sa.column("fish_name"), sa.column("species_id"))
+
+
+def _tables() -> set:
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _log_columns() -> set:
+    if context.is_offline_mode():
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("logs")}
+
+
+def _add_species(bind, name: str, scientific_name: str = None, aliases=()) -> int:
+    species_id = bind.execute(
+        species.insert().values(name=name, scientific_name=scientific_name)
+    ).inserted_primary_key[0]
+    keys = {}
+    for alias in (name, *aliases):
+        keys.setdefault(species_key(alias), " ".join(alias.split()))
+    bind.execute(species_aliases.insert(), [
+        {"key": key, "name": alias, "species_id": species_id} for key, alias in keys.items() if key
+    ])
+    return species_id
+
+
+def _backfill():
+    bind = op.get_bind()
+    existing = set(bind.execute(sa.select(species_aliases.c.key)).scalars())
+    for name, scientific_name, aliases in DEFAULT_SPECIES:
+        keys = {species_key(alias) for alias in (name, *aliases)}
+        if not keys & existing:
+            _add_species(bind, name, scientific_name, aliases)
+            existing |= keys
+
+    fish_names = bind.execute(sa.select(logs.c.fish_name).where(logs.c.species_id.is_(None)).distinct()).scalars().all()
+    for fish_name in fish_names:
+        key = species_key(fish_name)
+        if not key:
+            continue
+        row = bind.execute(
+            sa.select(species.c.id, species.c.name)
+            .select_from(species.join(species_aliases, species_aliases.c.species_id == species.c.id))
+            .where(species_aliases.c.key == key)
+        ).first()
+        species_id, name = row if row else (None, display_name(fish_name))
+        if species_id is None:
+            species_id = _add_species(bind, name)
+        bind.execute(
+            logs.update().where(logs.c.species_id.is_(None), logs.c.fish_name == fish_name)
+            .values(species_id=species_id, fish_name=name)
+        )
+
+
+def _add_log_species_column():
+    foreign_key = sa.ForeignKey("species.id", name="fk_logs_species_id")
+    if op.get_context().dialect.name != "sqlite":
+        op.add_column("logs", sa.Column("species_id", sa.Integer(), foreign_key))
+    elif context.is_offline_mode():
+        # Sans table à recopier, la contrainte est omise (SQLite ne vérifie pas les clés étrangères par défaut)
+        op.add_column("logs", sa.Column("species_id", sa.Integer()))
+    else:
+        # SQLite n'ajoute pas de contrainte à une table existante : la table est recopiée
+        with op.batch_alter_table("logs") as batch_op:
+            batch_op.add_column(sa.Column("species_id", sa.Integer(), foreign_key))
+    op.create_index("ix_logs_species_catch_date", "logs", ["species_id", "catch_date"])
+
+
+def upgrade() -> None:
+    if "species" not in _tables():
+        op.create_table(
+            "species",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(MAX_SPECIES_NAME_LENGTH), nullable=False, unique=True),
+            sa.Column("scientific_name", sa.String(MAX_SPECIES_NAME_LENGTH)),
+        )
+        op.create_index("ix_species_id", "species", ["id"])
+        op.create_table(
+            "species_aliases",
+            sa.Column("key", sa.String(MAX_SPECIES_NAME_LENGTH), primary_key=True),
+            sa.Column("name", sa.String(MAX_SPECIES_NAME_LENGTH), nullable=False),
+            sa.Column("species_id", sa.Integer(), sa.ForeignKey("species.id", ondelete="CASCADE"), nullable=False),
+        )
+        op.create_index("ix_species_aliases_species_id", "species_aliases", ["species_id"])
+    if "species_id" not in _log_columns():
+        _add_log_species_column()
+    if not context.is_offline_mode():
+        _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_logs_species_catch_date", table_name="logs")
+    with op.batch_alter_table("logs") as batch_op:
+        batch_op.drop_constraint("fk_logs_species_id", type_="foreignkey")
+        batch_op.drop_column("species_id")
+    op.drop_index("ix_species_aliases_species_id", table_name="species_aliases")
+    op.drop_table("species_aliases")
+    op.drop_index("ix_species_id", table_name="species")
+    op.drop_table("species")
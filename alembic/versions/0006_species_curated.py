@@ -0,0 +1,47 @@
+"""curated flag on species
+
+Revision ID: 0006_species_curated
+Revises: 0005_species_catalog
+Create Date: 2026-10-19 09:00:00.000000
+
+Seules les espèces validées (catalogue initial, ajoutées ou fusionnées par un admin)
+sont proposées par l'autocomplétion ; celles ajoutées depuis un carnet restent privées.
+Les espèces du catalogue initial (app.utils.species.DEFAULT_SPECIES) sont validées.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.species import DEFAULT_SPECIES
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_species_curated"
+down_revision: Union[str, None] = "0005_species_catalog"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+species = sa.table("species", sa.column("name"), sa.column("curated", sa.Boolean()))
+
+
+def _columns() -> set:
+    if context.is_offline_mode():
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("species")}
+
+
+def upgrade() -> None:
+    if "curated" not in _columns():
+        op.add_column("species", sa.Column("curated", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.execute(
+        species.update()
+        .where(species.c.name.in_([name for name, _, _ in DEFAULT_SPECIES]))
+        .values(curated=True)
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("species") as batch_op:
+        batch_op.drop_column("curated")
@@ -0,0 +1,36 @@
+"""index on boats.equipment_mask for the equipment filter
+
+Revision ID: 0007_boat_equipment_index
+Revises: 0006_species_curated
+Create Date: 2026-10-19 10:00:00.000000
+
+Boat.has_equipment est un IN sur les masques contenant les équipements demandés,
+servi par cet index au lieu d'un parcours de la table.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_boat_equipment_index"
+down_revision: Union[str, None] = "0006_species_curated"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _indexes() -> set:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("boats")}
+
+
+def upgrade() -> None:
+    if "ix_boats_equipment_mask" not in _indexes():
+        op.create_index("ix_boats_equipment_mask", "boats", ["equipment_mask"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_boats_equipment_mask", table_name="boats")
@@ -0,0 +1,36 @@
+"""index on trip_terms (term, weight, trip_id) for the search driver
+
+Revision ID: 0008_trip_terms_weight_index
+Revises: 0007_boat_equipment_index
+Create Date: 2026-10-19 11:00:00.000000
+
+La recherche lit les postings du mot le plus rare par poids décroissant et s'arrête
+après SEARCH_MAX_CANDIDATES candidats : cet index sert cette lecture bornée.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_trip_terms_weight_index"
+down_revision: Union[str, None] = "0007_boat_equipment_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _indexes() -> set:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("trip_terms")}
+
+
+def upgrade() -> None:
+    if "ix_trip_terms_term_weight" not in _indexes():
+        op.create_index("ix_trip_terms_term_weight", "trip_terms", ["term", "weight", "trip_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_terms_term_weight", table_name="trip_terms")
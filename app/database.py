@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
 from dotenv import load_dotenv
+from app.utils.slow_queries import slow_query_log
 
 load_dotenv()
 
@@ -12,19 +14,97 @@ MYSQL_PORT = os.getenv("MYSQL_PORT", "3306")
 MYSQL_DB = os.getenv("MYSQL_DB", "fisher_fans")
 
 # DATABASE_URL =  mysql://${MYSQL_USER}:${MYSQL_PASSWORD}@${MYSQL_HOST}:${MYSQL_PORT}/${MYSQL_DB}
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
+# DATABASE_URL peut être surchargée (ex: sqlite:///./fisher_fans.db pour un lancement local)
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
+)
+
+# Drivers async correspondant aux drivers sync
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Convertit une URL SQLAlchemy sync en URL utilisant le driver async équivalent."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+# Paramètres du pool de connexions, appliqués aux moteurs sync et async
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+def pool_options(url: str) -> dict:
+    """Options de pool pour create_engine / create_async_engine selon l'URL."""
+    if ":memory:" in url:
+        # SQLite en mémoire : une seule connexion, pas de pool dimensionnable
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+# SQLite refuse par défaut le partage de connexion entre threads (threadpool de FastAPI)
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
 try:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options(DATABASE_URL))
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL))
+    # expire_on_commit=False : pas de lazy-load implicite (interdit en async) après un commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
     Base = declarative_base()
 except Exception as e:
     print(f"❌ Unable to connect to the database: {e}")
     raise
 
+# Requêtes lentes (SLOW_QUERY_*) : l'EXPLAIN des requêtes async passe par l'engine sync
+slow_query_log.install(engine)
+slow_query_log.install(async_engine.sync_engine, explain_engine=engine)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status(db_engine) -> dict:
+    """Retourne l'état courant du pool d'un moteur (sync ou async)."""
+    pool = db_engine.pool
+    size = pool.size() if hasattr(pool, "size") else 0
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    overflow = max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    # max_overflow = -1 signifie « pas de limite »
+    saturated = max_overflow >= 0 and size > 0 and checked_out >= size + max_overflow
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": overflow,
+        "max_overflow": max_overflow,
+        "saturated": saturated,
+    }
+
+def check_connection(db_engine=None):
+    """Ouvre réellement une connexion et exécute un SELECT 1."""
+    with (db_engine or engine).connect() as connection:
+        connection.execute(text("SELECT 1"))
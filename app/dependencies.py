@@ -1,10 +1,23 @@
+import os
 from fastapi import Depends, HTTPException, Header
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models.user import User
+from app.schemas.user import UserPrincipal
 from app.auth import decode_access_token  # Supposez que cette fonction décode et vérifie le token
+from app.utils.cache import TTLCache
+from app.utils.replicas import read_session_factory, read_async_session_factory
 
-def get_current_user(authorization: str = Header(...), db: Session = Depends(get_db)) -> User:
+# Cache des utilisateurs authentifiés, indexé par le sujet du token (email)
+principal_cache = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+)
+
+def get_token_subject(authorization: str) -> str:
+    """Décode le token et retourne son sujet (email)."""
     try:
         payload = decode_access_token(authorization)  # Doit retourner un dictionnaire contenant "sub" (email)
         email = payload.get("sub")
@@ -12,12 +25,57 @@ def get_current_user(authorization: str = Header(...), db: Session = Depends(get
             raise HTTPException(status_code=401, detail="Token invalid: missing email")
     except Exception:
         raise HTTPException(status_code=401, detail="Token verification failed")
-    user = db.query(User).filter(User.email == email).first()
+    return email
+
+def cache_principal(email: str, user: User) -> UserPrincipal:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    principal = UserPrincipal.model_validate(user)
+    principal_cache.set(email, principal)
+    return principal
+
+def evict_principal(email: str):
+    """À appeler quand un utilisateur est modifié ou supprimé."""
+    principal_cache.pop(email)
+
+def get_current_user(authorization: str = Header(...), db: Session = Depends(get_db)) -> UserPrincipal:
+    email = get_token_subject(authorization)
+    principal = principal_cache.get(email)
+    if principal is None:
+        user = db.query(User).filter(User.email == email).first()
+        principal = cache_principal(email, user)
+    # Les écritures de la requête sont attribuées à l'utilisateur (lecture de ses écritures, voir get_read_db)
+    db.info["user_id"] = principal.id
+    return principal
+
+async def get_current_user_async(authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)) -> UserPrincipal:
+    """Équivalent async de get_current_user pour les routeurs migrés sur AsyncSession."""
+    email = get_token_subject(authorization)
+    principal = principal_cache.get(email)
+    if principal is None:
+        result = await db.execute(select(User).filter(User.email == email))
+        principal = cache_principal(email, result.scalars().first())
+    db.info["user_id"] = principal.id
+    return principal
+
+def get_read_db(current_user: UserPrincipal = Depends(get_current_user)):
+    """
+    Session des endpoints en lecture seule : un réplica choisi en tourniquet, ou le primaire
+    si aucun réplica n'est sain ou si l'utilisateur vient d'écrire (READ_YOUR_WRITES_SECONDS).
+    """
+    db = read_session_factory(current_user.id)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_read_async_db(current_user: UserPrincipal = Depends(get_current_user_async)):
+    """Équivalent async de get_read_db."""
+    session_factory = await read_async_session_factory(current_user.id)
+    async with session_factory() as db:
+        yield db
 
-def admin_required(current_user: User = Depends(get_current_user)):
+def admin_required(current_user: UserPrincipal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin privileges required")
     return current_user
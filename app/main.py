@@ -1,10 +1,20 @@
+from contextlib import asynccontextmanager
 from typing_extensions import Annotated
-from fastapi import FastAPI
-from app.database import engine, Base
-from app.routers import users, boats, trips, reservations, logs, auth  # Ajoutez auth
+from fastapi import FastAPI, Request
+from app.database import engine, async_engine, Base
+from app.routers import users, boats, trips, reservations, logs, species, auth, health, admin  # Ajoutez auth
 from app.init_db import init_db
+from app.utils.security import shutdown_hash_executor
+from app.utils.serialization import FastJSONResponse
+from app.utils.compression import CompressionMiddleware
+from app.utils.metrics import MetricsMiddleware
+from app.utils.query_budget import QueryBudgetMiddleware
+from app.utils.rate_limit import LoadSheddingMiddleware
+from app.utils.replicas import replica_set
+from app.utils.slow_queries import slow_query_log
 import uvicorn
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.database import get_db
 from fastapi import Depends
 import sys
@@ -15,12 +25,38 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Add the current directory to the PYTHONPATH
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Libérer les ressources partagées à l'arrêt du worker
+    shutdown_hash_executor()
+    await async_engine.dispose()
+    await replica_set.dispose()
+    slow_query_log.shutdown()
+
 app = FastAPI(
     title="Fisher Fans API",
     description="API pour gérer les utilisateurs, bateaux, sorties de pêche, réservations et carnets de pêche.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson uniquement avec FAST_SERIALIZATION=true, sinon encodage JSONResponse standard
+    default_response_class=FastJSONResponse,
 )
 
+# Compression gzip des réponses JSON / CSV / NDJSON (seuil, niveau et types : variables COMPRESSION_*)
+app.add_middleware(CompressionMiddleware)
+# Budget de requêtes SQL par route (@query_budget) : avertissement, ou erreur si QUERY_BUDGET_STRICT
+app.add_middleware(QueryBudgetMiddleware)
+# Délestage (503) au-delà de MAX_CONCURRENT_REQUESTS requêtes en cours dans le worker
+app.add_middleware(LoadSheddingMiddleware)
+# En dernier (le plus externe) : Server-Timing et histogrammes couvrent toute la pile
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    # La ligne a changé de version entre la lecture et l'écriture (écriture concurrente)
+    return FastJSONResponse(status_code=409, content={"detail": "Resource was modified concurrently, retry the request"})
+
 db_dependecy = Annotated[Session, Depends(get_db)]
 # Crée les tables dans la BDD
 Base.metadata.create_all(bind=engine)
@@ -30,7 +66,10 @@ app.include_router(boats.router)
 app.include_router(trips.router)
 app.include_router(reservations.router)
 app.include_router(logs.router)
+app.include_router(species.router)
 app.include_router(auth.router)  # Ajoutez le routeur d'authentification
+app.include_router(health.router)
+app.include_router(admin.router)
 
 if __name__ == "__main__":
     get_db()
@@ -1,10 +1,51 @@
+from functools import lru_cache
 from app.models.enum import MotorEnum, LicenseEnum, BoatTypeEnum, EquipmentEnum
-from sqlalchemy import Column, Integer, String, Text, Float, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, Enum, ForeignKey, Index
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.versioning import VersionedMixin
+from app.utils.geo import encode_geohash
 from pydantic import ConfigDict
 
-class Boat(Base):
+# Bit attribué à chaque équipement : l'ordre de EquipmentEnum est persistant, n'ajouter qu'à la fin
+EQUIPMENT_BITS = {equipment.value: 1 << position for position, equipment in enumerate(EquipmentEnum)}
+ALL_EQUIPMENT = (1 << len(EquipmentEnum)) - 1
+
+def equipment_to_mask(items) -> int:
+    """Encode une liste d'équipements (ou l'ancien format "GPS,RADIO") en masque de bits."""
+    if not items:
+        return 0
+    if isinstance(items, str):
+        items = items.split(",")
+    mask = 0
+    for item in items:
+        value = item.value if isinstance(item, EquipmentEnum) else item.strip()
+        if not value:
+            continue
+        if value not in EQUIPMENT_BITS:
+            raise ValueError(f"Unknown equipment: {value}")
+        mask |= EQUIPMENT_BITS[value]
+    return mask
+
+@lru_cache(maxsize=None)
+def equipment_from_mask(mask: int) -> tuple:
+    """Décode un masque en équipements, dans l'ordre de EquipmentEnum (mis en cache par masque)."""
+    return tuple(value for value, bit in EQUIPMENT_BITS.items() if mask & bit)
+
+@lru_cache(maxsize=None)
+def equipment_supersets(mask: int) -> tuple:
+    """Masques contenant tous les bits de mask, triés (2 ** nombre d'équipements absents de mask)."""
+    free = ALL_EQUIPMENT & ~mask
+    masks = []
+    subset = free
+    while True:
+        masks.append(mask | subset)
+        if not subset:
+            return tuple(sorted(masks))
+        subset = (subset - 1) & free
+
+class Boat(VersionedMixin, Base):
     __tablename__ = "boats"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -18,35 +59,58 @@ class Boat(Base):
     port = Column(String(100))
     latitude = Column(Float)
     longitude = Column(Float)
+    geohash = Column(String(12), index=True)  # Dérivé de latitude / longitude, pour la recherche de proximité
     motor_power = Column(Integer)
     motor = Column(Enum(MotorEnum))
     license = Column(Enum(LicenseEnum))
     boat_type = Column(Enum(BoatTypeEnum))
-    equipment = Column(String(255))  # Stocké comme chaîne, converti en liste lors de la sérialisation
+    equipment_mask = Column(Integer, nullable=False, default=0, server_default="0")  # Un bit par EquipmentEnum, voir equipment
     caution = Column(Float)
 
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="boats")
     trips = relationship("Trip", back_populates="boat")
 
-    @property
-    def equipment_list(self):
-        """Convert equipment string to list, handling empty values"""
-        if not self.equipment or self.equipment.strip() == "":
-            return []
-        return [item.strip() for item in self.equipment.split(',') if item.strip()]
+    __table_args__ = (
+        Index("ix_boats_owner_id", "owner_id"),  # Filtre par défaut de /filter et /nearby
+        Index("ix_boats_equipment_mask", "equipment_mask"),  # Filtre equipment= de /filter
+    )
 
-    @equipment_list.setter
-    def equipment_list(self, value):
-        """Store list as comma-separated string, handling empty lists"""
-        if not value:
-            self.equipment = ""
+    @hybrid_property
+    def equipment(self) -> list:
+        """Liste des équipements (valeurs de EquipmentEnum), décodée du masque."""
+        return list(equipment_from_mask(self.equipment_mask or 0))
+
+    @equipment.inplace.setter
+    def _equipment_setter(self, value):
+        self.equipment_mask = equipment_to_mask(value)
+
+    @equipment.inplace.expression
+    @classmethod
+    def _equipment_expression(cls):
+        return cls.equipment_mask
+
+    @classmethod
+    def has_equipment(cls, items):
+        """
+        Condition SQL : le bateau possède tous les équipements donnés.
+
+        Plutôt qu'un ET bit à bit (non indexable), la condition énumère les masques qui
+        contiennent ces bits : un IN sur ix_boats_equipment_mask, d'au plus
+        2 ** len(EquipmentEnum) valeurs.
+        """
+        return cls.equipment_mask.in_(equipment_supersets(equipment_to_mask(items)))
+
+    def update_geohash(self):
+        """Recalcule le geohash à partir de la position, à appeler après chaque modification."""
+        if self.latitude is None or self.longitude is None:
+            self.geohash = None
         else:
-            self.equipment = ','.join(filter(None, value))
+            self.geohash = encode_geohash(self.latitude, self.longitude)
 
     def get_equipment_list(self):
         """Legacy method for compatibility"""
-        return self.equipment_list
+        return self.equipment
 
     class Config:
         model_config = ConfigDict()
\ No newline at end of file
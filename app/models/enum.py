@@ -30,6 +30,7 @@ class BoatTypeEnum(str, Enum):
     CANOE = "CANOE"
 
 class EquipmentEnum(str, Enum):
+    # Chaque valeur correspond à un bit de Boat.equipment_mask : ajouter les nouvelles à la fin
     FISHFINDER = "FISHFINDER"
     LIVEWELL = "LIVEWELL"
     LADDER = "LADDER"
@@ -1,12 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.versioning import VersionedMixin
 
-class Log(Base):
+class Log(VersionedMixin, Base):
     __tablename__ = "logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    fish_name = Column(String(100), nullable=False)
+    fish_name = Column(String(100), nullable=False)  # Nom canonique de l'espèce, recopié pour l'affichage
     picture_url = Column(String(255))
     comment = Column(String(500))
     size = Column(Float)  # en cm
@@ -15,6 +16,13 @@ class Log(Base):
     catch_date = Column(Date, nullable=False)
     released = Column(Boolean, default=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # NULL seulement sur une base non migrée ou pour un nom sans lettre ni chiffre
+    species_id = Column(Integer, ForeignKey("species.id"))
 
     # Relation avec l'utilisateur
-    user = relationship("User", back_populates="logs")
\ No newline at end of file
+    user = relationship("User", back_populates="logs")
+
+    __table_args__ = (
+        Index("ix_logs_user_catch_date", "user_id", "catch_date"),  # /filter : utilisateur, tri par date de capture
+        Index("ix_logs_species_catch_date", "species_id", "catch_date"),  # /filter : espèce, tri par date de capture
+    )
\ No newline at end of file
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, Date
-from sqlalchemy.orm import relationship
+from collections import Counter
+from sqlalchemy import Column, Integer, Float, ForeignKey, Date, Index, bindparam, event, update
+from sqlalchemy.orm import Session, relationship
 from app.database import Base
+from app.models.versioning import VersionedMixin
 from pydantic import ConfigDict
 
-class Reservation(Base):
+class Reservation(VersionedMixin, Base):
     __tablename__ = "reservations"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -17,5 +19,37 @@ class Reservation(Base):
     trip = relationship("Trip", back_populates="reservations")
     user = relationship("User", back_populates="reservations")
 
+    __table_args__ = (
+        Index("ix_reservations_trip_date", "trip_id", "reservation_date"),  # Places réservées par sortie et par jour
+        Index("ix_reservations_user_date", "user_id", "reservation_date"),  # /filter : réservations de l'utilisateur
+    )
+
     class Config:
-        model_config = ConfigDict()
\ No newline at end of file
+        model_config = ConfigDict()
+
+class TripSeatInventory(Base):
+    """Nombre de places réservées par sortie et par jour, tenu à jour avec les réservations."""
+    __tablename__ = "trip_seat_inventory"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    seats_taken = Column(Integer, nullable=False, default=0)
+
+@event.listens_for(Session, "after_flush")
+def release_reservation_seats(session, flush_context):
+    """
+    Libère les places des réservations supprimées (y compris en cascade depuis un utilisateur),
+    en une seule requête par flush quel que soit le nombre de réservations.
+    """
+    released = Counter()
+    for instance in session.deleted:
+        if isinstance(instance, Reservation):
+            released[(instance.trip_id, instance.reservation_date)] += instance.nb_seats
+    if not released:
+        return
+    session.connection().execute(
+        update(TripSeatInventory)
+        .where(TripSeatInventory.trip_id == bindparam("b_trip_id"), TripSeatInventory.date == bindparam("b_date"))
+        .values(seats_taken=TripSeatInventory.seats_taken - bindparam("b_seats")),
+        [{"b_trip_id": trip_id, "b_date": day, "b_seats": seats} for (trip_id, day), seats in released.items()],
+    )
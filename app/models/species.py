@@ -0,0 +1,107 @@
+import itertools
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, event, false, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, relationship
+from app.database import Base
+from app.utils.species import MAX_SPECIES_NAME_LENGTH, SpeciesIndex, display_name, species_key
+
+class Species(Base):
+    """Espèce du catalogue, référencée par les pages du carnet (logs.species_id)."""
+    __tablename__ = "species"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(MAX_SPECIES_NAME_LENGTH), nullable=False, unique=True)  # Nom canonique
+    scientific_name = Column(String(MAX_SPECIES_NAME_LENGTH))
+    # Ajoutée ou validée par un admin : seules ces espèces sont proposées par l'autocomplétion
+    curated = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    # Le nom canonique a aussi sa ligne : une seule lecture de clé primaire résout n'importe quel nom
+    aliases = relationship(
+        "SpeciesAlias", back_populates="species", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="SpeciesAlias.name",
+    )
+
+class SpeciesAlias(Base):
+    """Nom sous lequel une espèce peut être saisie, indexé par sa clé normalisée (voir species_key)."""
+    __tablename__ = "species_aliases"
+
+    key = Column(String(MAX_SPECIES_NAME_LENGTH), primary_key=True)
+    name = Column(String(MAX_SPECIES_NAME_LENGTH), nullable=False)
+    species_id = Column(Integer, ForeignKey("species.id", ondelete="CASCADE"), nullable=False)
+
+    species = relationship("Species", back_populates="aliases")
+
+    __table_args__ = (
+        Index("ix_species_aliases_species_id", "species_id"),
+    )
+
+def build_species(name: str, scientific_name: str = None, aliases=(), curated: bool = False) -> Species:
+    """Construit une espèce et ses lignes species_aliases (nom canonique compris, sans doublon de clé)."""
+    species = Species(name=name, scientific_name=scientific_name, curated=curated)
+    keys = set()
+    for alias in (name, *aliases):
+        key = species_key(alias)
+        if key and key not in keys:
+            keys.add(key)
+            species.aliases.append(SpeciesAlias(key=key, name=" ".join(alias.split())))
+    return species
+
+def species_id_for(name: str):
+    """Sous-requête scalaire : id de l'espèce portant ce nom ou cet alias (NULL si inconnu)."""
+    return select(SpeciesAlias.species_id).where(SpeciesAlias.key == species_key(name)).scalar_subquery()
+
+def resolve_species(db: Session, name: str) -> tuple:
+    """
+    Espèce désignée par un nom saisi librement ; ajoutée au catalogue si aucun nom ni alias ne correspond.
+
+    L'espèce ajoutée n'est pas validée (curated False) : elle n'est proposée aux autres
+    utilisateurs qu'une fois fusionnée par un admin dans une espèce du catalogue.
+
+    Args:
+    - db (Session): Session de base de données (l'ajout est fait dans un SAVEPOINT).
+    - name (str): Nom saisi, comparé sans casse, accents ni ponctuation.
+
+    Returns:
+    - tuple: (id de l'espèce, nom canonique).
+
+    Raises:
+    - ValueError: Le nom ne contient ni lettre ni chiffre.
+    """
+    key = species_key(name)
+    if not key:
+        raise ValueError(f"Invalid species name {name!r}")
+    query = select(Species.id, Species.name).join(SpeciesAlias).where(SpeciesAlias.key == key)
+    row = db.execute(query).first()
+    if row:
+        return tuple(row)
+    species = build_species(display_name(name))
+    try:
+        with db.begin_nested():
+            db.add(species)
+    except IntegrityError:
+        # Ajoutée entre-temps par une requête concurrente
+        return tuple(db.execute(query).one())
+    return species.id, species.name
+
+def load_species_index(db: Session) -> list:
+    """Entrées de l'index d'autocomplétion (espèces validées) : (clé, alias, id de l'espèce, nom canonique)."""
+    return db.execute(
+        select(SpeciesAlias.key, SpeciesAlias.name, Species.id, Species.name).join(Species).where(Species.curated)
+    ).all()
+
+# Index d'autocomplétion du worker, rechargé après chaque modification du catalogue
+species_index = SpeciesIndex(load_species_index)
+
+@event.listens_for(Session, "after_flush")
+def collect_species_changes(session, flush_context):
+    if any(isinstance(instance, (Species, SpeciesAlias)) for instance in itertools.chain(session.new, session.dirty, session.deleted)):
+        session.info["species_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def refresh_species_index(session):
+    if session.info.pop("species_changed", False):
+        species_index.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def discard_species_changes(session):
+    session.info.pop("species_changed", None)
@@ -1,11 +1,13 @@
-from datetime import date
+from datetime import date, time
 from app.models.enum import TripTypeEnum, PricingTypeEnum
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Enum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Enum, JSON, Date, Time, Index, func, select
+from sqlalchemy.orm import aliased, relationship
 from app.database import Base
+from app.models.versioning import VersionedMixin
+from app.utils.search import FIELD_WEIGHTS, MAX_TERM_LENGTH, SEARCH_MAX_CANDIDATES, term_weights
 from pydantic import BaseModel, ConfigDict
 
-class Trip(Base):
+class Trip(VersionedMixin, Base):
     __tablename__ = "trips"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -26,6 +28,142 @@ class Trip(Base):
     organizer = relationship("User", back_populates="trips")
     boat = relationship("Boat", back_populates="trips")
     reservations = relationship("Reservation", back_populates="trip")
+    # Copies indexées de dates / schedules, utilisées pour les requêtes
+    date_ranges = relationship("TripDateRange", cascade="all, delete-orphan")
+    schedule_slots = relationship("TripScheduleSlot", cascade="all, delete-orphan")
+    # Index inversé de title / description / practical_info, utilisé par /search
+    search_terms = relationship("TripTerm", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_trips_organizer_price", "organizer_id", "price"),  # /filter : organisateur, tri par prix
+        Index("ix_trips_boat_id", "boat_id"),
+    )
 
     class Config:
-        model_config = ConfigDict()
\ No newline at end of file
+        model_config = ConfigDict()
+
+class TripDateRange(Base):
+    __tablename__ = "trip_dates"
+
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    start = Column(Date, nullable=False)
+    end = Column(Date, nullable=False)
+
+    __table_args__ = (
+        Index("ix_trip_dates_trip_start_end", "trip_id", "start", "end"),
+        Index("ix_trip_dates_start_end", "start", "end"),
+    )
+
+class TripScheduleSlot(Base):
+    __tablename__ = "trip_schedules"
+
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    departure = Column(Time, nullable=False)
+    arrival = Column(Time, nullable=False)
+
+    __table_args__ = (
+        Index("ix_trip_schedules_trip_departure", "trip_id", "departure"),
+        Index("ix_trip_schedules_departure_arrival", "departure", "arrival"),
+    )
+
+class TripTerm(Base):
+    """Posting de l'index de recherche : un mot d'un trip et son poids (voir app.utils.search)."""
+    __tablename__ = "trip_terms"
+
+    # Clé (term, trip_id) : les postings d'un mot sont contigus, lus par une seule plage d'index
+    term = Column(String(MAX_TERM_LENGTH), primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    weight = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_trip_terms_trip_id", "trip_id"),
+        # Postings d'un mot par poids décroissant : lecture bornée des meilleurs candidats
+        Index("ix_trip_terms_term_weight", "term", "weight", "trip_id"),
+    )
+
+def _field(item, key):
+    """Lit un champ sur un dict (JSON) ou un objet (TripDate / TripSchedule)."""
+    return item[key] if isinstance(item, dict) else getattr(item, key)
+
+def _normalize(items, first: str, second: str) -> list:
+    """Accepte aussi l'ancien format plat des données de seed : ["2024-03-01", "2024-03-05"]."""
+    items = items or []
+    if len(items) == 2 and all(isinstance(item, str) for item in items):
+        return [{first: items[0], second: items[1]}]
+    return items
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def _as_time(value):
+    return value if isinstance(value, time) else time.fromisoformat(value)
+
+def build_date_ranges(dates, trip_id: int = None) -> list:
+    """Construit les lignes trip_dates à partir de la liste dates d'un trip."""
+    return [
+        TripDateRange(trip_id=trip_id, start=_as_date(_field(item, "start")), end=_as_date(_field(item, "end")))
+        for item in _normalize(dates, "start", "end")
+    ]
+
+def build_schedule_slots(schedules, trip_id: int = None) -> list:
+    """Construit les lignes trip_schedules à partir de la liste schedules d'un trip."""
+    return [
+        TripScheduleSlot(
+            trip_id=trip_id,
+            departure=_as_time(_field(item, "departure")),
+            arrival=_as_time(_field(item, "arrival")),
+        )
+        for item in _normalize(schedules, "departure", "arrival")
+    ]
+
+def build_search_terms(source, trip_id: int = None) -> list:
+    """Construit les lignes trip_terms d'un trip (objet ou dict portant title, description, practical_info)."""
+    fields = {
+        field: source.get(field) if isinstance(source, dict) else getattr(source, field, None)
+        for field in FIELD_WEIGHTS
+    }
+    return [TripTerm(trip_id=trip_id, term=term, weight=weight) for term, weight in term_weights(fields).items()]
+
+def term_frequencies(terms: list, cap: int = SEARCH_MAX_CANDIDATES):
+    """
+    Requête d'une ligne : nombre de trips contenant chaque mot, plafonné à cap.
+
+    Chaque compte lit au plus cap postings de la clé primaire (term, trip_id) : le mot le
+    plus rare est trouvé sans parcourir les listes des mots fréquents.
+    """
+    return select(*[
+        select(func.count()).select_from(
+            select(TripTerm.trip_id).where(TripTerm.term == term).limit(cap).subquery()
+        ).scalar_subquery().label(f"df{position}")
+        for position, term in enumerate(terms)
+    ])
+
+def search_candidates(terms: list, driver: str, conditions=(), organizer_id: int = None, cap: int = SEARCH_MAX_CANDIDATES):
+    """
+    Sous-requête (trip_id, score) des trips contenant tous les mots.
+
+    Sans organizer_id, les postings du mot driver (le plus rare) sont lus par poids
+    décroissant (ix_trip_terms_term_weight) et la limite cap borne le nombre de trips
+    classés. Avec organizer_id, les candidats sont les trips de l'organisateur (IN servi
+    par ix_trips_organizer_price, puis (term, trip_id) de la clé primaire), sans limite :
+    leur nombre est déjà celui d'un seul organisateur. Chaque autre mot est une
+    lecture de clé primaire (term, trip_id) par candidat ; conditions filtrent Trip.
+    """
+    postings = aliased(TripTerm)
+    score = postings.weight
+    query = select(postings.trip_id).join(Trip, Trip.id == postings.trip_id).where(postings.term == driver)
+    if organizer_id is not None:
+        # IN sur les trips de l'organisateur : lectures (term, trip_id) de la clé primaire
+        query = query.where(postings.trip_id.in_(select(Trip.id).where(Trip.organizer_id == organizer_id)))
+    for term in terms:
+        if term == driver:
+            continue
+        other = aliased(TripTerm)
+        query = query.join(other, (other.term == term) & (other.trip_id == postings.trip_id))
+        score = score + other.weight
+    query = query.add_columns(score.label("score")).where(*conditions)
+    if organizer_id is None:
+        query = query.order_by(postings.weight.desc(), postings.trip_id.desc()).limit(cap)
+    return query.subquery()
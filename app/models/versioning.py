@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.orm import declared_attr
+
+
+def utcnow() -> datetime:
+    """Horodatage UTC naïf, à la seconde : c'est la précision de Last-Modified."""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class VersionedMixin:
+    """
+    Version et date de dernière modification d'une ressource, utilisées pour les GET conditionnels.
+
+    version est le version_id_col du mapper : l'ORM l'incrémente à chaque UPDATE de la ligne
+    (et vérifie au passage qu'elle n'a pas été modifiée entre-temps).
+    """
+    version = Column(Integer, nullable=False, server_default="1")
+    # Renseignée côté Python (les inserts du chargeur de seed compris) ; NULL seulement sur une base non migrée
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version}
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from app.dependencies import admin_required
+from app.schemas.user import UserPrincipal
+from app.utils.slow_queries import slow_query_log
+from app.utils.query_budget import query_budget
+
+router = APIRouter(prefix="/v1/admin", tags=["Admin"])
+
+
+@router.get("/slow-queries", summary="Requêtes SQL lentes récentes")
+@query_budget(1)
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, description="Nombre maximal d'entrées renvoyées"),
+    current_user: UserPrincipal = Depends(admin_required),
+):
+    """
+    Dernières requêtes SQL ayant dépassé SLOW_QUERY_THRESHOLD_MS, de la plus récente à la plus ancienne.
+
+    Chaque entrée indique la durée, la route ayant émis la requête, la requête, ses
+    paramètres masqués et, pour un SELECT, son plan d'exécution (null tant qu'il est en cours).
+
+    Args:
+    - limit (int): Nombre maximal d'entrées renvoyées.
+    - current_user (UserPrincipal): L'administrateur connecté.
+
+    Returns:
+    - dict: Seuil courant, nombre total d'entrées enregistrées et entrées du tampon.
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "recorded": slow_query_log.recorded,
+        "entries": slow_query_log.entries(limit),
+    }
@@ -1,23 +1,36 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.auth import create_access_token  # Génère le token JWT
 from app.schemas.user import UserInscriptionReurn  # Réponse avec token
-from app.utils.security import verify_password  # importer la fonction de vérification
+from app.utils.security import verify_password_async, hash_password_async, needs_rehash  # vérification hors boucle d'événements
+from app.utils.query_budget import query_budget
+from app.utils.rate_limit import login_rate_limit
 
 router = APIRouter(prefix="/v1/login", tags=["Auth"])
 
-@router.post("/", response_model=UserInscriptionReurn, summary="Se connecter")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@router.post("/", response_model=UserInscriptionReurn, summary="Se connecter", dependencies=[Depends(login_rate_limit)])
+@query_budget(2)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Se connecter avec un email et un mot de passe.
 
     Si les informations sont correctes, une clé JWT est générée et retournée.
+    Un mot de passe haché avec un ancien coût bcrypt est re-haché au passage.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+    result = await db.execute(select(User).filter(User.email == form_data.username))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(form_data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if needs_rehash(user.password):
+        try:
+            user.password = await hash_password_async(form_data.password)
+            await db.commit()
+        except HTTPException:
+            # Pool saturé : la connexion reste valide, le re-hachage attendra la prochaine fois
+            pass
     token = create_access_token(data={"sub": user.email, "status": user.status.value})
     return {"token": token}
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import or_, and_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.models.boat import Boat
-from app.schemas.boat import BoatCreate, BoatResponse
+from app.schemas.boat import BoatCreate, BoatResponse, BoatNearbyResponse
 from app.schemas.boat import BoatUpdate
-from app.dependencies import get_current_user  # importer current_user
+from app.dependencies import get_current_user, get_read_db  # importer current_user
 from app.models.enum import RoleEnum
+from app.utils.pagination import PageParams, keyset_paginate, finalize_page
+from app.utils.geo import search_precision, neighborhood, haversine_km, KM_PER_DEGREE
+from app.utils.fields import fields_param, sparse_load, sparse_response
+from app.utils.serialization import json_response
+from app.utils.conditional import VALIDATOR_COLUMNS, is_conditional, not_modified_response, set_validators
+from app.utils.query_budget import query_budget
+from app.utils.rate_limit import write_rate_limit
 
 router = APIRouter(prefix="/v1/boats", tags=["Boats"])
-@router.post("/", response_model=dict, status_code=201)
+@router.post("/", response_model=dict, status_code=201, dependencies=[Depends(write_rate_limit)])
+@query_budget(3)
 def create_boat(boat: BoatCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     """
     Crée un bateau.
@@ -18,22 +27,23 @@ def create_boat(boat: BoatCreate, db: Session = Depends(get_db), current_user=De
     - boat (BoatCreate): Informations du bateau.
 
     Returns:
-    - dict: Message de confirmation.
+    - dict: Message de confirmation et id du bateau créé.
     """
     if not current_user.boat_license:
         raise HTTPException(status_code=403, detail="User must provide boat license to create a boat")
     boat_data = boat.dict()
-    if "equipment" in boat_data:
-        boat_data["equipment"] = ",".join(boat_data["equipment"])
     db_boat = Boat(**boat_data, owner_id=current_user.id)
+    db_boat.update_geohash()
     db.add(db_boat)
     db.commit()
     db.refresh(db_boat)
-    return {"message": "Boat created successfully"}
+    return {"message": "Boat created successfully", "id": db_boat.id}
 
 @router.get("/filter", response_model=List[BoatResponse])
+@query_budget(3)
 def filter_boats(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
     name: Optional[str] = Query(None),
     marque: Optional[str] = Query(None),
@@ -43,6 +53,9 @@ def filter_boats(
     max_latitude: Optional[float] = Query(None),
     min_longitude: Optional[float] = Query(None),
     max_longitude: Optional[float] = Query(None),
+    equipment: Optional[str] = Query(None, description="Équipements requis, séparés par des virgules (ex: GPS,FISHFINDER)"),
+    page: PageParams = Depends(),
+    fields: Optional[tuple] = Depends(fields_param(BoatResponse)),
 ):
     """
     Filtrer les bateaux.
@@ -56,9 +69,13 @@ def filter_boats(
     - max_latitude (float): Filtre sur la latitude maximale.
     - min_longitude (float): Filtre sur la longitude minimale.
     - max_longitude (float): Filtre sur la longitude maximale.
+    - equipment (str): Équipements que le bateau doit tous posséder, testés en SQL sur le masque de bits.
+    - limit (int): Taille de la page.
+    - cursor (str): Curseur de la page, renvoyé dans l'en-tête X-Next-Cursor.
+    - fields (str): Champs à renvoyer (ex: id,name,port) ; seules ces colonnes sont lues.
 
     Returns:
-    - List[BoatResponse]: Liste des bateaux filtrés.
+    - List[BoatResponse]: Liste des bateaux filtrés, triés par id.
     """
     query = db.query(Boat)
     if current_user.role != RoleEnum.ADMIN:
@@ -75,31 +92,107 @@ def filter_boats(
         query = query.filter(Boat.latitude.between(min_latitude, max_latitude))
     if all(param is not None for param in [min_longitude, max_longitude]):
         query = query.filter(Boat.longitude.between(min_longitude, max_longitude))
-    data =query.all()
-    for boat in data:
-        if boat.equipment:
-            boat.equipment = boat.equipment.split(",")
-    return data
+    if equipment:
+        try:
+            query = query.filter(Boat.has_equipment(equipment))
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+    if fields:
+        query = query.options(sparse_load(Boat, fields))
+    query = keyset_paginate(query, page, Boat.id, Boat.id)
+    data = finalize_page(query.all(), page, response, "id")
+    if fields:
+        return sparse_response(data, BoatResponse, fields, response)
+    return json_response(data, BoatResponse, response)
+
+@router.get("/nearby", response_model=List[BoatNearbyResponse])
+@query_budget(2)
+def nearby_boats(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=1000),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Rechercher les bateaux proches d'un point, du plus proche au plus éloigné.
+
+    Les candidats sont restreints par l'index geohash (cellule du point et ses 8 voisines),
+    puis classés par distance exacte (haversine).
+
+    Args:
+    - lat (float): Latitude du point de recherche.
+    - lon (float): Longitude du point de recherche.
+    - radius_km (float): Rayon de recherche en kilomètres.
+    - limit (int): Nombre maximal de bateaux retournés.
+
+    Returns:
+    - List[BoatNearbyResponse]: Bateaux dans le rayon, avec leur distance en km.
+    """
+    query = db.query(Boat)
+    if current_user.role != RoleEnum.ADMIN:
+        query = query.filter(Boat.owner_id == current_user.id)
+
+    precision = search_precision(lat, radius_km)
+    if precision:
+        # Préfixe geohash en intervalle [cellule, cellule + "{"[ pour utiliser l'index
+        query = query.filter(or_(*[
+            and_(Boat.geohash >= cell, Boat.geohash < cell + "{")
+            for cell in neighborhood(lat, lon, precision)
+        ]))
+    lat_margin = radius_km / KM_PER_DEGREE
+    query = query.filter(Boat.latitude.between(lat - lat_margin, lat + lat_margin))
+
+    boats = []
+    for boat in query.all():
+        distance = haversine_km(lat, lon, boat.latitude, boat.longitude)
+        if distance <= radius_km:
+            boat.distance_km = round(distance, 3)
+            boats.append(boat)
+    boats.sort(key=lambda boat: boat.distance_km)
+    return json_response(boats[:limit], BoatNearbyResponse)
 
 @router.get("/{id}", response_model=BoatResponse)
-def get_boat(id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+@query_budget(3)
+def get_boat(
+    id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+    fields: Optional[tuple] = Depends(fields_param(BoatResponse)),
+):
     """
     Obtenir un bateau.
 
     Args:
     - id (int): Identifiant du bateau.
+    - fields (str): Champs à renvoyer ; seules ces colonnes sont lues.
 
     Returns:
-    - BoatResponse: Bateau.
+    - BoatResponse: Bateau, avec ETag et Last-Modified ; 304 si la copie du client est à jour.
     """
-    boat = db.query(Boat).filter(Boat.id == id).first()
+    if is_conditional(request):
+        # Seule la version est lue tant que la copie du client est à jour
+        row = db.query(Boat.version, Boat.updated_at).filter(Boat.id == id).first()
+        not_modified = row and not_modified_response(request, row, fields)
+        if not_modified:
+            return not_modified
+
+    query = db.query(Boat).filter(Boat.id == id)
+    if fields:
+        query = query.options(sparse_load(Boat, fields, *VALIDATOR_COLUMNS))
+    boat = query.first()
     if not boat:
         raise HTTPException(status_code=404, detail="Boat not found")
-    if boat.equipment:
-        boat.equipment = boat.equipment.split(",")
+    set_validators(response, boat, fields)
+    if fields:
+        return sparse_response(boat, BoatResponse, fields, response)
     return boat
 
-@router.put("/{id}", response_model=BoatResponse)
+@router.put("/{id}", response_model=BoatResponse, dependencies=[Depends(write_rate_limit)])
+@query_budget(4)
 def update_boat(id: int, boat_update: BoatUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     """
     Mettre à jour un bateau.
@@ -115,19 +208,16 @@ def update_boat(id: int, boat_update: BoatUpdate, db: Session = Depends(get_db),
     if not boat:
         raise HTTPException(status_code=404, detail="Boat not found or not owned by the current user")
     update_data = boat_update.dict(exclude_unset=True)
-    if "equipment" in update_data and isInstance(update_data["equipment"], list):
-        update_data["equipment"] = ",".join(update_data["equipment"])
     for key, value in update_data.items():
         setattr(boat, key, value)
+    if "latitude" in update_data or "longitude" in update_data:
+        boat.update_geohash()
     db.commit()
     db.refresh(boat)
-    if boat.equipment:
-        boat.equipment = boat.equipment.split(",")
-    else:
-        boat.equipment = []
     return boat
 
-@router.delete("/{id}", response_model=dict)
+@router.delete("/{id}", response_model=dict, dependencies=[Depends(write_rate_limit)])
+@query_budget(4)
 def delete_boat(id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     """
     Supprimer un bateau.
@@ -0,0 +1,87 @@
+import time
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+from app.database import engine, async_engine, pool_status
+from app.dependencies import principal_cache
+from app.utils.profile_cache import profile_cache
+from app.utils.replicas import replica_set, recent_writers
+from app.utils.metrics import render_metrics
+from app.utils.rate_limit import concurrency_limiter
+from app.utils.query_budget import query_budget
+
+router = APIRouter(tags=["Health"])
+
+
+def get_pools_status():
+    """État des pools sync et async."""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine),
+    }
+
+
+@router.get("/healthz", summary="Liveness probe")
+@query_budget(0)
+async def healthz():
+    """
+    Indique que le processus répond, sans ouvrir de connexion à la base.
+
+    Returns:
+    - dict: Statut, état des pools de connexions, des réplicas, compteurs des caches et requêtes en cours.
+    """
+    return {
+        "status": "ok",
+        "pools": get_pools_status(),
+        "caches": {
+            "principal": principal_cache.stats(),
+            "profile": profile_cache.stats(),
+            "recent_writers": recent_writers.stats(),
+        },
+        "replicas": replica_set.status(),
+        "load": concurrency_limiter.status(),
+    }
+
+
+@router.get("/readyz", summary="Readiness probe")
+@query_budget(1)
+async def readyz():
+    """
+    Indique si le worker peut recevoir du trafic.
+
+    Mesure la latence d'un aller-retour SELECT 1 et répond 503 si la base est
+    injoignable ou si un pool de connexions est saturé.
+
+    Returns:
+    - dict: Statut, latence mesurée (ms) et état des pools de connexions.
+    """
+    pools = get_pools_status()
+    body = {"status": "ready", "pools": pools, "latency_ms": None}
+
+    if any(pool["saturated"] for pool in pools.values()):
+        body["status"] = "saturated"
+        return JSONResponse(status_code=503, content=body)
+
+    start = time.perf_counter()
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        body["status"] = "unavailable"
+        body["error"] = str(e)
+        return JSONResponse(status_code=503, content=body)
+    body["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return body
+
+
+@router.get("/metrics", summary="Métriques Prometheus", response_class=PlainTextResponse)
+@query_budget(0)
+async def metrics():
+    """
+    Histogrammes par route (durée, temps en base, nombre de requêtes SQL, sérialisation),
+    au format texte d'exposition Prometheus.
+
+    Returns:
+    - str: Métriques, une série par méthode et modèle de chemin.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,16 +1,36 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from app.database import get_db
 from app.models.log import Log
+from app.models.species import resolve_species, species_id_for
 from app.schemas.log import LogCreate, LogResponse, LogUpdate
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db
+from app.utils.replicas import read_session_factory
 from app.models.enum import RoleEnum
+from app.utils.pagination import PageParams, keyset_paginate, finalize_page
+from app.utils.fields import fields_param, sparse_load, sparse_response
+from app.utils.serialization import json_response
+from app.utils.conditional import VALIDATOR_COLUMNS, is_conditional, not_modified_response, set_validators
+from app.utils.export import ExportFormatEnum, MEDIA_TYPES, export_headers, stream_rows
+from app.utils.query_budget import query_budget
+from app.utils.rate_limit import write_rate_limit
 
 router = APIRouter(prefix="/v1/logs", tags=["Logs"])
 not_found_error_log = "Log not found"
-@router.post("/", response_model=LogResponse, summary="Créer une nouvelle page du carnet de pêche")
+
+def assign_species(db: Session, values: dict):
+    """Rattache fish_name à une espèce du catalogue (ajoutée si inconnue) et le remplace par son nom canonique."""
+    try:
+        values["species_id"], values["fish_name"] = resolve_species(db, values["fish_name"])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid fish name")
+
+@router.post("/", response_model=LogResponse, summary="Créer une nouvelle page du carnet de pêche", dependencies=[Depends(write_rate_limit)])
+@query_budget(8)
 def create_log(log: LogCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
     """Créer une nouvelle page du carnet de pêche
 
@@ -18,10 +38,12 @@ def create_log(log: LogCreate, db: Session = Depends(get_db), current_user = Dep
     - log (LogCreate): données de la page à créer
 
     Returns:
-    - LogResponse: La page créée
+    - LogResponse: La page créée, fish_name remplacé par le nom canonique de l'espèce
     """
 
-    db_log = Log(**log.dict(), user_id=current_user.id)
+    values = log.dict()
+    assign_species(db, values)
+    db_log = Log(**values, user_id=current_user.id)
     
     try:
         db.add(db_log)
@@ -33,71 +55,152 @@ def create_log(log: LogCreate, db: Session = Depends(get_db), current_user = Dep
     
     return db_log
 
+class LogFilters:
+    """Filtres communs à /filter et /export."""
+
+    def __init__(
+        self,
+        user_id: Optional[int] = Query(None, description="ID de l'utilisateur"),
+        fish_name: Optional[str] = Query(None, description="Nom ou alias de l'espèce"),
+        species_id: Optional[int] = Query(None, description="ID de l'espèce"),
+        min_size: Optional[float] = Query(None, description="Taille minimale"),
+        min_weight: Optional[float] = Query(None, description="Poids minimal"),
+        location: Optional[str] = Query(None, description="Lieu de pêche"),
+        start_date: Optional[date] = Query(None, description="Date de début"),
+        end_date: Optional[date] = Query(None, description="Date de fin"),
+        released: Optional[bool] = Query(None, description="Vrai si le poisson a été relâché"),
+    ):
+        self.user_id = user_id
+        self.fish_name = fish_name
+        self.species_id = species_id
+        self.min_size = min_size
+        self.min_weight = min_weight
+        self.location = location
+        self.start_date = start_date
+        self.end_date = end_date
+        self.released = released
+
+    def apply(self, query, current_user):
+        """Applique les filtres à une Query ou un Select sur Log."""
+        # Si non admin, ne montrer que ses propres logs
+        if current_user.role != RoleEnum.ADMIN:
+            query = query.filter(Log.user_id == current_user.id)
+        elif self.user_id:
+            query = query.filter(Log.user_id == self.user_id)
+
+        # Égalité sur l'espèce (index ix_logs_species_catch_date) : "bar", "Loup" et "loup de mer" trouvent les mêmes pages
+        if self.fish_name:
+            query = query.filter(Log.species_id == species_id_for(self.fish_name))
+        if self.species_id:
+            query = query.filter(Log.species_id == self.species_id)
+        if self.min_size:
+            query = query.filter(Log.size >= self.min_size)
+        if self.min_weight:
+            query = query.filter(Log.weight >= self.min_weight)
+        if self.location:
+            query = query.filter(Log.location.ilike(f"%{self.location}%"))
+        if self.start_date:
+            query = query.filter(Log.catch_date >= self.start_date)
+        if self.end_date:
+            query = query.filter(Log.catch_date <= self.end_date)
+        if self.released is not None:
+            query = query.filter(Log.released == self.released)
+        return query
+
 @router.get("/filter", response_model=List[LogResponse], summary="Filtrer les pages du carnet de pêche")
+@query_budget(2)
 def filter_logs(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_user),
-    user_id: Optional[int] = Query(None, description="ID de l'utilisateur"),
-    fish_name: Optional[str] = Query(None, description="Nom du poisson"),
-    min_size: Optional[float] = Query(None, description="Taille minimale"),
-    min_weight: Optional[float] = Query(None, description="Poids minimal"),
-    location: Optional[str] = Query(None, description="Lieu de pêche"),
-    start_date: Optional[date] = Query(None, description="Date de début"),
-    end_date: Optional[date] = Query(None, description="Date de fin"),
-    released: Optional[bool] = Query(None, description="Vrai si le poisson a été relâché")
+    filters: LogFilters = Depends(),
+    page: PageParams = Depends(),
+    fields: Optional[tuple] = Depends(fields_param(LogResponse)),
 ):
     """Filtrer les pages du carnet de pêche
 
     Args:
     - user_id (int): ID de l'utilisateur
-    - fish_name (str): Nom du poisson
+    - fish_name (str): Nom ou alias de l'espèce (sans casse ni accents)
+    - species_id (int): ID de l'espèce
     - min_size (float): Taille minimale
     - min_weight (float): Poids minimal
     - location (str): Lieu de pêche
     - start_date (date): Date de début
     - end_date (date): Date de fin
     - released (bool): Vrai si le poisson a été relâché
+    - limit (int): Taille de la page
+    - cursor (str): Curseur de la page, renvoyé dans l'en-tête X-Next-Cursor
+    - fields (str): Champs à renvoyer (ex: id,fish_name,catch_date) ; seules ces colonnes sont lues
 
     Returns:
-    - List[LogResponse]: La liste des pages filtrées
+    - List[LogResponse]: La liste des pages filtrées, de la prise la plus récente à la plus ancienne
     """
-    query = db.query(Log)
-
-    # Si non admin, ne montrer que ses propres logs
-    if current_user.role != RoleEnum.ADMIN:
-        query = query.filter(Log.user_id == current_user.id)
-    elif user_id:
-        query = query.filter(Log.user_id == user_id)
-
-    if fish_name:
-        query = query.filter(Log.fish_name.ilike(f"%{fish_name}%"))
-    if min_size:
-        query = query.filter(Log.size >= min_size)
-    if min_weight:
-        query = query.filter(Log.weight >= min_weight)
-    if location:
-        query = query.filter(Log.location.ilike(f"%{location}%"))
-    if start_date:
-        query = query.filter(Log.catch_date >= start_date)
-    if end_date:
-        query = query.filter(Log.catch_date <= end_date)
-    if released is not None:
-        query = query.filter(Log.released == released)
-
-    return query.all()
+    query = filters.apply(db.query(Log), current_user)
+    if fields:
+        # catch_date sert au curseur de la page suivante
+        query = query.options(sparse_load(Log, fields, "catch_date"))
+    query = keyset_paginate(query, page, Log.catch_date, Log.id, descending=True)
+    data = finalize_page(query.all(), page, response, "catch_date")
+    if fields:
+        return sparse_response(data, LogResponse, fields, response)
+    return json_response(data, LogResponse, response)
+
+@router.get("/export", summary="Exporter les pages du carnet de pêche")
+@query_budget(2)
+def export_logs(
+    current_user = Depends(get_current_user),
+    filters: LogFilters = Depends(),
+    format: ExportFormatEnum = Query(ExportFormatEnum.NDJSON, description="Format d'export (ndjson ou csv)"),
+):
+    """Exporter les pages du carnet de pêche en flux, sans les charger toutes en mémoire
+
+    Accepte les mêmes filtres que /filter. Les lignes sont lues par lots côté serveur.
+
+    Args:
+    - format (ExportFormatEnum): ndjson ou csv
+
+    Returns:
+    - StreamingResponse: Les pages filtrées, triées par id
+    """
+    query = filters.apply(select(Log), current_user).order_by(Log.id)
+    return StreamingResponse(
+        stream_rows(read_session_factory(current_user.id), query, LogResponse, format),
+        media_type=MEDIA_TYPES[format],
+        headers=export_headers("logs", format),
+    )
 
 @router.get("/{id}", response_model=LogResponse, summary="Obtenir une page spécifique du carnet de pêche")
-def get_log(id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+@query_budget(3)
+def get_log(
+    id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+    fields: Optional[tuple] = Depends(fields_param(LogResponse)),
+):
     """Obtenir une page spécifique du carnet de pêche
 
     Args:
     - id (int): ID de la page
+    - fields (str): Champs à renvoyer ; seules ces colonnes sont lues
 
     Returns:
-    - LogResponse: La page demandée
+    - LogResponse: La page demandée, avec ETag et Last-Modified ; 304 si la copie du client est à jour
     """
+    if is_conditional(request):
+        # Seule la version est lue tant que la copie du client est à jour (droits d'accès vérifiés)
+        row = db.query(Log.version, Log.updated_at, Log.user_id).filter(Log.id == id).first()
+        if row and (row.user_id == current_user.id or current_user.role == RoleEnum.ADMIN):
+            not_modified = not_modified_response(request, row, fields)
+            if not_modified:
+                return not_modified
 
-    log = db.query(Log).filter(Log.id == id).first()
+    query = db.query(Log).filter(Log.id == id)
+    if fields:
+        query = query.options(sparse_load(Log, fields, "user_id", *VALIDATOR_COLUMNS))
+    log = query.first()
     if not log:
         raise HTTPException(status_code=404, detail=not_found_error_log)
     
@@ -105,9 +208,13 @@ def get_log(id: int, db: Session = Depends(get_db), current_user = Depends(get_c
     if log.user_id != current_user.id and current_user.role != RoleEnum.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to view this log")
     
+    set_validators(response, log, fields)
+    if fields:
+        return sparse_response(log, LogResponse, fields, response)
     return log
 
-@router.put("/{id}", response_model=LogResponse, summary="Modifier une page du carnet de pêche")
+@router.put("/{id}", response_model=LogResponse, summary="Modifier une page du carnet de pêche", dependencies=[Depends(write_rate_limit)])
+@query_budget(9)
 def update_log(
     id: int,
     log_update: LogUpdate,
@@ -133,7 +240,10 @@ def update_log(
         raise HTTPException(status_code=403, detail="Not authorized to modify this log")
 
     # Mettre à jour les champs
-    for key, value in log_update.dict(exclude_unset=True).items():
+    values = log_update.dict(exclude_unset=True)
+    if values.get("fish_name") is not None:
+        assign_species(db, values)
+    for key, value in values.items():
         setattr(log, key, value)
 
     try:
@@ -145,7 +255,8 @@ def update_log(
 
     return log
 
-@router.delete("/{id}", summary="Supprimer une page du carnet de pêche")
+@router.delete("/{id}", summary="Supprimer une page du carnet de pêche", dependencies=[Depends(write_rate_limit)])
+@query_budget(3)
 def delete_log(id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
     """Supprimer une page du carnet de pêche
 
@@ -1,13 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
-from app.database import get_db
+from app.database import get_async_db
 from app.models.reservation import Reservation
-from app.models.trip import Trip
+from app.models.trip import Trip, TripDateRange
 from app.schemas.reservation import ReservationCreate, ReservationResponse, ReservationUpdate
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user_async, get_read_async_db
+from app.utils.replicas import read_async_session_factory
 from app.models.enum import RoleEnum
+from app.utils.pagination import PageParams, keyset_paginate, finalize_page
+from app.utils.fields import fields_param, sparse_load, sparse_response
+from app.utils.serialization import json_response
+from app.utils.conditional import VALIDATOR_COLUMNS, is_conditional, not_modified_response, set_validators
+from app.utils.export import ExportFormatEnum, MEDIA_TYPES, export_headers, stream_rows_async
+from app.utils.inventory import get_seats_taken, reserve_seats, release_seats
+from app.utils.query_budget import query_budget
+from app.utils.rate_limit import write_rate_limit
 
 router = APIRouter(prefix="/v1/reservations", tags=["Reservations"])
 not_found_error_resa = "Reservation not found"
@@ -15,52 +26,68 @@ not_found_error_resa = "Reservation not found"
 Endpoints for managing reservations
 """
 
-@router.post("/", response_model=ReservationResponse, summary="Create a new reservation")
-def create_reservation(reservation: ReservationCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def is_within_trip_dates(trip_id: int, day: date, db: AsyncSession) -> bool:
+    """Vérifie via l'index trip_dates que le jour tombe dans une des plages du trip."""
+    result = await db.execute(
+        select(TripDateRange.id).filter(
+            TripDateRange.trip_id == trip_id,
+            TripDateRange.start <= day,
+            TripDateRange.end >= day,
+        ).limit(1)
+    )
+    return result.first() is not None
+
+def not_enough_seats(capacity: int, seats_taken: int) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"Not enough seats available. Only {capacity - seats_taken} seats left"
+    )
+
+@router.post("/", response_model=ReservationResponse, summary="Create a new reservation", dependencies=[Depends(write_rate_limit)])
+@query_budget(9)
+async def create_reservation(reservation: ReservationCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
     """
     Create a new reservation
 
     Args:
         reservation (ReservationCreate): The reservation data
-        db (Session, optional): The database session. Defaults to Depends(get_db).
-        current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+        db (AsyncSession, optional): The database session. Defaults to Depends(get_async_db).
+        current_user (User, optional): The current user. Defaults to Depends(get_current_user_async).
 
     Returns:
         ReservationResponse: The created reservation
     """
     # Vérifier que la sortie existe
-    trip = db.query(Trip).filter(Trip.id == reservation.trip_id).first()
+    result = await db.execute(select(Trip).filter(Trip.id == reservation.trip_id))
+    trip = result.scalars().first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    # Calculer le nombre total de places déjà réservées
-    total_reserved = sum(r.nb_seats for r in db.query(Reservation).filter(
-        Reservation.trip_id == reservation.trip_id,
-        Reservation.reservation_date == reservation.reservation_date
-    ).all())
+    # Places déjà réservées ce jour-là : une seule ligne du registre
+    total_reserved = await get_seats_taken(db, reservation.trip_id, reservation.reservation_date)
 
     # Vérifier s'il reste assez de places
     if total_reserved + reservation.nb_seats > trip.nb_passengers:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Not enough seats available. Only {trip.nb_passengers - total_reserved} seats left"
-        )
+        raise not_enough_seats(trip.nb_passengers, total_reserved)
 
     # Vérifier si la date de réservation est dans le futur
     if reservation.reservation_date < date.today():
         raise HTTPException(status_code=400, detail="Reservation date must be in the future")
 
     # Vérifier si la date de réservation correspond à une des dates du trip
-    valid_dates = any(
-        date.fromisoformat(trip_date["start"]) <= reservation.reservation_date <= date.fromisoformat(trip_date["end"])
-        for trip_date in trip.dates
-    )
-    if not valid_dates:
+    if not await is_within_trip_dates(trip.id, reservation.reservation_date, db):
         raise HTTPException(
             status_code=400, 
             detail="Reservation date must be within one of the trip's date ranges"
         )
-    
+
+    # Prendre les places atomiquement, dans la même transaction que l'insertion :
+    # échoue si une réservation concurrente a pris les dernières places entre-temps
+    capacity = trip.nb_passengers
+    if not await reserve_seats(db, trip.id, reservation.reservation_date, reservation.nb_seats, capacity):
+        await db.rollback()
+        raise not_enough_seats(capacity, await get_seats_taken(db, reservation.trip_id, reservation.reservation_date))
+
     db_reservation = Reservation(
         **reservation.dict(),
         user_id=current_user.id
@@ -68,75 +95,135 @@ def create_reservation(reservation: ReservationCreate, db: Session = Depends(get
     
     try:
         db.add(db_reservation)
-        db.commit()
-        db.refresh(db_reservation)
+        await db.commit()
+        await db.refresh(db_reservation)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     return db_reservation
 
+class ReservationFilters:
+    """Filters shared by /filter and /export."""
+
+    def __init__(
+        self,
+        trip_id: Optional[int] = Query(None),
+        user_id: Optional[int] = Query(None),
+        min_date: Optional[date] = Query(None),
+        max_date: Optional[date] = Query(None),
+        min_seats: Optional[int] = Query(None),
+        max_seats: Optional[int] = Query(None),
+        min_price: Optional[float] = Query(None),
+        max_price: Optional[float] = Query(None),
+    ):
+        self.trip_id = trip_id
+        self.user_id = user_id
+        self.min_date = min_date
+        self.max_date = max_date
+        self.min_seats = min_seats
+        self.max_seats = max_seats
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def apply(self, query, current_user):
+        """Apply the filters to a Select on Reservation."""
+        # Filtrer par défaut sur l'utilisateur courant sauf si admin
+        if current_user.role != RoleEnum.ADMIN:
+            # Sous-requête plutôt qu'une jointure : chaque branche du OR reste servie par un index
+            organized_trips = select(Trip.id).filter(Trip.organizer_id == current_user.id)
+            query = query.filter(
+                (Reservation.user_id == current_user.id) |
+                Reservation.trip_id.in_(organized_trips)
+            )
+        elif self.user_id:
+            query = query.filter(Reservation.user_id == self.user_id)
+
+        if self.trip_id:
+            query = query.filter(Reservation.trip_id == self.trip_id)
+        if self.min_date:
+            query = query.filter(Reservation.reservation_date >= self.min_date)
+        if self.max_date:
+            query = query.filter(Reservation.reservation_date <= self.max_date)
+        if self.min_seats:
+            query = query.filter(Reservation.nb_seats >= self.min_seats)
+        if self.max_seats:
+            query = query.filter(Reservation.nb_seats <= self.max_seats)
+        if self.min_price:
+            query = query.filter(Reservation.total_price >= self.min_price)
+        if self.max_price:
+            query = query.filter(Reservation.total_price <= self.max_price)
+        return query
+
 @router.get("/filter", response_model=List[ReservationResponse], summary="Filter reservations")
-def filter_reservations(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
-    trip_id: Optional[int] = Query(None),
-    user_id: Optional[int] = Query(None),
-    min_date: Optional[date] = Query(None),
-    max_date: Optional[date] = Query(None),
-    min_seats: Optional[int] = Query(None),
-    max_seats: Optional[int] = Query(None),
-    min_price: Optional[float] = Query(None),
-    max_price: Optional[float] = Query(None)
+@query_budget(2)
+async def filter_reservations(
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current_user = Depends(get_current_user_async),
+    filters: ReservationFilters = Depends(),
+    page: PageParams = Depends(),
+    fields: Optional[tuple] = Depends(fields_param(ReservationResponse)),
 ):
     """
     Filter reservations
 
     Args:
-        db (Session, optional): The database session. Defaults to Depends(get_db).
-        current_user (User, optional): The current user. Defaults to Depends(get_current_user).
-        trip_id (Optional[int], optional): Filter by trip id. Defaults to None.
-        user_id (Optional[int], optional): Filter by user id. Defaults to None.
-        min_date (Optional[date], optional): Filter by minimum date. Defaults to None.
-        max_date (Optional[date], optional): Filter by maximum date. Defaults to None.
-        min_seats (Optional[int], optional): Filter by minimum seats. Defaults to None.
-        max_seats (Optional[int], optional): Filter by maximum seats. Defaults to None.
-        min_price (Optional[float], optional): Filter by minimum price. Defaults to None.
-        max_price (Optional[float], optional): Filter by maximum price. Defaults to None.
+        db (AsyncSession, optional): Read session (replica or primary). Defaults to Depends(get_read_async_db).
+        current_user (User, optional): The current user. Defaults to Depends(get_current_user_async).
+        filters (ReservationFilters): trip_id, user_id, min_date, max_date, min_seats, max_seats, min_price, max_price.
+        page (PageParams): Page size (limit) and cursor returned in the X-Next-Cursor header.
+        fields (tuple, optional): Fields to return; only these columns are read.
 
     Returns:
-        List[ReservationResponse]: The filtered reservations
+        List[ReservationResponse]: The filtered reservations, ordered by reservation date then id
+    """
+    query = filters.apply(select(Reservation), current_user)
+    if fields:
+        # reservation_date sert au curseur de la page suivante
+        query = query.options(sparse_load(Reservation, fields, "reservation_date"))
+    query = keyset_paginate(query, page, Reservation.reservation_date, Reservation.id)
+    result = await db.execute(query)
+    data = finalize_page(result.scalars().all(), page, response, "reservation_date")
+    if fields:
+        return sparse_response(data, ReservationResponse, fields, response)
+    return json_response(data, ReservationResponse, response)
+
+@router.get("/export", summary="Export reservations")
+@query_budget(2)
+async def export_reservations(
+    current_user = Depends(get_current_user_async),
+    filters: ReservationFilters = Depends(),
+    format: ExportFormatEnum = Query(ExportFormatEnum.NDJSON),
+):
     """
-    query = db.query(Reservation)
+    Stream the filtered reservations as NDJSON or CSV
 
-    # Filtrer par défaut sur l'utilisateur courant sauf si admin
-    if current_user.role != RoleEnum.ADMIN:
-        query = query.join(Trip).filter(
-            (Reservation.user_id == current_user.id) | 
-            (Trip.organizer_id == current_user.id)
-        )
-    elif user_id:
-        query = query.filter(Reservation.user_id == user_id)
-
-    if trip_id:
-        query = query.filter(Reservation.trip_id == trip_id)
-    if min_seats:
-        query = query.filter(Reservation.nb_seats >= min_seats)
-    if max_seats:
-        query = query.filter(Reservation.nb_seats <= max_seats)
-    if min_price:
-        query = query.filter(Reservation.total_price >= min_price)
-    if max_price:
-        query = query.filter(Reservation.total_price <= max_price)
-
-    return query.all()
-
-@router.put("/{id}", response_model=ReservationResponse, summary="Update a reservation")
-def update_reservation(
+    Rows are read server-side in batches, so memory stays constant whatever the row count.
+
+    Args:
+        current_user (User, optional): The current user. Defaults to Depends(get_current_user_async).
+        filters (ReservationFilters): Same filters as /filter.
+        format (ExportFormatEnum): ndjson or csv. Defaults to ndjson.
+
+    Returns:
+        StreamingResponse: The filtered reservations, ordered by id
+    """
+    query = filters.apply(select(Reservation), current_user).order_by(Reservation.id)
+    session_factory = await read_async_session_factory(current_user.id)
+    return StreamingResponse(
+        stream_rows_async(session_factory, query, ReservationResponse, format),
+        media_type=MEDIA_TYPES[format],
+        headers=export_headers("reservations", format),
+    )
+
+@router.put("/{id}", response_model=ReservationResponse, summary="Update a reservation", dependencies=[Depends(write_rate_limit)])
+@query_budget(10)
+async def update_reservation(
     id: int,
     reservation_update: ReservationUpdate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """
     Update a reservation
@@ -144,13 +231,14 @@ def update_reservation(
     Args:
         id (int): The reservation id
         reservation_update (ReservationUpdate): The updated reservation data
-        db (Session, optional): The database session. Defaults to Depends(get_db).
-        current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+        db (AsyncSession, optional): The database session. Defaults to Depends(get_async_db).
+        current_user (User, optional): The current user. Defaults to Depends(get_current_user_async).
 
     Returns:
         ReservationResponse: The updated reservation
     """
-    db_reservation = db.query(Reservation).filter(Reservation.id == id).first()
+    result = await db.execute(select(Reservation).filter(Reservation.id == id))
+    db_reservation = result.scalars().first()
     if not db_reservation:
         raise HTTPException(status_code=404, detail=not_found_error_resa)
 
@@ -158,65 +246,66 @@ def update_reservation(
     if db_reservation.user_id != current_user.id and current_user.role != RoleEnum.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to modify this reservation")
 
-    if reservation_update.nb_seats:
-        # Recalculer le nombre de places disponibles
-        trip = db.query(Trip).filter(Trip.id == db_reservation.trip_id).first()
-        total_reserved = sum(r.nb_seats for r in db.query(Reservation).filter(
-            Reservation.trip_id == db_reservation.trip_id,
-            Reservation.id != id
-        ).all())
-
-        if total_reserved + reservation_update.nb_seats > trip.nb_passengers:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Not enough seats available. Only {trip.nb_passengers - total_reserved} seats left"
-            )
     if reservation_update.reservation_date:
         # Vérifier si la date de réservation est dans le futur
         if reservation_update.reservation_date < date.today():
             raise HTTPException(status_code=400, detail="Reservation date must be in the future")
 
         # Vérifier si la date de réservation correspond à une des dates du trip
-        trip = db.query(Trip).filter(Trip.id == db_reservation.trip_id).first()
-        valid_dates = any(
-            date.fromisoformat(trip_date["start"]) <= reservation_update.reservation_date <= date.fromisoformat(trip_date["end"])
-            for trip_date in trip.dates
-        )
-        if not valid_dates:
+        if not await is_within_trip_dates(db_reservation.trip_id, reservation_update.reservation_date, db):
             raise HTTPException(
                 status_code=400, 
                 detail="Reservation date must be within one of the trip's date ranges"
             )
+
+    trip_id = db_reservation.trip_id
+    old_date, old_seats = db_reservation.reservation_date, db_reservation.nb_seats
+    new_date = reservation_update.reservation_date or old_date
+    new_seats = reservation_update.nb_seats or old_seats
+    if (new_date, new_seats) != (old_date, old_seats):
+        # Déplacer les places dans le registre, dans la même transaction que la mise à jour
+        result = await db.execute(select(Trip.nb_passengers).filter(Trip.id == trip_id))
+        capacity = result.scalar()
+        await release_seats(db, trip_id, old_date, old_seats)
+        if not await reserve_seats(db, trip_id, new_date, new_seats, capacity):
+            await db.rollback()
+            seats_taken = await get_seats_taken(db, trip_id, new_date)
+            if new_date == old_date:
+                seats_taken -= old_seats
+            raise not_enough_seats(capacity, seats_taken)
+
     for key, value in reservation_update.dict(exclude_unset=True).items():
         setattr(db_reservation, key, value)
 
     try:
-        db.commit()
-        db.refresh(db_reservation)
+        await db.commit()
+        await db.refresh(db_reservation)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     return db_reservation
 
-@router.delete("/{id}", summary="Delete a reservation")
-def delete_reservation(
+@router.delete("/{id}", summary="Delete a reservation", dependencies=[Depends(write_rate_limit)])
+@query_budget(4)
+async def delete_reservation(
     id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """
     Delete a reservation
 
     Args:
         id (int): The reservation id
-        db (Session, optional): The database session. Defaults to Depends(get_db).
-        current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+        db (AsyncSession, optional): The database session. Defaults to Depends(get_async_db).
+        current_user (User, optional): The current user. Defaults to Depends(get_current_user_async).
 
     Returns:
         [type]: [description]
     """
-    db_reservation = db.query(Reservation).filter(Reservation.id == id).first()
+    result = await db.execute(select(Reservation).filter(Reservation.id == id))
+    db_reservation = result.scalars().first()
     if not db_reservation:
         raise HTTPException(status_code=404, detail=not_found_error_resa)
 
@@ -225,31 +314,61 @@ def delete_reservation(
         raise HTTPException(status_code=403, detail="Not authorized to delete this reservation")
 
     try:
-        db.delete(db_reservation)
-        db.commit()
+        await db.delete(db_reservation)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     return {"message": "Reservation successfully deleted"}
 
 @router.get("/{id}", response_model=ReservationResponse, summary="Get a reservation")
-def get_reservation(id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+@query_budget(4)
+async def get_reservation(
+    id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current_user = Depends(get_current_user_async),
+    fields: Optional[tuple] = Depends(fields_param(ReservationResponse)),
+):
     """
     Get a reservation
 
     Args:
         id (int): The reservation id
-        db (Session, optional): The database session. Defaults to Depends(get_db).
-        current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+        db (AsyncSession, optional): Read session (replica or primary). Defaults to Depends(get_read_async_db).
+        current_user (User, optional): The current user. Defaults to Depends(get_current_user_async).
+        fields (tuple, optional): Fields to return; only these columns are read.
 
     Returns:
-        ReservationResponse: The reservation
+        ReservationResponse: The reservation, with ETag and Last-Modified; 304 when the client's copy is current
     """
-    db_reservation = db.query(Reservation).filter(Reservation.id == id).first()
+    if is_conditional(request):
+        # Only the version is read while the client's copy is current (the trip must still exist)
+        result = await db.execute(
+            select(Reservation.version, Reservation.updated_at)
+            .join(Trip, Trip.id == Reservation.trip_id)
+            .filter(Reservation.id == id)
+        )
+        row = result.first()
+        not_modified = row and not_modified_response(request, row, fields)
+        if not_modified:
+            return not_modified
+
+    query = select(Reservation).filter(Reservation.id == id)
+    if fields:
+        query = query.options(sparse_load(Reservation, fields, "trip_id", *VALIDATOR_COLUMNS))
+    result = await db.execute(query)
+    db_reservation = result.scalars().first()
     if not db_reservation:
         raise HTTPException(status_code=404, detail=not_found_error_resa)
 
-    trip = db.query(Trip).filter(Trip.id == db_reservation.trip_id).first()
-    if not trip:
-        raise HTTPException(status_code=404, detail="Trip not found")
\ No newline at end of file
+    result = await db.execute(select(Trip.id).filter(Trip.id == db_reservation.trip_id))
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    set_validators(response, db_reservation, fields)
+    if fields:
+        return sparse_response(db_reservation, ReservationResponse, fields, response)
+    return db_reservation
\ No newline at end of file
@@ -0,0 +1,145 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, selectinload
+from typing import List
+from app.database import get_db
+from app.dependencies import admin_required, get_current_user
+from app.models.enum import RoleEnum
+from app.models.log import Log
+from app.models.species import Species, SpeciesAlias, build_species, species_index
+from app.models.versioning import utcnow
+from app.schemas.species import SpeciesAliasCreate, SpeciesCreate, SpeciesResponse, SpeciesSuggestion
+from app.utils.profile_cache import evict_profile
+from app.utils.query_budget import query_budget
+from app.utils.species import species_key
+
+router = APIRouter(prefix="/v1/species", tags=["Species"])
+not_found_error_species = "Species not found"
+
+def get_species_or_404(db: Session, id: int) -> Species:
+    species = db.query(Species).options(selectinload(Species.aliases)).filter(Species.id == id).first()
+    if not species:
+        raise HTTPException(status_code=404, detail=not_found_error_species)
+    return species
+
+@router.get("/autocomplete", response_model=List[SpeciesSuggestion], summary="Autocomplétion des noms d'espèces")
+@query_budget(2)
+def autocomplete_species(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Début d'un mot du nom ou d'un alias"),
+    limit: int = Query(10, ge=1, le=50, description="Nombre maximal de suggestions"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    """Autocomplétion des noms d'espèces, servie par l'index en mémoire du worker
+
+    L'index est relu en base après une modification du catalogue, ou au plus tard après
+    SPECIES_INDEX_TTL secondes pour les modifications faites par un autre worker.
+
+    Args:
+    - prefix (str): Début d'un mot du nom canonique ou d'un alias (sans casse ni accents, ex: "loup", "rou")
+    - limit (int): Nombre maximal de suggestions
+
+    Returns:
+    - List[SpeciesSuggestion]: Une suggestion par espèce, dans l'ordre alphabétique
+    """
+    species_index.refresh(db)
+    return species_index.complete(prefix, limit)
+
+@router.get("/{id}", response_model=SpeciesResponse, summary="Obtenir une espèce et ses alias")
+@query_budget(3)
+def get_species(id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Obtenir une espèce et ses alias
+
+    Args:
+    - id (int): ID de l'espèce
+
+    Returns:
+    - SpeciesResponse: L'espèce demandée ; 404 pour une espèce non validée, sauf pour un admin
+    """
+    species = get_species_or_404(db, id)
+    if not species.curated and current_user.role != RoleEnum.ADMIN:
+        raise HTTPException(status_code=404, detail=not_found_error_species)
+    return species
+
+@router.post("/", response_model=SpeciesResponse, status_code=201, summary="Ajouter une espèce au catalogue")
+@query_budget(6)
+def create_species(species: SpeciesCreate, db: Session = Depends(get_db), current_user = Depends(admin_required)):
+    """Ajouter une espèce au catalogue (admin uniquement)
+
+    Args:
+    - species (SpeciesCreate): Nom canonique, nom scientifique et alias
+
+    Returns:
+    - SpeciesResponse: L'espèce créée ; 409 si le nom ou un alias désigne déjà une espèce
+    """
+    db_species = build_species(" ".join(species.name.split()), species.scientific_name, species.aliases, curated=True)
+    if not db_species.aliases:
+        raise HTTPException(status_code=400, detail="Invalid species name")
+    keys = [alias.key for alias in db_species.aliases]
+    if db.execute(select(SpeciesAlias.key).where(SpeciesAlias.key.in_(keys))).first():
+        raise HTTPException(status_code=409, detail="Species name or alias already exists")
+
+    try:
+        db.add(db_species)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return db_species
+
+@router.post("/{id}/aliases", response_model=SpeciesResponse, summary="Ajouter un alias à une espèce")
+@query_budget(10)
+def add_species_alias(
+    id: int,
+    alias: SpeciesAliasCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(admin_required),
+):
+    """Ajouter un alias à une espèce (admin uniquement)
+
+    Si l'alias désigne déjà une autre espèce (ex: "Loup" ajoutée depuis un carnet), celle-ci est
+    fusionnée dans l'espèce id : ses pages du carnet et ses alias lui sont rattachés.
+    L'espèce id est validée (proposée par l'autocomplétion) si elle ne l'était pas.
+
+    Args:
+    - id (int): ID de l'espèce
+    - alias (SpeciesAliasCreate): Nom de l'alias
+
+    Returns:
+    - SpeciesResponse: L'espèce et tous ses alias
+    """
+    species = get_species_or_404(db, id)
+    key = species_key(alias.name)
+    if not key:
+        raise HTTPException(status_code=400, detail="Invalid species name")
+    existing = db.get(SpeciesAlias, key)
+    owners = []
+    species.curated = True
+    if existing is None:
+        species.aliases.append(SpeciesAlias(key=key, name=" ".join(alias.name.split())))
+    elif existing.species_id != species.id:
+        source_id = existing.species_id
+        # Profils en cache des propriétaires des pages rattachées
+        owners = db.execute(select(Log.user_id).where(Log.species_id == source_id).distinct()).scalars().all()
+        db.execute(
+            update(Log).where(Log.species_id == source_id).values(
+                species_id=species.id, fish_name=species.name, version=Log.version + 1, updated_at=utcnow(),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.execute(
+            update(SpeciesAlias).where(SpeciesAlias.species_id == source_id).values(species_id=species.id),
+            execution_options={"synchronize_session": False},
+        )
+        db.delete(db.get(Species, source_id))
+
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    for user_id in owners:
+        evict_profile(user_id)
+    return get_species_or_404(db, id)
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import select, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
-from app.models.trip import Trip
+from app.database import get_async_db
+from app.models.trip import (
+    Trip, TripDateRange, TripScheduleSlot, TripTerm, build_date_ranges, build_schedule_slots, build_search_terms,
+    search_candidates, term_frequencies,
+)
 from app.models.boat import Boat
 from app.schemas.trip import TripCreate, TripResponse, TripUpdate
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user_async, get_read_async_db
 from app.models.enum import RoleEnum, TripTypeEnum, PricingTypeEnum
 from datetime import date, time
 from app.schemas.trip import TripDate, TripSchedule
+from app.utils.pagination import PageParams, keyset_paginate, finalize_page
+from app.utils.fields import fields_param, sparse_load, sparse_response
+from app.utils.serialization import json_response
+from app.utils.conditional import VALIDATOR_COLUMNS, is_conditional, not_modified_response, set_validators
+from app.utils.query_budget import query_budget
+from app.utils.rate_limit import write_rate_limit
+from app.utils.search import FIELD_WEIGHTS, query_terms
 
 router = APIRouter(prefix="/v1/trips", tags=["Trips"])
 not_found_error_trip = "Trip not found"
 
-@router.post("/", response_model=TripResponse, summary="Create a trip")
-def create_trip(trip: TripCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+@router.post("/", response_model=TripResponse, summary="Create a trip", dependencies=[Depends(write_rate_limit)])
+@query_budget(8)
+async def create_trip(trip: TripCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
     """
     Create a trip.
 
@@ -25,12 +37,13 @@ def create_trip(trip: TripCreate, db: Session = Depends(get_db), current_user =
     - TripResponse: Created trip.
     """
     # Vérifier que l'utilisateur possède au moins un bateau
-    user_boats = db.query(Boat).filter(Boat.owner_id == current_user.id).all()
-    if not user_boats:
+    user_boat = await db.execute(select(Boat.id).filter(Boat.owner_id == current_user.id).limit(1))
+    if user_boat.first() is None:
         raise HTTPException(status_code=403, detail="User must own a boat to create trips")
     
     # Vérifier que le bateau appartient à l'utilisateur
-    boat = db.query(Boat).filter(Boat.id == trip.boat_id, Boat.owner_id == current_user.id).first()
+    result = await db.execute(select(Boat).filter(Boat.id == trip.boat_id, Boat.owner_id == current_user.id))
+    boat = result.scalars().first()
     if not boat:
         raise HTTPException(status_code=403, detail="User can only create trips with their own boats")
 
@@ -64,19 +77,27 @@ def create_trip(trip: TripCreate, db: Session = Depends(get_db), current_user =
     ]
 
     try:
-        db_trip = Trip(**trip_data, organizer_id=current_user.id)
+        db_trip = Trip(
+            **trip_data,
+            organizer_id=current_user.id,
+            date_ranges=build_date_ranges(trip.dates),
+            schedule_slots=build_schedule_slots(trip.schedules),
+            search_terms=build_search_terms(trip_data),
+        )
         db.add(db_trip)
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Trip creation failed due to an internal error " + str(e))
-    db.refresh(db_trip)
+    await db.refresh(db_trip)
     return db_trip
 
 @router.get("/filter", response_model=List[TripResponse], summary="Filter trips")
-def filter_trips(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
+@query_budget(2)
+async def filter_trips(
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current_user = Depends(get_current_user_async),
     trip_type: Optional[TripTypeEnum] = Query(None),
     pricing_type: Optional[PricingTypeEnum] = Query(None),
     min_price: Optional[float] = Query(None),
@@ -87,6 +108,8 @@ def filter_trips(
     end_date: Optional[date] = Query(None),
     start_time: Optional[time] = Query(None),
     end_time: Optional[time] = Query(None),
+    page: PageParams = Depends(),
+    fields: Optional[tuple] = Depends(fields_param(TripResponse)),
 ):
     """
     Filter trips based on multiple criteria.
@@ -98,15 +121,19 @@ def filter_trips(
     - max_price (int): Maximum price.
     - min_passengers (int): Minimum number of passengers.
     - boat_id (int): Boat ID.
-    - start_date (date): Start date.
-    - end_date (date): End date.
-    - start_time (time): Start time.
-    - end_time (time): End time.
+    - start_date (date): Trips with a date range ending on or after this date.
+    - end_date (date): Trips with a date range starting on or before this date.
+      With both, trips running at some point between start_date and end_date.
+    - start_time (time): Trips departing at or after this time.
+    - end_time (time): Trips arriving at or before this time.
+    - limit (int): Page size.
+    - cursor (str): Page cursor, returned in the X-Next-Cursor header.
+    - fields (str): Fields to return (e.g. id,title,price); only these columns are read.
 
     Returns:
-    - List[TripResponse]: List of filtered trips.
+    - List[TripResponse]: List of filtered trips, ordered by price then id.
     """
-    query = db.query(Trip)
+    query = select(Trip)
     if current_user.role != RoleEnum.ADMIN:
         query = query.filter(Trip.organizer_id == current_user.id)
         
@@ -122,48 +149,137 @@ def filter_trips(
         query = query.filter(Trip.boat_id == boat_id)
     if pricing_type:
         query = query.filter(Trip.pricing_type == pricing_type)
+    # Chevauchement de périodes : une même plage doit satisfaire les deux bornes
+    date_conditions = []
     if start_date:
-        query = query.filter(Trip.dates.any(start=start_date))
+        date_conditions.append(TripDateRange.end >= start_date)
     if end_date:
-        query = query.filter(Trip.dates.any(end=end_date))
+        date_conditions.append(TripDateRange.start <= end_date)
+    if date_conditions:
+        query = query.filter(Trip.date_ranges.any(and_(*date_conditions)))
+    schedule_conditions = []
     if start_time:
-        query = query.filter(Trip.schedules.any(departure=start_time))
+        schedule_conditions.append(TripScheduleSlot.departure >= start_time)
     if end_time:
-        query = query.filter(Trip.schedules.any(arrival=end_time))
-    
-    trips = query.all()
-    
-    # Convert dates and schedules back to objects
-    for trip in trips:
-        trip.dates = [
-            TripDate(start=date.fromisoformat(item["start"]), end=date.fromisoformat(item["end"]))
-            for item in trip.dates
-        ]
-        trip.schedules = [
-            TripSchedule(departure=time.fromisoformat(item["departure"]), arrival=time.fromisoformat(item["arrival"]))
-            for item in trip.schedules
-        ]
+        schedule_conditions.append(TripScheduleSlot.arrival <= end_time)
+    if schedule_conditions:
+        query = query.filter(Trip.schedule_slots.any(and_(*schedule_conditions)))
     
-    return trips
+    if fields:
+        # price sert au curseur de la page suivante
+        query = query.options(sparse_load(Trip, fields, "price"))
+    query = keyset_paginate(query, page, Trip.price, Trip.id)
+    result = await db.execute(query)
+    trips = finalize_page(result.scalars().all(), page, response, "price")
+    if fields:
+        return sparse_response(trips, TripResponse, fields, response)
+    # dates / schedules (JSON) sont validés directement en TripDate / TripSchedule par TripResponse
+    return json_response(trips, TripResponse, response)
+
+@router.get("/search", response_model=List[TripResponse], summary="Search trips")
+@query_budget(3)
+async def search_trips(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Mots recherchés dans le titre, la description et les infos pratiques"),
+    db: AsyncSession = Depends(get_read_async_db),
+    current_user = Depends(get_current_user_async),
+    trip_type: Optional[TripTypeEnum] = Query(None),
+    min_price: Optional[float] = Query(None),
+    max_price: Optional[float] = Query(None),
+    boat_id: Optional[int] = Query(None),
+    page: PageParams = Depends(),
+):
+    """
+    Full-text search over trips, ranked by relevance.
+
+    Every word of q must appear in the trip (accents and case ignored). The score sums,
+    for each word, its weight in the trip: a word of the title counts three times a word
+    of the description or practical info. As with /filter, non-admin users only search their own trips.
+
+    For admins, the query is driven by the rarest word: its postings are read by decreasing
+    weight and every other word is a primary-key lookup per candidate. At most
+    SEARCH_MAX_CANDIDATES matches are ranked, so a word found in millions of trips costs a
+    bounded read; beyond that, only the matches where the rarest word weighs most are
+    returned. For other users, the candidates are their own trips.
+
+    Args:
+    - q (str): Words to search for.
+    - trip_type (TripTypeEnum): Type of trip.
+    - min_price (float): Minimum price.
+    - max_price (float): Maximum price.
+    - boat_id (int): Boat ID.
+    - limit (int): Page size.
+    - cursor (str): Page cursor, returned in the X-Next-Cursor header.
+
+    Returns:
+    - List[TripResponse]: Matching trips, most relevant first (ties: most recent id first).
+    """
+    terms = query_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query has no searchable words")
+
+    driver = terms[0]
+    if len(terms) > 1:
+        # Comptes plafonnés : le mot le plus rare pilote la requête
+        frequencies = (await db.execute(term_frequencies(terms))).one()
+        driver = terms[min(range(len(terms)), key=lambda position: frequencies[position])]
+
+    # Non admin : seulement ses propres sorties, qui servent alors de point de départ
+    organizer_id = None if current_user.role == RoleEnum.ADMIN else current_user.id
+    conditions = []
+    if trip_type:
+        conditions.append(Trip.trip_type == trip_type)
+    if min_price is not None:
+        conditions.append(Trip.price >= min_price)
+    if max_price is not None:
+        conditions.append(Trip.price <= max_price)
+    if boat_id:
+        conditions.append(Trip.boat_id == boat_id)
+    ranked = search_candidates(terms, driver, conditions, organizer_id)
+    query = select(Trip, ranked.c.score, ranked.c.trip_id).join(ranked, ranked.c.trip_id == Trip.id)
+    query = keyset_paginate(query, page, ranked.c.score, Trip.id, descending=True)
+    result = await db.execute(query)
+    rows = finalize_page(result.all(), page, response, "score", "trip_id")
+    return json_response([row.Trip for row in rows], TripResponse, response)
 
 @router.get("/{id}", response_model=TripResponse, summary="Get a trip")
-def get_trip(
+@query_budget(3)
+async def get_trip(
     id: int, 
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current_user = Depends(get_current_user_async),
+    fields: Optional[tuple] = Depends(fields_param(TripResponse)),
 ):
     """
     Get a trip.
 
     Args:
     - id (int): Trip ID.
+    - fields (str): Fields to return; only these columns are read.
 
     Returns:
-    - TripResponse: Trip.
+    - TripResponse: Trip, with ETag and Last-Modified; 304 when the client's copy is current.
     """
-    trip = db.query(Trip).filter(Trip.id == id).first()
+    if is_conditional(request):
+        # Only the version is read while the client's copy is current
+        result = await db.execute(select(Trip.version, Trip.updated_at).filter(Trip.id == id))
+        row = result.first()
+        not_modified = row and not_modified_response(request, row, fields)
+        if not_modified:
+            return not_modified
+
+    query = select(Trip).filter(Trip.id == id)
+    if fields:
+        query = query.options(sparse_load(Trip, fields, *VALIDATOR_COLUMNS))
+    result = await db.execute(query)
+    trip = result.scalars().first()
     if not trip:
         raise HTTPException(status_code=404, detail=not_found_error_trip)
+    set_validators(response, trip, fields)
+    if fields:
+        return sparse_response(trip, TripResponse, fields, response)
     
     try:
         trip_dates = [
@@ -181,12 +297,13 @@ def get_trip(
     trip.schedules = trip_schedules
     return trip
 
-@router.put("/{id}", response_model=TripResponse, summary="Update a trip")
-def update_trip(
+@router.put("/{id}", response_model=TripResponse, summary="Update a trip", dependencies=[Depends(write_rate_limit)])
+@query_budget(12)
+async def update_trip(
     id: int, 
     trip_update: TripUpdate, 
-    db: Session = Depends(get_db), 
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db), 
+    current_user = Depends(get_current_user_async)
 ):
     """
     Update a trip.
@@ -198,22 +315,25 @@ def update_trip(
     Returns:
     - TripResponse: Updated trip.
     """
-    trip = db.query(Trip).filter(Trip.id == id).first()
+    result = await db.execute(select(Trip).filter(Trip.id == id))
+    trip = result.scalars().first()
     if not trip:
         raise HTTPException(status_code=404, detail=not_found_error_trip)
 
     check_user_permissions(trip, current_user)
 
     if trip_update.nb_passengers is not None:
-        validate_boat_capacity(trip.boat_id, trip_update.nb_passengers, db)
+        await validate_boat_capacity(trip.boat_id, trip_update.nb_passengers, db)
 
     if trip_update.boat_id:
-        validate_new_boat(trip, trip_update.boat_id, current_user, db)
+        await validate_new_boat(trip, trip_update.boat_id, current_user, db)
 
     update_trip_attributes(trip, trip_update)
+    await sync_trip_calendar(trip.id, trip_update, db)
+    await sync_search_terms(trip, trip_update, db)
 
-    db.commit()
-    db.refresh(trip)
+    await db.commit()
+    await db.refresh(trip)
     return trip
 
 
@@ -223,9 +343,10 @@ def check_user_permissions(trip: Trip, current_user):
         raise HTTPException(status_code=403, detail="Only the organizer or admin can update the trip")
 
 
-def validate_boat_capacity(boat_id: int, nb_passengers: int, db: Session):
+async def validate_boat_capacity(boat_id: int, nb_passengers: int, db: AsyncSession):
     """Vérifie si le nombre de passagers respecte la capacité du bateau."""
-    boat = db.query(Boat).filter(Boat.id == boat_id).first()
+    result = await db.execute(select(Boat).filter(Boat.id == boat_id))
+    boat = result.scalars().first()
     if boat and nb_passengers > boat.nb_passenger:
         raise HTTPException(
             status_code=400,
@@ -233,9 +354,10 @@ def validate_boat_capacity(boat_id: int, nb_passengers: int, db: Session):
         )
 
 
-def validate_new_boat(trip: Trip, boat_id: int, current_user, db: Session):
+async def validate_new_boat(trip: Trip, boat_id: int, current_user, db: AsyncSession):
     """Vérifie que le nouveau bateau appartient à l'utilisateur et que sa capacité est suffisante."""
-    boat = db.query(Boat).filter(Boat.id == boat_id, Boat.owner_id == current_user.id).first()
+    result = await db.execute(select(Boat).filter(Boat.id == boat_id, Boat.owner_id == current_user.id))
+    boat = result.scalars().first()
     if not boat:
         raise HTTPException(status_code=403, detail="Can only use owned boats")
 
@@ -246,6 +368,23 @@ def validate_new_boat(trip: Trip, boat_id: int, current_user, db: Session):
         )
 
 
+async def sync_trip_calendar(trip_id: int, trip_update: TripUpdate, db: AsyncSession):
+    """Réécrit les lignes trip_dates / trip_schedules quand dates ou schedules changent."""
+    if trip_update.dates is not None:
+        await db.execute(delete(TripDateRange).where(TripDateRange.trip_id == trip_id))
+        db.add_all(build_date_ranges(trip_update.dates, trip_id))
+    if trip_update.schedules is not None:
+        await db.execute(delete(TripScheduleSlot).where(TripScheduleSlot.trip_id == trip_id))
+        db.add_all(build_schedule_slots(trip_update.schedules, trip_id))
+
+
+async def sync_search_terms(trip: Trip, trip_update: TripUpdate, db: AsyncSession):
+    """Réécrit les lignes trip_terms quand un champ indexé change."""
+    if FIELD_WEIGHTS.keys() & trip_update.dict(exclude_unset=True).keys():
+        await db.execute(delete(TripTerm).where(TripTerm.trip_id == trip.id))
+        db.add_all(build_search_terms(trip, trip.id))
+
+
 def update_trip_attributes(trip: Trip, trip_update: TripUpdate):
     """Met à jour les attributs du trip avec les nouvelles valeurs."""
     update_data = trip_update.dict(exclude_unset=True)
@@ -294,9 +433,11 @@ def format_schedules(schedules):
         for item in schedules
     ]
 
-@router.delete("/{id}", response_model=dict)
-def delete_trip(id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    trip = db.query(Trip).filter(Trip.id == id).first()
+@router.delete("/{id}", response_model=dict, dependencies=[Depends(write_rate_limit)])
+@query_budget(10)
+async def delete_trip(id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
+    result = await db.execute(select(Trip).filter(Trip.id == id))
+    trip = result.scalars().first()
     if not trip:
         raise HTTPException(status_code=404, detail=not_found_error_trip)
 
@@ -304,6 +445,6 @@ def delete_trip(id: int, db: Session = Depends(get_db), current_user = Depends(g
     if trip.organizer_id != current_user.id and current_user.role != RoleEnum.ADMIN:
         raise HTTPException(status_code=403, detail="Only the organizer or admin can delete the trip")
 
-    db.delete(trip)
-    db.commit()
+    await db.delete(trip)
+    await db.commit()
     return {"message": "Trip deleted successfully"}
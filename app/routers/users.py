@@ -1,21 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models.user import User
-from app.schemas.user import UserInscriptionReurn, UserResponse, UserBase, UserUpdate, UserFullProfile
+from app.models.trip import Trip
+from app.schemas.user import UserInscriptionReurn, UserResponse, UserBase, UserUpdate, UserFullProfile, UserPrincipal
 from app.auth import create_access_token
-from app.models.enum import EquipmentEnum, RoleEnum
-from app.dependencies import get_current_user, admin_required
-from typing import List
+from app.models.enum import RoleEnum
+from app.dependencies import get_current_user, get_current_user_async, get_read_db, admin_required, evict_principal
+from typing import List, Optional
 from app.models.boat import Boat
 from app.schemas.boat import BoatResponse
-from app.utils.security import hash_password  # importer la fonction de hash
+from app.utils.security import hash_password_async  # importer la fonction de hash
+from app.utils.metrics import timed_serialization
+from app.utils.profile_cache import PROFILE_SECTIONS, profile_generation, get_cached_profile, cache_profile
+from app.utils.query_budget import query_budget
+from app.utils.rate_limit import signup_rate_limit, write_rate_limit
 
 router = APIRouter(prefix="/v1/users", tags=["Users"])
 not_found_error_user = "User not found"
+# Champs de l'utilisateur toujours présents dans le profil
+PROFILE_BASE_FIELDS = ("id", "name", "firstname", "email", "phone", "status")
 
-@router.post("/", response_model=UserInscriptionReurn, status_code=201)
-def create_user(user: UserBase, db: Session = Depends(get_db)):
+@router.post("/", response_model=UserInscriptionReurn, status_code=201, dependencies=[Depends(signup_rate_limit)])
+@query_budget(3)
+async def create_user(user: UserBase, db: AsyncSession = Depends(get_async_db)):
     """
     Crée un utilisateur.
 
@@ -26,36 +36,65 @@ def create_user(user: UserBase, db: Session = Depends(get_db)):
     - UserInscriptionReurn: Le token de l'utilisateur.
     """
     # Vérifier l'existence de l'utilisateur
-    user_db = db.query(User).filter(User.email == user.email).first()
-    if user_db:
+    result = await db.execute(select(User.id).filter(User.email == user.email))
+    if result.first():
         raise HTTPException(status_code=400, detail="Email already registered")
-    # Hacher le mot de passe
+    # Hacher le mot de passe (dans le pool de processus dédié)
     user_data = user.dict()
     if user_data.get("password"):
-        user_data["password"] = hash_password(user_data["password"])
+        user_data["password"] = await hash_password_async(user_data["password"])
     db_user = User(**user_data)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     token = create_access_token(data={"sub": db_user.email, "status": db_user.status.value})
     return {"token": token}
 
+def parse_profile_sections(include: Optional[str]) -> tuple:
+    """Sections demandées par include=, dans l'ordre de PROFILE_SECTIONS ; toutes par défaut."""
+    if not include:
+        return PROFILE_SECTIONS
+    requested = {section.strip() for section in include.split(",") if section.strip()}
+    unknown = requested - set(PROFILE_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile section(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(PROFILE_SECTIONS)}",
+        )
+    return tuple(section for section in PROFILE_SECTIONS if section in requested)
+
+def serialize_profile(user: User, sections: tuple) -> bytes:
+    """Sérialise le profil en ne lisant que les sections demandées (déjà chargées par selectinload)."""
+    data = {field: getattr(user, field) for field in PROFILE_BASE_FIELDS}
+    for section in sections:
+        data[section] = getattr(user, section)
+    profile = UserFullProfile.model_validate(data)
+    excluded = set(PROFILE_SECTIONS) - set(sections)
+    return profile.model_dump_json(exclude=excluded).encode("utf-8")
+
 @router.get("/{id}/profile", response_model=UserFullProfile)
+@query_budget(6)
 def get_user_full_profile(
     id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    include: Optional[str] = Query(None, description="Sections à inclure, séparées par des virgules : boats,trips,reservations,logs"),
+    db: Session = Depends(get_read_db), 
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
-    Obtenir le profil complet d'un utilisateur avec tous ses bateaux, sorties, réservations et logs
+    Obtenir le profil complet d'un utilisateur avec ses bateaux, sorties, réservations et logs
+
+    Chaque section demandée est chargée en une requête (selectinload). Le profil sérialisé
+    est mis en cache par utilisateur et invalidé dès qu'une de ses lignes est modifiée ;
+    seuls les profils lus sur le primaire sont mis en cache.
 
     Args:
     - id (int): Identifiant de l'utilisateur.
-    - db (Session, optional): The database session. Defaults to Depends(get_db).
-    - current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+    - include (str, optional): Sections à inclure. Toutes par défaut.
+    - db (Session, optional): Read session (replica or primary). Defaults to Depends(get_read_db).
+    - current_user (UserPrincipal, optional): The current user. Defaults to Depends(get_current_user).
 
     Returns:
-    - UserFullProfile: Profil complet de l'utilisateur.
+    - UserFullProfile: Profil de l'utilisateur, limité aux sections demandées.
     """
     # Vérifier que l'utilisateur demande son propre profil ou est admin
     if current_user.id != id and current_user.role != RoleEnum.ADMIN:
@@ -63,34 +102,34 @@ def get_user_full_profile(
             status_code=403, 
             detail="Not authorized to view this profile"
         )
-
-    user = db.query(User).filter(User.id == id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail=not_found_error_user)
-
-    # Ensure equipment is a list for each boat
-    for boat in user.boats:
-        if not boat.equipment or boat.equipment.strip() == "":
-            boat.equipment = []
-        elif isinstance(boat.equipment, str):
-            equipment_list = [
-                item.strip() 
-                for item in boat.equipment.split(',') 
-                if item.strip() in [e.value for e in EquipmentEnum]
-            ]
-            boat.equipment = equipment_list if equipment_list else []
-
-    return user
+    sections = parse_profile_sections(include)
+
+    # Lue avant le chargement : une modification concurrente empêche de mettre en cache un profil périmé
+    generation = profile_generation(id)
+    body = get_cached_profile(id, generation, sections)
+    if body is None:
+        options = [selectinload(getattr(User, section)) for section in sections]
+        user = db.query(User).options(*options).filter(User.id == id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail=not_found_error_user)
+        with timed_serialization():
+            body = serialize_profile(user, sections)
+        # Lu sur un réplica, le profil peut être en retard sur la génération : il n'est pas mis en cache
+        if not db.info.get("read_only"):
+            cache_profile(id, generation, sections, body)
+
+    return Response(content=body, media_type="application/json")
 
 @router.get("/{id}", response_model=UserResponse)
-def get_user(id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@query_budget(2)
+def get_user(id: int, db: Session = Depends(get_read_db), current_user: UserPrincipal = Depends(get_current_user)):
     """
     Obtenir un utilisateur.
 
     Args:
     - id (int): Identifiant de l'utilisateur.
-    - db (Session, optional): The database session. Defaults to Depends(get_db).
-    - current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+    - db (Session, optional): Read session (replica or primary). Defaults to Depends(get_read_db).
+    - current_user (UserPrincipal, optional): The current user. Defaults to Depends(get_current_user).
 
     Returns:
     - UserResponse: L'utilisateur.
@@ -100,21 +139,23 @@ def get_user(id: int, db: Session = Depends(get_db), current_user: User = Depend
         raise HTTPException(status_code=404, detail=not_found_error_user)
     return user
 
-@router.put("/{id}", response_model=UserResponse)
-def update_user(id: int, user_update: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.put("/{id}", response_model=UserResponse, dependencies=[Depends(write_rate_limit)])
+@query_budget(4)
+async def update_user(id: int, user_update: UserUpdate, db: AsyncSession = Depends(get_async_db), current_user: UserPrincipal = Depends(get_current_user_async)):
     """
     Mettre à jour un utilisateur.
 
     Args:
     - id (int): Identifiant de l'utilisateur.
     - user_update (UserUpdate): Informations de l'utilisateur à mettre à jour.
-    - db (Session, optional): The database session. Defaults to Depends(get_db).
-    - current_user (User, optional): The current user. Defaults to Depends(get_current_user).
+    - db (AsyncSession, optional): The database session. Defaults to Depends(get_async_db).
+    - current_user (UserPrincipal, optional): The current user. Defaults to Depends(get_current_user_async).
 
     Returns:
     - UserResponse: L'utilisateur mis à jour.
     """
-    user = db.query(User).filter(User.id == id).first()
+    result = await db.execute(select(User).filter(User.id == id))
+    user = result.scalars().first()
     if not user:
         print("User not found", id)
         raise HTTPException(status_code=404, detail=not_found_error_user)
@@ -128,30 +169,46 @@ def update_user(id: int, user_update: UserUpdate, db: Session = Depends(get_db),
 
     update_data = user_update.dict(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
-        update_data["password"] = hash_password(update_data["password"])
+        # Hacher le mot de passe (dans le pool de processus dédié)
+        update_data["password"] = await hash_password_async(update_data["password"])
+    previous_email = user.email
     for key, value in update_data.items():
         setattr(user, key, value)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    # Invalider le cache de l'utilisateur authentifié (indexé par l'ancien email)
+    evict_principal(previous_email)
+    await db.refresh(user)
     return user
 
-@router.delete("/{id}", response_model=dict)
-def delete_user(id: int, db: Session = Depends(get_db), current_user: User = Depends(admin_required)):
+@router.delete("/{id}", response_model=dict, dependencies=[Depends(write_rate_limit)])
+# Cascade : utilisateur, 9 relations chargées d'avance, places libérées, une suppression par table
+@query_budget(20)
+def delete_user(id: int, db: Session = Depends(get_db), current_user: UserPrincipal = Depends(admin_required)):
     """
     Supprimer un utilisateur.
 
     Args:
     - id (int): Identifiant de l'utilisateur.
     - db (Session, optional): The database session. Defaults to Depends(get_db).
-    - current_user (User, optional): The current user. Defaults to Depends(admin_required).
+    - current_user (UserPrincipal, optional): The current user. Defaults to Depends(admin_required).
 
     Returns:
     - dict: Message de confirmation.
     """
     # Seul un admin peut supprimer un utilisateur
-    user = db.query(User).filter(User.id == id).first()
+    # Lignes parcourues par la cascade chargées d'avance : une requête par relation, pas par ligne
+    user = db.query(User).options(
+        selectinload(User.boats).selectinload(Boat.trips),
+        selectinload(User.logs),
+        selectinload(User.reservations),
+        selectinload(User.trips).options(
+            selectinload(Trip.date_ranges), selectinload(Trip.schedule_slots), selectinload(Trip.search_terms),
+            selectinload(Trip.reservations),
+        ),
+    ).filter(User.id == id).first()
     if not user:
         raise HTTPException(status_code=404, detail=not_found_error_user)
     db.delete(user)
     db.commit()
+    evict_principal(user.email)
     return {"message": "User deleted"}
\ No newline at end of file
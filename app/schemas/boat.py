@@ -12,7 +12,7 @@ class BoatBase(BaseModel):
     fabrication_year: int
     photo_url: str
     license: LicenseEnum
-    equipment: Optional[List[str]] = []  # Changed from Optional[str] to Optional[List[str]]
+    equipment: Optional[List[EquipmentEnum]] = []  # Stocké en masque de bits, voir Boat.equipment
     caution: float
     nb_passenger: int
     nb_seat: int
@@ -30,7 +30,7 @@ class BoatCreate(BoatBase):
 class BoatGetter(GetterDict):
     def get(self, key, default=None):
         if key == "equipment":
-            return self._obj.equipment_list  # renvoyer la liste issue du setter/getter
+            return self._obj.equipment  # liste décodée du masque de bits
         return getattr(self._obj, key, default)
 
 class BoatResponse(BoatBase):
@@ -39,11 +39,7 @@ class BoatResponse(BoatBase):
 
     @field_validator('equipment', mode='before')
     def validate_equipment(cls, v):
-        """Convert string equipment to list if needed"""
-        if isinstance(v, str):
-            if not v:
-                return []
-            return [item.strip() for item in v.split(',') if item.strip()]
+        """Un bateau sans équipement renvoie une liste vide"""
         return v or []
 
     class Config:
@@ -51,6 +47,9 @@ class BoatResponse(BoatBase):
         getter_dict = BoatGetter
         from_attributes = True
 
+class BoatNearbyResponse(BoatResponse):
+    distance_km: float
+
 class BoatUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
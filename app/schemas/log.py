@@ -28,6 +28,7 @@ class LogUpdate(BaseModel):
 class LogResponse(LogBase):
     id: int
     user_id: int
+    species_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from typing import List, Optional
+
+class SpeciesCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    scientific_name: Optional[str] = Field(None, max_length=100)
+    aliases: List[str] = []
+
+class SpeciesAliasCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+class SpeciesResponse(BaseModel):
+    id: int
+    name: str
+    scientific_name: Optional[str] = None
+    aliases: List[str] = []
+
+    @field_validator('aliases', mode='before')
+    def validate_aliases(cls, v, info: ValidationInfo):
+        """Lignes species_aliases -> noms, sans le nom canonique"""
+        names = [getattr(alias, "name", alias) for alias in v or []]
+        return [name for name in names if name != info.data.get("name")]
+
+    class Config:
+        from_attributes = True
+
+class SpeciesSuggestion(BaseModel):
+    id: int
+    name: str
+    alias: Optional[str] = None  # Alias ayant correspondu au préfixe, absent si c'est le nom canonique
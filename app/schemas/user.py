@@ -52,6 +52,18 @@ class UserUpdate(BaseModel):
     class Config:
         from_attributes = True
 
+class UserPrincipal(BaseModel):
+    """Utilisateur authentifié, détaché de la session et mis en cache par get_current_user."""
+    id: int
+    email: str
+    role: str
+    status: StatusEnum
+    boat_license: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
 class UserFullProfile(BaseModel):
     id: int
     name: str
@@ -59,10 +71,11 @@ class UserFullProfile(BaseModel):
     email: str
     phone: Optional[str]
     status: str
-    boats: List[BoatResponse]
-    trips: List[TripResponse]
-    reservations: List[ReservationResponse]
-    logs: List[LogResponse]
+    # Absentes de la réponse si elles ne sont pas demandées par include=
+    boats: Optional[List[BoatResponse]] = None
+    trips: Optional[List[TripResponse]] = None
+    reservations: Optional[List[ReservationResponse]] = None
+    logs: Optional[List[LogResponse]] = None
 
     class Config:
         from_attributes = True
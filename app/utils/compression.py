@@ -0,0 +1,130 @@
+import os
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+# Réponses plus petites envoyées telles quelles : l'en-tête gzip et le CPU ne valent pas le gain
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# 1 (rapide) à 9 (compact) ; au-delà de 6 le gain sur du JSON est marginal (voir benchmarks.compression)
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+# Types compressés ; les autres (images, contenus déjà compressés) passent sans modification
+COMPRESSION_CONTENT_TYPES = tuple(
+    content_type.strip().lower()
+    for content_type in os.getenv(
+        "COMPRESSION_CONTENT_TYPES", "application/json,application/x-ndjson,text/csv,text/plain,text/html"
+    ).split(",")
+    if content_type.strip()
+)
+# Blocs compressés dans le pool de threads plutôt que dans la boucle d'évènements
+THREADPOOL_MIN_SIZE = 256 * 1024
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """gzip figure dans Accept-Encoding avec une qualité non nulle (gzip;q=0 le refuse)."""
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        if coding.strip() in ("gzip", "*"):
+            quality = params.strip()
+            if quality.startswith("q="):
+                try:
+                    return float(quality[2:]) > 0
+                except ValueError:
+                    return False
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI compressant en gzip les réponses dont le type est autorisé.
+
+    Une réponse complète est compressée d'un bloc si elle dépasse minimum_size ; une
+    StreamingResponse est compressée bloc par bloc (Z_SYNC_FLUSH), chaque bloc étant
+    envoyé au client dès qu'il est produit.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, level: int = COMPRESSION_LEVEL,
+                 content_types: tuple = COMPRESSION_CONTENT_TYPES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = frozenset(content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await _GzipResponder(self, send)(scope, receive)
+
+
+class _GzipResponder:
+    """État d'une réponse : l'en-tête est retenu jusqu'au premier bloc pour décider de la compression."""
+
+    def __init__(self, middleware: CompressionMiddleware, send):
+        self.middleware = middleware
+        self.send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive):
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    def is_compressible(self, message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        if media_type not in self.middleware.content_types:
+            return False
+        length = headers.get("content-length")
+        return length is None or int(length) >= self.middleware.minimum_size
+
+    async def compress(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= THREADPOOL_MIN_SIZE:
+            return await run_in_threadpool(self._compress, body, more_body)
+        return self._compress(body, more_body)
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        if self.compressor is None:
+            self.compressor = zlib.compressobj(self.middleware.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return self.compressor.compress(body) + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            if not self.is_compressible(message):
+                self.passthrough = True
+                await self.send(message)
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Corps complet trop petit (sans Content-Length annoncée) : envoyé tel quel
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers["Content-Encoding"] = "gzip"
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Octets différents de la représentation non compressée : l'ETag fort devient faible
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = await self.compress(body, more_body=False)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+        await self.send({"type": "http.response.body", "body": await self.compress(body, more_body), "more_body": more_body})
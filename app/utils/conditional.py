@@ -0,0 +1,73 @@
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+# Colonnes à charger en plus des champs demandés pour poser ETag / Last-Modified
+VALIDATOR_COLUMNS = ("version", "updated_at")
+
+
+def make_etag(version: int, fields: Optional[tuple] = None) -> str:
+    """ETag fort d'une ressource : sa version, plus les champs demandés pour une réponse partielle."""
+    if not fields:
+        return f'"{version}"'
+    return f'"{version}-{zlib.crc32(",".join(fields).encode()):08x}"'
+
+
+def http_date(value: datetime) -> str:
+    """Date HTTP (RFC 7231) d'un horodatage UTC naïf."""
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    """La requête porte If-None-Match ou If-Modified-Since : une lecture de la version suffit peut-être."""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, updated_at: Optional[datetime]) -> bool:
+    """
+    Évalue les préconditions de la requête (RFC 7232, section 6).
+
+    If-None-Match l'emporte sur If-Modified-Since ; la comparaison des ETags est faible,
+    une date illisible est ignorée.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or any(
+            (candidate[2:] if candidate.startswith("W/") else candidate) == etag for candidate in candidates
+        )
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and updated_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return updated_at.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(version: int, updated_at: Optional[datetime], fields: Optional[tuple] = None) -> dict:
+    headers = {"ETag": make_etag(version, fields)}
+    if updated_at is not None:
+        headers["Last-Modified"] = http_date(updated_at)
+    return headers
+
+
+def not_modified_response(request: Request, row, fields: Optional[tuple] = None) -> Optional[Response]:
+    """
+    Réponse 304 si la ressource (ligne portant version et updated_at) n'a pas changé
+    depuis la copie du client, None sinon.
+    """
+    headers = validator_headers(row.version, row.updated_at, fields)
+    if is_not_modified(request, headers["ETag"], row.updated_at):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def set_validators(response: Response, resource, fields: Optional[tuple] = None):
+    """Pose ETag et Last-Modified sur la réponse complète."""
+    response.headers.update(validator_headers(resource.version, resource.updated_at, fields))
@@ -0,0 +1,66 @@
+import csv
+import io
+import os
+from enum import Enum
+
+# Nombre de lignes lues par aller-retour serveur (yield_per) et émises par bloc
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+
+class ExportFormatEnum(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormatEnum.NDJSON: "application/x-ndjson",
+    ExportFormatEnum.CSV: "text/csv",
+}
+
+
+def export_headers(name: str, fmt: ExportFormatEnum) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'}
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def header_chunk(schema, fmt: ExportFormatEnum) -> str:
+    """Premier bloc émis : la ligne d'en-tête en CSV, rien en NDJSON."""
+    if fmt == ExportFormatEnum.CSV:
+        return _csv_line(schema.model_fields.keys())
+    return ""
+
+
+def rows_chunk(rows, schema, fmt: ExportFormatEnum) -> str:
+    """Sérialise un lot de lignes ORM via le schéma de réponse."""
+    if fmt == ExportFormatEnum.CSV:
+        fields = list(schema.model_fields.keys())
+        lines = []
+        for row in rows:
+            data = schema.model_validate(row).model_dump(mode="json")
+            lines.append(_csv_line(data[field] for field in fields))
+        return "".join(lines)
+    return "".join(schema.model_validate(row).model_dump_json() + "\n" for row in rows)
+
+
+def stream_rows(session_factory, query, schema, fmt: ExportFormatEnum):
+    """Générateur sync : lit la requête par lots côté serveur et émet un bloc par lot."""
+    yield header_chunk(schema, fmt)
+    with session_factory() as session:
+        result = session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.scalars().partitions():
+            # L'identity map ne garde que des références faibles : chaque lot est libéré après émission
+            yield rows_chunk(partition, schema, fmt)
+
+
+async def stream_rows_async(session_factory, query, schema, fmt: ExportFormatEnum):
+    """Équivalent async de stream_rows pour les routeurs sur AsyncSession."""
+    yield header_chunk(schema, fmt)
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.scalars().partitions():
+            yield rows_chunk(partition, schema, fmt)
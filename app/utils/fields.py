@@ -0,0 +1,73 @@
+from functools import lru_cache
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from pydantic import ConfigDict, create_model, field_validator
+from sqlalchemy import inspect
+from sqlalchemy.ext.hybrid import HybridExtensionType
+from sqlalchemy.orm import load_only
+from app.utils.serialization import json_response
+
+
+def fields_param(schema):
+    """
+    Dépendance lisant ?fields=a,b,c pour les réponses de type schema.
+
+    Retourne None (réponse complète) ou le tuple des champs demandés, dans l'ordre du schéma.
+    Un champ inconnu renvoie une 400.
+    """
+    allowed = tuple(schema.model_fields.keys())
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Champs à renvoyer, séparés par des virgules, parmi : {', '.join(allowed)}"),
+    ) -> Optional[tuple]:
+        if not fields:
+            return None
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(allowed)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+        return tuple(field for field in allowed if field in requested)
+
+    return dependency
+
+
+def sparse_load(model, fields: tuple, *required: str):
+    """
+    Option load_only limitant le SELECT aux colonnes demandées, plus celles dont
+    l'endpoint a besoin (tri keyset, contrôle d'accès). Les autres colonnes lèvent
+    une erreur au lieu d'être chargées une par une.
+    """
+    columns = model.__table__.columns
+    descriptors = inspect(model).all_orm_descriptors
+    names = []
+    for name in dict.fromkeys((*fields, *required)):
+        if name in columns:
+            names.append(name)
+        elif getattr(descriptors.get(name), "extension_type", None) is HybridExtensionType.HYBRID_PROPERTY:
+            # Propriété hybride (Boat.equipment) : on charge la colonne qu'elle décode
+            names.append(getattr(model, name).property.key)
+    return load_only(*[getattr(model, name) for name in names], raiseload=True)
+
+
+@lru_cache(maxsize=256)
+def sparse_schema(schema, fields: tuple):
+    """Modèle de réponse réduit aux champs demandés (validateurs de champs conservés), mis en cache."""
+    definitions = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    validators = {}
+    for name, decorator in schema.__pydantic_decorators__.field_validators.items():
+        targets = [field for field in decorator.info.fields if field in fields]
+        if targets:
+            # func est liée au schéma d'origine : on repart de la fonction sous-jacente
+            func = getattr(decorator.func, "__func__", decorator.func)
+            validators[name] = field_validator(*targets, mode=decorator.info.mode)(func)
+    return create_model(
+        f"{schema.__name__}_{'_'.join(fields)}",
+        __config__=ConfigDict(from_attributes=True),
+        __validators__=validators,
+        **definitions,
+    )
+
+
+def sparse_response(data, schema, fields: tuple, response: Response = None) -> Response:
+    """Valide et sérialise une ligne ou une liste de lignes ORM avec le modèle réduit."""
+    return json_response(data, sparse_schema(schema, fields), response)
@@ -0,0 +1,74 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GEOHASH_PRECISION = 9  # ~5 m, précision stockée sur les bateaux
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # les bits pairs encodent la longitude
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision: int):
+    """Hauteur (latitude) et largeur (longitude) d'une cellule, en degrés."""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def search_precision(latitude: float, radius_km: float) -> int:
+    """
+    Plus grande précision dont les cellules couvrent le rayon dans les deux directions,
+    de sorte que la cellule centrale et ses 8 voisines contiennent tout le cercle.
+    0 si le rayon dépasse les plus grandes cellules.
+    """
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size_degrees(precision)
+        if height * KM_PER_DEGREE >= radius_km and width * KM_PER_DEGREE * cos_lat >= radius_km:
+            return precision
+    return 0
+
+
+def neighborhood(latitude: float, longitude: float, precision: int) -> list:
+    """Cellule contenant le point et ses 8 voisines (sans doublon près des pôles)."""
+    height, width = cell_size_degrees(precision)
+    cells = []
+    for d_lat in (-1, 0, 1):
+        lat = min(max(latitude + d_lat * height, -90.0), 90.0)
+        for d_lon in (-1, 0, 1):
+            lon = (longitude + d_lon * width + 180.0) % 360.0 - 180.0
+            cell = encode_geohash(lat, lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
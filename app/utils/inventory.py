@@ -0,0 +1,79 @@
+from datetime import date
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.reservation import Reservation, TripSeatInventory
+
+
+def _inventory_row(trip_id: int, day: date):
+    return (TripSeatInventory.trip_id == trip_id, TripSeatInventory.date == day)
+
+
+def _insert_ignore(dialect_name: str, trip_id: int, day: date):
+    """INSERT de la ligne (trip_id, date) à 0 place, sans erreur si elle existe déjà."""
+    values = {"trip_id": trip_id, "date": day, "seats_taken": 0}
+    if dialect_name == "mysql":
+        return mysql.insert(TripSeatInventory).values(**values).on_duplicate_key_update(
+            seats_taken=TripSeatInventory.seats_taken
+        )
+    if dialect_name == "sqlite":
+        return sqlite.insert(TripSeatInventory).values(**values).on_conflict_do_nothing()
+    return None
+
+
+async def get_seats_taken(db: AsyncSession, trip_id: int, day: date) -> int:
+    """Places déjà réservées pour un jour : une seule ligne lue."""
+    result = await db.execute(select(TripSeatInventory.seats_taken).filter(*_inventory_row(trip_id, day)))
+    return result.scalar() or 0
+
+
+async def reserve_seats(db: AsyncSession, trip_id: int, day: date, nb_seats: int, capacity: int) -> bool:
+    """
+    Incrémente atomiquement les places réservées si la capacité le permet.
+
+    L'UPDATE conditionnel pose un verrou sur la ligne jusqu'à la fin de la transaction :
+    deux réservations concurrentes ne peuvent pas dépasser la capacité.
+    Retourne False s'il ne reste pas assez de places.
+    """
+    stmt = (
+        update(TripSeatInventory)
+        .where(*_inventory_row(trip_id, day), TripSeatInventory.seats_taken + nb_seats <= capacity)
+        .values(seats_taken=TripSeatInventory.seats_taken + nb_seats)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    if result.rowcount == 1:
+        return True
+
+    # Première réservation pour ce jour : créer la ligne puis retenter
+    insert_stmt = _insert_ignore(db.get_bind().dialect.name, trip_id, day)
+    if insert_stmt is not None:
+        await db.execute(insert_stmt)
+    else:
+        existing = await db.execute(select(TripSeatInventory.trip_id).filter(*_inventory_row(trip_id, day)))
+        if existing.first() is None:
+            db.add(TripSeatInventory(trip_id=trip_id, date=day, seats_taken=0))
+            await db.flush()
+    result = await db.execute(stmt)
+    return result.rowcount == 1
+
+
+async def release_seats(db: AsyncSession, trip_id: int, day: date, nb_seats: int):
+    await db.execute(
+        update(TripSeatInventory)
+        .where(*_inventory_row(trip_id, day))
+        .values(seats_taken=TripSeatInventory.seats_taken - nb_seats)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_seat_inventory(db: Session):
+    """Recalcule tout le registre à partir des réservations existantes (seed, migration)."""
+    db.query(TripSeatInventory).delete()
+    totals = (
+        select(Reservation.trip_id, Reservation.reservation_date, func.sum(Reservation.nb_seats))
+        .group_by(Reservation.trip_id, Reservation.reservation_date)
+    )
+    db.execute(insert(TripSeatInventory).from_select(["trip_id", "date", "seats_taken"], totals))
+    db.commit()
@@ -0,0 +1,180 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes des histogrammes (Prometheus : le = inférieur ou égal)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Requêtes SQL gardées par requête HTTP pour le diagnostic (voir app.utils.query_budget)
+MAX_KEPT_STATEMENTS = 100
+
+
+class RequestStats:
+    """Temps passé en base et en sérialisation pendant une requête HTTP."""
+
+    __slots__ = ("scope", "started_at", "db_seconds", "db_count", "serialize_seconds", "statements")
+
+    def __init__(self, scope: dict = None):
+        self.scope = scope or {}
+        self.started_at = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_count = 0
+        self.serialize_seconds = 0.0
+        self.statements = []
+
+    def route(self) -> str:
+        """Modèle de chemin de la route servie (ex: /v1/boats/{id}), connu une fois le routage fait."""
+        # Requêtes hors routes regroupées : pas de label par URL brute
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing (durées en ms)."""
+        total = (time.perf_counter() - self.started_at) * 1000
+        return (
+            f"db;dur={self.db_seconds * 1000:.1f}, db-count;desc=\"{self.db_count}\", "
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}, total;dur={total:.1f}"
+        )
+
+
+# Statistiques de la requête en cours ; copiées dans le threadpool des endpoints sync
+request_stats = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if request_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    stats = request_stats.get()
+    started = conn.info.get("query_started_at")
+    if stats is not None and started:
+        stats.db_seconds += time.perf_counter() - started.pop()
+        stats.db_count += 1
+        if len(stats.statements) < MAX_KEPT_STATEMENTS:
+            stats.statements.append(statement)
+
+
+@contextmanager
+def timed_serialization():
+    """Ajoute la durée du bloc au temps de sérialisation de la requête en cours."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = request_stats.get()
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - start
+
+
+class Histogram:
+    """Histogramme Prometheus par jeu de labels, sûr entre threads."""
+
+    def __init__(self, name: str, documentation: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            # Comptes non cumulés par tranche, cumulés à l'exposition
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def expose(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: {**data, "buckets": list(data["buckets"])} for labels, data in self._series.items()}
+        for label_values, data in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, data["buckets"]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {data["count"]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {data['sum']}")
+            lines.append(f"{self.name}_count{{{labels}}} {data['count']}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP.", ("method", "route", "status"), DURATION_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Temps passé en base par requête HTTP.", ("method", "route"), DURATION_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Requêtes SQL émises par requête HTTP.", ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+REQUEST_SERIALIZE_DURATION = Histogram(
+    "http_request_serialize_duration_seconds", "Temps de sérialisation par requête HTTP.", ("method", "route"),
+    DURATION_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_SERIALIZE_DURATION)
+
+
+def render_metrics() -> str:
+    """Tous les histogrammes, au format texte d'exposition Prometheus."""
+    return "\n".join(line for histogram in HISTOGRAMS for line in histogram.expose()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : ouvre les statistiques de la requête, ajoute l'en-tête Server-Timing
+    et alimente les histogrammes par route (modèle de chemin, ex: /v1/boats/{id}).
+
+    Pour une StreamingResponse, Server-Timing ne couvre que le travail fait avant l'envoi
+    des en-têtes ; les histogrammes couvrent toute la réponse.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", stats.server_timing().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            path = stats.route()
+            method = scope["method"]
+            REQUEST_DURATION.observe(time.perf_counter() - stats.started_at, method, path, str(status))
+            REQUEST_DB_DURATION.observe(stats.db_seconds, method, path)
+            REQUEST_DB_QUERIES.observe(stats.db_count, method, path)
+            REQUEST_SERIALIZE_DURATION.observe(stats.serialize_seconds, method, path)
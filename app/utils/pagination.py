@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import date, datetime
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+# En-tête portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PageParams:
+    """Paramètres de pagination communs aux endpoints /filter."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Nombre maximal d'éléments"),
+        cursor: str = Query(None, description="Curseur opaque renvoyé dans l'en-tête X-Next-Cursor"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(sort_value, last_id: int) -> str:
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column):
+    """Décode un curseur en (valeur de tri, id), converti au type python de la colonne de tri."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        python_type = sort_column.type.python_type
+        if python_type in (date, datetime):
+            sort_value = python_type.fromisoformat(sort_value)
+        else:
+            sort_value = python_type(sort_value)
+        return sort_value, int(last_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_paginate(query, page: PageParams, sort_column, id_column, descending: bool = False):
+    """
+    Applique un tri stable (sort_column, id_column) et un prédicat de positionnement
+    à partir du curseur, à une Query ou un Select.
+
+    Une ligne de plus que la limite est demandée pour savoir s'il existe une page suivante.
+    """
+    same_column = sort_column is id_column
+    if page.cursor:
+        sort_value, last_id = decode_cursor(page.cursor, sort_column)
+        if descending:
+            predicate = sort_column < sort_value
+            tie_breaker = id_column < last_id
+        else:
+            predicate = sort_column > sort_value
+            tie_breaker = id_column > last_id
+        if not same_column:
+            predicate = or_(predicate, and_(sort_column == sort_value, tie_breaker))
+        query = query.filter(predicate)
+
+    columns = [sort_column] if same_column else [sort_column, id_column]
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    return query.limit(page.limit + 1)
+
+
+def finalize_page(rows, page: PageParams, response: Response, sort_attr: str, id_attr: str = "id"):
+    """Tronque la page à la limite et publie le curseur suivant dans l'en-tête de réponse."""
+    rows = list(rows)
+    if len(rows) <= page.limit:
+        return rows
+    rows = rows[:page.limit]
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+    return rows
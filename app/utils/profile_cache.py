@@ -0,0 +1,84 @@
+import itertools
+import os
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.boat import Boat
+from app.models.trip import Trip
+from app.models.reservation import Reservation
+from app.models.log import Log
+from app.utils.cache import TTLCache
+
+# Sections du profil complet, dans l'ordre de sérialisation
+PROFILE_SECTIONS = ("boats", "trips", "reservations", "logs")
+
+# Colonne désignant l'utilisateur dont le profil contient la ligne
+PROFILE_OWNER_COLUMNS = {
+    User: "id",
+    Boat: "owner_id",
+    Trip: "organizer_id",
+    Reservation: "user_id",
+    Log: "user_id",
+}
+
+# Profils sérialisés (JSON), indexés par (utilisateur, génération, sections)
+profile_cache = TTLCache(
+    maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("PROFILE_CACHE_TTL", "300")),
+)
+
+_generations = {}
+_generation_counter = itertools.count(1)
+_generations_lock = threading.Lock()
+
+
+def profile_generation(user_id: int) -> int:
+    """Génération courante du profil : change à chaque modification d'une ligne de l'utilisateur."""
+    return _generations.get(user_id, 0)
+
+
+def evict_profile(user_id: int):
+    """Rend inaccessibles les profils en cache de l'utilisateur (ils expirent ensuite par LRU / TTL)."""
+    with _generations_lock:
+        _generations[user_id] = next(_generation_counter)
+
+
+def get_cached_profile(user_id: int, generation: int, sections: tuple):
+    return profile_cache.get((user_id, generation, sections))
+
+
+def cache_profile(user_id: int, generation: int, sections: tuple, body: bytes):
+    """
+    Mémorise un profil sérialisé, sauf si l'utilisateur a été modifié pendant sa construction :
+    generation doit avoir été lue avant les requêtes de chargement.
+    """
+    if generation == profile_generation(user_id):
+        profile_cache.set((user_id, generation, sections), body)
+
+
+def _owner_ids(instance) -> set:
+    """Utilisateurs dont le profil contient l'instance, avant et après modification."""
+    column = PROFILE_OWNER_COLUMNS.get(type(instance))
+    if column is None:
+        return set()
+    history = inspect(instance).attrs[column].history
+    return {owner_id for owner_id in (*history.unchanged, *history.added, *history.deleted) if owner_id is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def collect_profile_changes(session, flush_context):
+    owners = session.info.setdefault("profile_owners", set())
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        owners |= _owner_ids(instance)
+
+
+@event.listens_for(Session, "after_commit")
+def evict_changed_profiles(session):
+    for user_id in session.info.pop("profile_owners", ()):
+        evict_profile(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_profile_changes(session):
+    session.info.pop("profile_owners", None)
@@ -0,0 +1,72 @@
+import logging
+import os
+from collections import Counter
+from app.utils.metrics import request_stats
+
+logger = logging.getLogger(__name__)
+
+# Mode strict : un dépassement lève QueryBudgetExceeded au lieu d'être journalisé (tests, développement)
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() in ("1", "true", "yes")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Une route a émis plus de requêtes SQL que son budget."""
+
+    def __init__(self, method: str, route: str, budget: int, count: int, statements: list):
+        self.route = route
+        self.budget = budget
+        self.count = count
+        self.statements = statements
+        # Requêtes identiques regroupées : une boucle de lazy loads (N+1) ressort en tête
+        lines = [f"{times} x {statement}" for statement, times in Counter(statements).most_common()]
+        super().__init__(
+            f"{method} {route} issued {count} SQL statements (budget {budget}):\n" + "\n".join(lines)
+        )
+
+
+def query_budget(max_queries: int):
+    """
+    Décorateur d'endpoint : nombre maximal de requêtes SQL par appel, dépendances comprises
+    (ex: chargement de l'utilisateur authentifié). À placer sous le décorateur de route.
+
+    Args:
+    - max_queries (int): Budget de la route, indépendant du volume de données renvoyé.
+    """
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+def route_budget(route):
+    """Budget déclaré par l'endpoint d'une route, None si aucun."""
+    return getattr(getattr(route, "endpoint", None), "query_budget", None)
+
+
+def check_query_budget(stats, method: str, strict: bool):
+    budget = route_budget(stats.scope.get("route"))
+    if budget is None or stats.db_count <= budget:
+        return
+    error = QueryBudgetExceeded(method, stats.route(), budget, stats.db_count, stats.statements)
+    if strict:
+        raise error
+    logger.warning("%s", error)
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware ASGI comparant, en fin de requête, le nombre de requêtes SQL compté par
+    MetricsMiddleware (qui doit l'englober) au budget de la route.
+
+    strict=None suit QUERY_BUDGET_STRICT, lue à chaque requête.
+    """
+
+    def __init__(self, app, strict: bool = None):
+        self.app = app
+        self.strict = strict
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        stats = request_stats.get()
+        if scope["type"] == "http" and stats is not None:
+            check_query_budget(stats, scope["method"], QUERY_BUDGET_STRICT if self.strict is None else self.strict)
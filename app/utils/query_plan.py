@@ -0,0 +1,62 @@
+import re
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# SQLite : "SCAN logs" sans "USING ... INDEX" = parcours complet de la table
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+# SQLite : sous-requête matérialisée, dont le parcours ne lit aucune table
+SQLITE_DERIVED = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+
+
+@contextmanager
+def capture_statements(*engines):
+    """Enregistre les requêtes (sql, paramètres) envoyées au driver par les engines donnés."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    sync_engines = [getattr(engine, "sync_engine", engine) for engine in engines]
+    for engine in sync_engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for engine in sync_engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(connection, statement: str, parameters=()) -> list:
+    """Plan d'exécution d'une requête, sous forme de dicts (une entrée par étape)."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "mysql":
+        prefix = "EXPLAIN "
+    else:
+        raise NotImplementedError(f"EXPLAIN not supported for dialect {dialect}")
+    result = connection.exec_driver_sql(prefix + statement, parameters)
+    return [dict(row._mapping) for row in result]
+
+
+def full_scans(connection, statement: str, parameters=()) -> list:
+    """
+    Tables lues intégralement par la requête, d'après son plan d'exécution.
+
+    Le parcours d'une sous-requête matérialisée (SQLite "MATERIALIZE anon_1", MySQL
+    "<derived2>") n'est pas compté : les tables qu'elle lit ont leurs propres étapes.
+    """
+    tables = []
+    derived = set()
+    for step in explain(connection, statement, parameters):
+        if connection.dialect.name == "sqlite":
+            match = SQLITE_DERIVED.match(step["detail"])
+            if match:
+                derived.add(match.group(1))
+            match = SQLITE_FULL_SCAN.match(step["detail"])
+            if match and match.group(1) not in derived:
+                tables.append(match.group(1))
+        elif step["type"] == "ALL" and not (step["table"] or "").startswith("<derived"):
+            tables.append(step["table"])
+    return tables
@@ -0,0 +1,260 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from fastapi import HTTPException, Request
+from app.database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+from app.dependencies import get_token_subject
+from app.utils.serialization import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# "memory" : compteurs propres au worker ; "redis://host:6379/0" : compteurs partagés entre workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# Nombre de seaux gardés par le backend mémoire (les moins récents sont oubliés, donc pleins)
+RATE_LIMIT_BUCKETS = int(os.getenv("RATE_LIMIT_BUCKETS", "100000"))
+# Budgets par route, au format "<jetons>/<second|minute|hour>"
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "10/minute")
+RATE_LIMIT_SIGNUP = os.getenv("RATE_LIMIT_SIGNUP", "5/minute")
+RATE_LIMIT_WRITES = os.getenv("RATE_LIMIT_WRITES", "120/minute")
+# Requêtes traitées en même temps par le worker ; par défaut la taille maximale du pool de connexions
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+# Sondes jamais délestées : un worker chargé doit rester visible comme vivant
+SHEDDING_EXEMPT_PATHS = ("/healthz", "/readyz", "/metrics")
+
+RATE_UNITS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_rate(rate: str) -> tuple:
+    """
+    "10/minute" -> (capacité du seau, jetons rendus par seconde).
+
+    Args:
+    - rate (str): Nombre de requêtes autorisées par unité de temps.
+
+    Returns:
+    - tuple: (capacity, refill_rate) ; la capacité est aussi la rafale maximale.
+    """
+    count, _, unit = rate.partition("/")
+    try:
+        capacity = int(count)
+        period = RATE_UNITS[unit.strip().lower()]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate {rate!r}, expected '<count>/<second|minute|hour>'")
+    if capacity <= 0:
+        raise ValueError(f"Invalid rate {rate!r}, count must be positive")
+    return capacity, capacity / period
+
+
+def take_token(tokens: float, updated_at: float, now: float, capacity: int, refill_rate: float, cost: float = 1.0) -> tuple:
+    """
+    Seau à jetons : rend les jetons accumulés depuis updated_at puis en retire cost.
+
+    Returns:
+    - tuple: (jetons restants, horodatage, secondes à attendre ; 0 si la requête passe).
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+    if tokens >= cost:
+        return tokens - cost, now, 0.0
+    return tokens, now, (cost - tokens) / refill_rate
+
+
+class MemoryBackend:
+    """Seaux en mémoire du worker, sûrs entre threads ; chaque worker applique le budget séparément."""
+
+    def __init__(self, maxsize: int = RATE_LIMIT_BUCKETS):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: int, refill_rate: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens, updated_at, retry_after = take_token(tokens, updated_at, now, capacity, refill_rate, cost)
+            self._buckets[key] = (tokens, updated_at)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+# Même calcul que take_token, exécuté atomiquement par Redis (horloge du serveur, commune aux workers)
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / refill_rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class SharedBackend:
+    """
+    Seaux partagés entre workers, tenus par un client exposant `eval` comme redis.asyncio
+    (script Lua TOKEN_BUCKET_SCRIPT). Un seau expire une fois rempli.
+    """
+
+    def __init__(self, client, prefix: str = "rate-limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, capacity: int, refill_rate: float, cost: float = 1.0) -> float:
+        result = await self.client.eval(TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, capacity, refill_rate, cost)
+        return float(result)
+
+
+def create_backend(url: str):
+    """Backend désigné par RATE_LIMIT_BACKEND."""
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis.asyncio as redis_asyncio  # dépendance optionnelle
+        except ImportError:
+            raise RuntimeError(f"RATE_LIMIT_BACKEND={url} requires the redis package")
+        return SharedBackend(redis_asyncio.from_url(url))
+    raise ValueError(f"Unsupported RATE_LIMIT_BACKEND {url!r}")
+
+
+rate_limit_backend = create_backend(RATE_LIMIT_BACKEND)
+
+
+class RateLimitKey(str, Enum):
+    IP = "ip"
+    SUBJECT = "subject"
+    IP_AND_SUBJECT = "ip+subject"
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def token_subject(request: Request):
+    """Sujet du token (email) sans accès à la base ; None sans token valide."""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    try:
+        return get_token_subject(authorization)
+    except HTTPException:
+        return None
+
+
+class RateLimit:
+    """
+    Dépendance FastAPI limitant une route (ou un groupe de routes partageant name) avec un
+    seau à jetons : rate requêtes par période, en rafale au plus. Au-delà, 429 avec Retry-After.
+
+    key choisit le compteur : adresse IP du client, sujet du token (par IP sans token valide),
+    ou les deux (chaque compteur doit avoir un jeton). Si le backend est injoignable, la
+    requête passe.
+    """
+
+    def __init__(self, name: str, rate: str, key: RateLimitKey = RateLimitKey.IP, backend=None):
+        self.name = name
+        self.capacity, self.refill_rate = parse_rate(rate)
+        self.key = key
+        self.backend = backend
+
+    def bucket_keys(self, request: Request) -> list:
+        ip_key = f"{self.name}:ip:{client_ip(request)}"
+        if self.key == RateLimitKey.IP:
+            return [ip_key]
+        subject = token_subject(request)
+        subject_keys = [f"{self.name}:sub:{subject}"] if subject else []
+        if self.key == RateLimitKey.SUBJECT:
+            return subject_keys or [ip_key]
+        return [ip_key] + subject_keys
+
+    async def __call__(self, request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        backend = self.backend or rate_limit_backend
+        for key in self.bucket_keys(request):
+            try:
+                retry_after = await backend.take(key, self.capacity, self.refill_rate)
+            except Exception as e:
+                logger.warning("Rate limit backend unavailable, request allowed: %s", e)
+                return
+            if retry_after > 0:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many requests, please retry later",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+
+# Budgets des routes : connexion et inscription par IP (hachage bcrypt), écritures par utilisateur
+login_rate_limit = RateLimit("login", RATE_LIMIT_LOGIN, RateLimitKey.IP)
+signup_rate_limit = RateLimit("signup", RATE_LIMIT_SIGNUP, RateLimitKey.IP)
+write_rate_limit = RateLimit("writes", RATE_LIMIT_WRITES, RateLimitKey.SUBJECT)
+
+
+class ConcurrencyLimiter:
+    """Compteur des requêtes en cours du worker (boucle d'évènements : pas de verrou nécessaire)."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if 0 < self.max_concurrent <= self.in_flight:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    def status(self) -> dict:
+        return {"in_flight": self.in_flight, "max_concurrent": self.max_concurrent, "rejected": self.rejected}
+
+
+concurrency_limiter = ConcurrencyLimiter()
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware ASGI : au-delà de MAX_CONCURRENT_REQUESTS requêtes en cours, répond 503 avec
+    Retry-After sans entrer dans l'application, plutôt que de faire attendre la requête
+    sur le pool de connexions (DB_POOL_TIMEOUT) et de ralentir toutes les autres.
+    """
+
+    def __init__(self, app, limiter: ConcurrencyLimiter = None, exempt_paths: tuple = SHEDDING_EXEMPT_PATHS):
+        self.app = app
+        self.limiter = limiter or concurrency_limiter
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.try_acquire():
+            response = FastJSONResponse(
+                status_code=503, content={"detail": "Server busy, please retry later"}, headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
@@ -0,0 +1,165 @@
+import itertools
+import os
+import threading
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import SessionLocal, AsyncSessionLocal, pool_options, to_async_url
+from app.utils.cache import TTLCache
+from app.utils.slow_queries import slow_query_log
+
+# Réplicas en lecture seule, séparés par des virgules (vide : toutes les lectures vont au primaire)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Intervalle entre deux vérifications (SELECT 1) d'un réplica, en secondes
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "10"))
+# Après une écriture, les lectures de l'utilisateur restent sur le primaire pendant cette durée (retard de réplication)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Utilisateurs ayant écrit récemment ; propre au processus
+recent_writers = TTLCache(maxsize=int(os.getenv("RECENT_WRITERS_SIZE", "10000")), ttl=READ_YOUR_WRITES_SECONDS)
+
+
+class Replica:
+    """Un réplica : moteurs sync et async, fabriques de sessions et état de santé."""
+
+    def __init__(self, url: str, async_url: str = None):
+        self.url = url
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args, **pool_options(url))
+        async_url = async_url or to_async_url(url)
+        self.async_engine = create_async_engine(async_url, **pool_options(async_url))
+        slow_query_log.install(self.engine)
+        slow_query_log.install(self.async_engine.sync_engine, explain_engine=self.engine)
+        # info["read_only"] : toute écriture sur ces sessions est refusée (voir reject_replica_writes)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, info={"read_only": True},
+        )
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False, info={"read_only": True},
+        )
+        self.healthy = True
+        self.checked_at = float("-inf")
+        self.failures = 0
+
+    def needs_check(self) -> bool:
+        return time.monotonic() - self.checked_at >= REPLICA_HEALTH_INTERVAL
+
+    def record_check(self, healthy: bool):
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+        if not healthy:
+            self.failures += 1
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            self.record_check(True)
+        except SQLAlchemyError:
+            self.record_check(False)
+        return self.healthy
+
+    async def check_async(self) -> bool:
+        try:
+            async with self.async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            self.record_check(True)
+        except (SQLAlchemyError, OSError):
+            self.record_check(False)
+        return self.healthy
+
+    def status(self) -> dict:
+        return {"healthy": self.healthy, "failures": self.failures}
+
+
+class ReplicaSet:
+    """
+    Choix des réplicas en tourniquet, en sautant ceux en échec.
+
+    Chaque réplica est vérifié au plus une fois par REPLICA_HEALTH_INTERVAL, au moment où
+    il est choisi ; un réplica en échec est revérifié au même rythme. None : aucun réplica
+    disponible, la lecture va au primaire.
+    """
+
+    def __init__(self, urls):
+        self.replicas = [Replica(url) for url in urls]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _rotation(self) -> list:
+        with self._lock:
+            start = next(self._counter) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def pick(self):
+        if not self.replicas:
+            return None
+        for replica in self._rotation():
+            if replica.needs_check():
+                replica.check()
+            if replica.healthy:
+                return replica
+        return None
+
+    async def pick_async(self):
+        if not self.replicas:
+            return None
+        for replica in self._rotation():
+            if replica.needs_check():
+                await replica.check_async()
+            if replica.healthy:
+                return replica
+        return None
+
+    def status(self) -> list:
+        return [replica.status() for replica in self.replicas]
+
+    async def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+            await replica.async_engine.dispose()
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+def wrote_recently(user_id: int) -> bool:
+    """L'utilisateur a écrit il y a moins de READ_YOUR_WRITES_SECONDS : ses lectures restent sur le primaire."""
+    return recent_writers.get(user_id) is not None
+
+
+def read_session_factory(user_id: int):
+    """Fabrique de sessions de lecture : un réplica sain, sinon le primaire."""
+    replica = None if wrote_recently(user_id) else replica_set.pick()
+    return replica.SessionLocal if replica else SessionLocal
+
+
+async def read_async_session_factory(user_id: int):
+    """Équivalent async de read_session_factory."""
+    replica = None if wrote_recently(user_id) else await replica_set.pick_async()
+    return replica.AsyncSessionLocal if replica else AsyncSessionLocal
+
+
+@event.listens_for(Session, "before_flush")
+def reject_replica_writes(session, flush_context, instances):
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Write attempted on a read replica session")
+
+
+@event.listens_for(Session, "after_flush")
+def collect_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def record_writer(session):
+    # user_id est posé sur la session par get_current_user / get_current_user_async
+    if session.info.pop("has_writes", False) and session.info.get("user_id") is not None:
+        recent_writers.set(session.info["user_id"], True)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_writes(session):
+    session.info.pop("has_writes", None)
@@ -0,0 +1,60 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+
+# Poids de chaque champ dans le score : un mot du titre compte trois fois plus
+FIELD_WEIGHTS = {"title": 3, "description": 1, "practical_info": 1}
+# Occurrences d'un mot comptées par champ : répéter un mot n'améliore plus le rang au-delà
+MAX_OCCURRENCES = 3
+# Longueur de la colonne trip_terms.term ; les mots plus longs sont tronqués
+MAX_TERM_LENGTH = 50
+# Mots de la requête au-delà desquels les suivants sont ignorés (chacun ajoute une liste de postings)
+MAX_QUERY_TERMS = 8
+# Correspondances classées au plus par recherche : les postings du mot le plus rare sont lus par
+# poids décroissant et la lecture s'arrête là, même pour un mot présent dans des millions de trips
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({
+    "au", "aux", "avec", "ce", "ces", "dans", "de", "des", "du", "en", "et", "la", "le", "les", "leur",
+    "ou", "par", "pas", "pour", "sa", "se", "ses", "son", "sur", "un", "une",
+    "an", "and", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with",
+})
+
+
+def normalize(text: str) -> str:
+    """Minuscules sans accents : "Pêche en Mer" -> "peche en mer"."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> list:
+    """Mots indexables d'un texte, dans l'ordre, sans mots vides ni lettres isolées."""
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_PATTERN.findall(normalize(text or ""))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def term_weights(fields: dict) -> dict:
+    """
+    Poids de chaque mot pour un document.
+
+    Args:
+    - fields (dict): Texte de chaque champ de FIELD_WEIGHTS (None accepté).
+
+    Returns:
+    - dict: mot -> somme sur les champs de poids du champ x occurrences (plafonnées).
+    """
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for term, count in Counter(tokenize(fields.get(field))).items():
+            weights[term] += weight * min(count, MAX_OCCURRENCES)
+    return dict(weights)
+
+
+def query_terms(q: str) -> list:
+    """Mots distincts d'une requête de recherche, dans l'ordre, MAX_QUERY_TERMS au plus."""
+    return list(dict.fromkeys(tokenize(q)))[:MAX_QUERY_TERMS]
@@ -1,8 +1,76 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import bcrypt
+from fastapi import HTTPException
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+# Coût bcrypt (2^rounds itérations) utilisé pour les nouveaux hashs
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Nombre de processus dédiés au hachage
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Nombre de demandes pouvant attendre un processus libre avant de répondre 503
+HASH_POOL_QUEUE_DEPTH = int(os.getenv("HASH_POOL_QUEUE_DEPTH", "16"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+def hash_password(password: str, rounds: int = None) -> str:
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Vrai si le hash a été calculé avec un coût différent de BCRYPT_ROUNDS."""
+    try:
+        # Format : $2b$<rounds>$<salt+hash>
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS)
+        return _executor
+
+def shutdown_hash_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+async def run_in_hash_pool(func, *args):
+    """
+    Exécute func dans le pool de processus de hachage sans bloquer la boucle d'événements.
+
+    Répond 503 immédiatement si tous les processus sont occupés et que la file
+    d'attente est pleine, plutôt que d'accumuler les requêtes.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= HASH_POOL_WORKERS + HASH_POOL_QUEUE_DEPTH:
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please retry later",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await run_in_hash_pool(hash_password, password, BCRYPT_ROUNDS)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_in_hash_pool(verify_password, plain_password, hashed_password)
@@ -0,0 +1,292 @@
+import json
+import os
+import time as clock
+from datetime import date, datetime, time
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.boat import Boat, equipment_to_mask
+from app.models.trip import (
+    Trip, TripDateRange, TripScheduleSlot, TripTerm, build_date_ranges, build_schedule_slots, build_search_terms,
+)
+from app.models.reservation import Reservation
+from app.models.log import Log
+from app.models.species import SpeciesAlias, build_species, resolve_species
+from app.utils.geo import encode_geohash
+from app.utils.inventory import rebuild_seat_inventory
+from app.utils.species import DEFAULT_SPECIES, species_key
+
+# Nombre de lignes insérées par requête (executemany) et par transaction
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "1000"))
+# Taille des blocs lus sur disque lors du parcours d'un tableau JSON
+READ_CHUNK_SIZE = 64 * 1024
+
+# Ordre de chargement imposé par les clés étrangères : (nom de fichier, modèle, clé unique)
+SEED_FILES = [
+    ("users", User, "id"),
+    ("boats", Boat, "id"),
+    ("trips", Trip, "id"),
+    ("reservations", Reservation, "id"),
+    ("logs", Log, "id"),
+]
+
+
+def find_seed_file(data_dir: str, name: str):
+    """Cherche name.ndjson, name.jsonl puis name.json ; None si aucun n'existe."""
+    for extension in (".ndjson", ".jsonl", ".json"):
+        path = os.path.join(data_dir, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _iter_json_array(f):
+    """Parcourt un tableau JSON élément par élément sans charger tout le fichier."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Seed file must contain a JSON array")
+    position = 1
+    eof = False
+    while True:
+        # Saute les blancs et les virgules entre deux éléments
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","):
+            position += 1
+        if position < len(buffer):
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Un nombre en fin de bloc peut être tronqué : on relit avec plus de données
+                if end < len(buffer) or eof:
+                    yield item
+                    position = end
+                    continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON array")
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iter_records(path: str):
+    """Lit un fichier NDJSON (une ligne par objet) ou un tableau JSON, de façon incrémentale."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def chunked(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _coerce(column, value):
+    """Convertit les chaînes ISO du JSON vers les types attendus par les colonnes Date / DateTime / Time."""
+    if not isinstance(value, str):
+        return value
+    column_type = column.type.python_type
+    if column_type is datetime:
+        return datetime.fromisoformat(value)
+    if column_type is date:
+        return datetime.fromisoformat(value).date() if len(value) > 10 else date.fromisoformat(value)
+    if column_type is time:
+        return time.fromisoformat(value)
+    return value
+
+
+def prepare_rows(model, records: list) -> list:
+    """Convertit les objets JSON en lignes prêtes pour un insert Core et calcule les colonnes dérivées."""
+    columns = model.__table__.columns
+    relationships = model.__mapper__.relationships.keys()
+    rows = []
+    for record in records:
+        # Les relations vides ("boats": []) sont tolérées, les objets imbriqués ne le sont pas
+        record = {key: value for key, value in record.items() if not (key in relationships and not value)}
+        if model is Boat and "equipment" in record:
+            # Liste ou ancien format "GPS,RADIO", stocké en masque de bits
+            record["equipment_mask"] = equipment_to_mask(record.pop("equipment"))
+        unknown = set(record) - set(columns.keys())
+        if unknown:
+            raise ValueError(f"Unknown {model.__tablename__} column(s): {', '.join(sorted(unknown))}")
+        row = {key: _coerce(columns[key], value) for key, value in record.items()}
+        if model is Boat and row.get("latitude") is not None and row.get("longitude") is not None:
+            row.setdefault("geohash", encode_geohash(row["latitude"], row["longitude"]))
+        rows.append(row)
+    return rows
+
+
+def child_rows(model, rows: list) -> dict:
+    """Lignes des tables indexées dérivées d'un lot (calendrier et index de recherche des trips)."""
+    if model is not Trip:
+        return {}
+    date_ranges = []
+    schedule_slots = []
+    search_terms = []
+    for row in rows:
+        date_ranges += [
+            {"trip_id": row["id"], "start": item.start, "end": item.end}
+            for item in build_date_ranges(row.get("dates"), row["id"])
+        ]
+        schedule_slots += [
+            {"trip_id": row["id"], "departure": item.departure, "arrival": item.arrival}
+            for item in build_schedule_slots(row.get("schedules"), row["id"])
+        ]
+        search_terms += [
+            {"trip_id": row["id"], "term": item.term, "weight": item.weight}
+            for item in build_search_terms(row, row["id"])
+        ]
+    return {TripDateRange: date_ranges, TripScheduleSlot: schedule_slots, TripTerm: search_terms}
+
+
+def _execute_many(db: Session, model, rows: list):
+    """insert Core en executemany, un appel par jeu de colonnes présent dans le lot."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        db.execute(insert(model), group)
+
+
+def bulk_load(db: Session, model, records, key: str = "id", batch_size: int = None) -> dict:
+    """
+    Insère des enregistrements par lots, en ignorant ceux dont la clé existe déjà.
+
+    Une seule requête IN par lot détecte les clés existantes ; chaque lot est inséré
+    en executemany puis validé.
+
+    Args:
+    - db (Session): Session de base de données.
+    - model: Modèle SQLAlchemy cible.
+    - records: Itérable de dicts (par exemple iter_records).
+    - key (str): Colonne servant à détecter les doublons.
+    - batch_size (int): Taille des lots, SEED_BATCH_SIZE par défaut.
+
+    Returns:
+    - dict: Lignes insérées, ignorées, durée (s) et débit (lignes/s).
+    """
+    key_column = getattr(model, key)
+    inserted = 0
+    skipped = 0
+    start = clock.perf_counter()
+    for batch in chunked(records, batch_size or SEED_BATCH_SIZE):
+        keys = {record[key] for record in batch}
+        existing = set(db.execute(select(key_column).where(key_column.in_(keys))).scalars())
+        seen = set()
+        fresh = []
+        for record in batch:
+            if record[key] in existing or record[key] in seen:
+                skipped += 1
+                continue
+            seen.add(record[key])
+            fresh.append(record)
+        if fresh:
+            rows = prepare_rows(model, fresh)
+            _execute_many(db, model, rows)
+            for child_model, children in child_rows(model, rows).items():
+                if children:
+                    _execute_many(db, child_model, children)
+            db.commit()
+            inserted += len(rows)
+    elapsed = clock.perf_counter() - start
+    return {
+        "inserted": inserted,
+        "skipped": skipped,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(inserted / elapsed) if elapsed > 0 else inserted,
+    }
+
+
+def backfill_boat_geohashes(db: Session):
+    """Calcule le geohash des bateaux positionnés qui n'en ont pas encore."""
+    for boat in db.query(Boat).filter(Boat.geohash.is_(None), Boat.latitude.isnot(None)).all():
+        boat.update_geohash()
+    db.commit()
+
+
+def backfill_trip_calendars(db: Session):
+    """Crée les lignes trip_dates / trip_schedules des trips qui n'en ont pas encore."""
+    for trip in db.query(Trip).filter(~Trip.date_ranges.any()).all():
+        db.add_all(build_date_ranges(trip.dates, trip.id))
+    for trip in db.query(Trip).filter(~Trip.schedule_slots.any()).all():
+        db.add_all(build_schedule_slots(trip.schedules, trip.id))
+    db.commit()
+
+
+def backfill_trip_search_terms(db: Session):
+    """Indexe pour /search les trips qui n'ont pas encore de lignes trip_terms."""
+    for trip in db.query(Trip).filter(~Trip.search_terms.any()).all():
+        db.add_all(build_search_terms(trip, trip.id))
+    db.commit()
+
+
+def seed_species_catalog(db: Session):
+    """Ajoute les espèces de DEFAULT_SPECIES dont aucun nom ni alias n'est encore au catalogue."""
+    existing = set(db.execute(select(SpeciesAlias.key)).scalars())
+    for name, scientific_name, aliases in DEFAULT_SPECIES:
+        keys = {species_key(alias) for alias in (name, *aliases)}
+        if not keys & existing:
+            db.add(build_species(name, scientific_name, aliases, curated=True))
+            existing |= keys
+    db.commit()
+
+
+def backfill_log_species(db: Session):
+    """
+    Rattache à une espèce les pages du carnet qui n'en ont pas : une requête par nom distinct,
+    fish_name étant remplacé par le nom canonique.
+    """
+    for fish_name in db.execute(select(Log.fish_name).where(Log.species_id.is_(None)).distinct()).scalars().all():
+        try:
+            species_id, name = resolve_species(db, fish_name)
+        except ValueError:
+            continue
+        db.execute(
+            update(Log).where(Log.species_id.is_(None), Log.fish_name == fish_name).values(species_id=species_id, fish_name=name),
+            execution_options={"synchronize_session": False},
+        )
+    db.commit()
+
+
+def seed_database(db: Session, data_dir: str = "data", batch_size: int = None) -> dict:
+    """
+    Charge tous les fichiers de seed présents dans data_dir, dans l'ordre des dépendances,
+    puis complète les données dérivées (geohash, calendrier, espèces, registre des places).
+
+    Returns:
+    - dict: Rapport de bulk_load par fichier chargé.
+    """
+    report = {}
+    seed_species_catalog(db)
+    for name, model, key in SEED_FILES:
+        path = find_seed_file(data_dir, name)
+        if path is None:
+            continue
+        report[name] = bulk_load(db, model, iter_records(path), key, batch_size)
+        stats = report[name]
+        print(
+            f"📥 {name} : {stats['inserted']} insérés, {stats['skipped']} ignorés "
+            f"en {stats['seconds']}s ({stats['rows_per_second']} lignes/s)"
+        )
+    # Lignes déjà présentes avant le chargement (anciennes bases)
+    backfill_boat_geohashes(db)
+    backfill_trip_calendars(db)
+    backfill_trip_search_terms(db)
+    backfill_log_species(db)
+    rebuild_seat_inventory(db)
+    return report
@@ -0,0 +1,55 @@
+import os
+from functools import lru_cache
+from typing import List
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.utils.metrics import timed_serialization
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+# Chemin rapide (TypeAdapter.dump_json, orjson) activé explicitement ; sinon encodage historique de FastAPI
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=None)
+def get_adapter(schema, many: bool = True) -> TypeAdapter:
+    """TypeAdapter compilé une seule fois par schéma (liste ou objet seul)."""
+    return TypeAdapter(List[schema] if many else schema)
+
+
+def dump_json(data, schema) -> bytes:
+    """Valide des lignes ORM contre schema et les sérialise directement en JSON (pydantic-core)."""
+    adapter = get_adapter(schema, isinstance(data, list))
+    with timed_serialization():
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(data, schema, response: Response = None) -> Response:
+    """
+    Réponse des endpoints de liste.
+
+    Avec FAST_SERIALIZATION, une seule passe validation + encodage, sans dict intermédiaire
+    ni jsonable_encoder ; sinon le chemin historique (validation puis jsonable_encoder et json.dumps).
+
+    Les en-têtes posés sur la réponse injectée (X-Next-Cursor) sont reportés.
+    """
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"} if response else None
+    if FAST_SERIALIZATION:
+        return Response(content=dump_json(data, schema), media_type="application/json", headers=headers)
+    adapter = get_adapter(schema, isinstance(data, list))
+    with timed_serialization():
+        return JSONResponse(content=jsonable_encoder(adapter.validate_python(data, from_attributes=True)), headers=headers)
+
+
+class FastJSONResponse(JSONResponse):
+    """Réponse par défaut des endpoints sans response_model, encodée par orjson s'il est installé et FAST_SERIALIZATION actif."""
+
+    def render(self, content) -> bytes:
+        if orjson is None or not FAST_SERIALIZATION:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
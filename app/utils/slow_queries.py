@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import event
+from app.utils.metrics import request_stats
+from app.utils.query_plan import explain
+
+# Seuil (ms) au-delà duquel une requête SQL est enregistrée
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Nombre d'entrées gardées en mémoire (les plus anciennes sont écartées)
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "100"))
+# Fichier NDJSON recevant aussi les entrées (vide : mémoire seulement)
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "")
+# Capture du plan d'exécution des SELECT lents
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+
+# Option d'exécution posée sur la connexion de l'EXPLAIN : il n'est pas lui-même enregistré
+SKIP_OPTION = "skip_slow_query_log"
+# Paramètres conservés en clair ; les autres (chaînes, dates, binaires) sont masqués
+CLEAR_TYPES = (bool, int, float, type(None))
+
+
+def redact_parameters(parameters):
+    """Paramètres liés sans leurs valeurs textuelles (emails, motifs de recherche, hashs...)."""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    if isinstance(parameters, CLEAR_TYPES):
+        return parameters
+    return f"<{type(parameters).__name__}>"
+
+
+def explainable(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+class SlowQueryLog:
+    """
+    Enregistreur des requêtes SQL plus lentes que threshold_ms, branché sur les évènements
+    des engines (install).
+
+    Les entrées vont dans un tampon circulaire de maxsize entrées et, si log_file est
+    défini, dans un fichier NDJSON. Le plan d'exécution est pris dans un thread dédié,
+    sur une autre connexion, sans rallonger la requête HTTP ; au-delà de maxsize plans
+    en attente, l'entrée est gardée sans plan.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, maxsize: int = SLOW_QUERY_BUFFER_SIZE,
+                 log_file: str = SLOW_QUERY_LOG_FILE, capture_plans: bool = SLOW_QUERY_EXPLAIN):
+        self.threshold_ms = threshold_ms
+        self.maxsize = maxsize
+        self.log_file = log_file
+        self.capture_plans = capture_plans
+        self.recorded = 0
+        self._entries = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = []
+
+    def install(self, engine, explain_engine=None):
+        """
+        Écoute les requêtes d'un engine sync (pour un AsyncEngine : son sync_engine).
+
+        Args:
+        - engine: Engine dont les requêtes sont chronométrées.
+        - explain_engine: Engine sync utilisé pour l'EXPLAIN (par défaut engine ; un
+          sync_engine d'AsyncEngine ne peut pas ouvrir de connexion hors de la boucle).
+        """
+        explain_engine = explain_engine or engine
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.get("slow_query_started_at")
+            if not started:
+                return
+            elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+            if elapsed_ms >= self.threshold_ms and not (context is not None and context.execution_options.get(SKIP_OPTION)):
+                self.record(explain_engine, statement, parameters, elapsed_ms, executemany)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(self, explain_engine, statement: str, parameters, elapsed_ms: float, executemany: bool = False):
+        stats = request_stats.get()
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed_ms, 3),
+            "route": stats.route() if stats is not None else None,
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "plan": None,
+            "plan_error": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+            self._pending = [future for future in self._pending if not future.done()]
+            if self.capture_plans and not executemany and explainable(statement) and len(self._pending) < self.maxsize:
+                self._pending.append(self._get_executor().submit(self._explain, explain_engine, entry, statement, parameters))
+                return
+        self._write(entry)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        return self._executor
+
+    def _explain(self, explain_engine, entry: dict, statement: str, parameters):
+        try:
+            with explain_engine.connect().execution_options(**{SKIP_OPTION: True}) as connection:
+                plan = explain(connection, statement, parameters)
+            with self._lock:
+                entry["plan"] = plan
+        except Exception as e:
+            with self._lock:
+                entry["plan_error"] = str(e)
+        self._write(entry)
+
+    def _write(self, entry: dict):
+        if not self.log_file:
+            return
+        with self._lock:
+            line = json.dumps(entry, default=str)
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def entries(self, limit: int = None) -> list:
+        """Entrées du tampon, de la plus récente à la plus ancienne."""
+        with self._lock:
+            entries = [dict(entry) for entry in reversed(self._entries)]
+        return entries[:limit] if limit is not None else entries
+
+    def wait(self, timeout: float = None):
+        """Attend la fin des EXPLAIN en cours (tests, arrêt du worker)."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result(timeout)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.recorded = 0
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,127 @@
+import bisect
+import os
+import re
+import threading
+import time
+from app.utils.search import normalize
+
+# Longueur des colonnes species.name, species_aliases.key et logs.fish_name
+MAX_SPECIES_NAME_LENGTH = 100
+# Durée de vie de l'index d'autocomplétion : borne le retard d'un worker sur les changements faits par un autre
+SPECIES_INDEX_TTL = float(os.getenv("SPECIES_INDEX_TTL", "60"))
+
+KEY_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Catalogue initial : (nom canonique, nom scientifique, alias)
+DEFAULT_SPECIES = [
+    ("Bar", "Dicentrarchus labrax", ["Loup", "Loup de mer"]),
+    ("Bonite", "Sarda sarda", []),
+    ("Calamar", "Loligo vulgaris", ["Encornet"]),
+    ("Chinchard", "Trachurus trachurus", []),
+    ("Congre", "Conger conger", []),
+    ("Denti", "Dentex dentex", []),
+    ("Dorade royale", "Sparus aurata", ["Daurade royale", "Daurade", "Dorade"]),
+    ("Espadon", "Xiphias gladius", []),
+    ("Liche amie", "Lichia amia", ["Liche"]),
+    ("Lieu jaune", "Pollachius pollachius", ["Lieu"]),
+    ("Maigre", "Argyrosomus regius", []),
+    ("Maquereau", "Scomber scombrus", []),
+    ("Mérou brun", "Epinephelus marginatus", ["Mérou"]),
+    ("Mulet", "Chelon labrosus", []),
+    ("Pagre", "Pagrus pagrus", []),
+    ("Poulpe", "Octopus vulgaris", ["Pieuvre"]),
+    ("Rouget de roche", "Mullus surmuletus", ["Rouget"]),
+    ("Sar commun", "Diplodus sargus", ["Sar"]),
+    ("Sardine", "Sardina pilchardus", []),
+    ("Seiche", "Sepia officinalis", []),
+    ("Sériole", "Seriola dumerili", ["Sériole couronnée"]),
+    ("Thon rouge", "Thunnus thynnus", ["Thon"]),
+]
+
+
+def species_key(name: str) -> str:
+    """Clé de comparaison d'un nom d'espèce : "  Loup de  MER " -> "loup de mer"."""
+    return " ".join(KEY_PATTERN.findall(normalize(name or "")))[:MAX_SPECIES_NAME_LENGTH]
+
+
+def display_name(name: str) -> str:
+    """Nom affiché d'une espèce ajoutée depuis un carnet : espaces normalisés, majuscule initiale."""
+    name = " ".join(name.split())[:MAX_SPECIES_NAME_LENGTH]
+    return name[:1].upper() + name[1:]
+
+
+class SpeciesIndex:
+    """
+    Index d'autocomplétion en mémoire : liste triée des clés (noms canoniques, alias et
+    chacun de leurs mots), parcourue par recherche dichotomique sur le préfixe.
+
+    Les entrées sont lues par loader() au premier appel après invalidate() ou après
+    SPECIES_INDEX_TTL secondes ; la liste est remplacée d'un bloc, les lectures ne
+    prennent pas de verrou.
+    """
+
+    def __init__(self, loader=None, ttl: float = SPECIES_INDEX_TTL):
+        self.loader = loader
+        self.ttl = ttl
+        self.refreshes = 0
+        # (clés triées, entrées) remplacés ensemble
+        self._index = ([], [])
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def build(self, rows):
+        """
+        Remplace l'index.
+
+        Args:
+        - rows: Itérable de (clé de l'alias, nom de l'alias, id de l'espèce, nom canonique).
+        """
+        items = []
+        for key, alias, species_id, name in rows:
+            words = key.split(" ")
+            matched = None if alias == name else alias
+            for position in range(len(words)):
+                # "rouge" trouve "Thon rouge" ; l'entrée du mot de tête passe avant les autres
+                items.append((" ".join(words[position:]), position, name, species_id, matched))
+        items.sort(key=lambda item: item[:2])
+        self._index = ([item[0] for item in items], [item[1:] for item in items])
+
+    def invalidate(self):
+        self._generation += 1
+        self._expires_at = 0.0
+
+    def refresh(self, db):
+        """Recharge l'index depuis la base s'il est périmé (un seul thread recharge)."""
+        if self._expires_at > time.monotonic():
+            return
+        with self._lock:
+            if self._expires_at > time.monotonic():
+                return
+            expires_at = time.monotonic() + self.ttl
+            generation = self._generation
+            self.build(self.loader(db))
+            # Invalidé pendant la lecture : l'index reste périmé et sera relu à l'appel suivant
+            if generation == self._generation:
+                self._expires_at = expires_at
+            self.refreshes += 1
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """
+        Espèces dont un mot du nom canonique ou d'un alias commence par prefix.
+
+        Returns:
+        - list: dicts id, name et alias (alias ayant correspondu, None pour le nom canonique),
+          une entrée par espèce, dans l'ordre alphabétique des clés.
+        """
+        key = species_key(prefix)
+        if not key:
+            return []
+        keys, entries = self._index
+        results = {}
+        position = bisect.bisect_left(keys, key)
+        while position < len(keys) and keys[position].startswith(key) and len(results) < limit:
+            _, name, species_id, matched = entries[position]
+            results.setdefault(species_id, {"id": species_id, "name": name, "alias": matched})
+            position += 1
+        return list(results.values())
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark de la compression gzip des pages de liste.
+
+Pour chaque ressource, taille de page et niveau de compression, mesure sur le JSON
+produit par les endpoints /filter (app.utils.serialization.dump_json) :
+- les octets économisés et le ratio de compression ;
+- le temps CPU de compression (meilleur de --repeat), et le débit correspondant ;
+- la taille obtenue en compressant par blocs de --chunk-size avec Z_SYNC_FLUSH,
+  comme le fait CompressionMiddleware pour une StreamingResponse.
+
+Usage : python -m benchmarks.compression [--sizes 100 10000] [--levels 1 6 9] [--output resultats.json]
+"""
+import argparse
+import json
+import time
+import zlib
+from benchmarks.serialization import CASES
+from app.utils.serialization import dump_json
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def gzip_compress_chunked(body: bytes, level: int, chunk_size: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    parts = [
+        compressor.compress(body[start:start + chunk_size]) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for start in range(0, len(body), chunk_size)
+    ]
+    parts.append(compressor.flush())
+    return b"".join(parts)
+
+
+def cpu_ms(func, repeat: int) -> float:
+    """Meilleur temps CPU (ms) sur repeat exécutions."""
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        timings.append(time.process_time() - start)
+    return min(timings) * 1000
+
+
+def run(sizes, levels, repeat: int, chunk_size: int) -> list:
+    results = []
+    for name, factory, schema, _ in CASES:
+        for size in sizes:
+            body = dump_json(factory(size), schema)
+            for level in levels:
+                compressed = gzip_compress(body, level)
+                elapsed = cpu_ms(lambda: gzip_compress(body, level), repeat)
+                results.append({
+                    "resource": name,
+                    "rows": size,
+                    "level": level,
+                    "raw_kb": round(len(body) / 1024, 1),
+                    "gzip_kb": round(len(compressed) / 1024, 1),
+                    "saved_kb": round((len(body) - len(compressed)) / 1024, 1),
+                    "ratio": round(len(body) / len(compressed), 2),
+                    "cpu_ms": round(elapsed, 2),
+                    "mb_per_s": round(len(body) / 1024 / 1024 / (elapsed / 1000), 1) if elapsed else None,
+                    "chunked_kb": round(len(gzip_compress_chunked(body, level, chunk_size)) / 1024, 1),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024)
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.levels, args.repeat, args.chunk_size)
+    columns = list(results[0])
+    print(" ".join(f"{column:>10}" for column in columns))
+    for result in results:
+        print(" ".join(f"{str(result[column]):>10}" for column in columns))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Benchmark HTTP en processus de tous les routeurs.
+
+Charge des volumes configurables (utilisateurs, bateaux, sorties, réservations, logs)
+dans une base SQLite ou MySQL via le chargeur de seed, puis appelle chaque endpoint à
+travers le transport ASGI de httpx (sans réseau ni serveur), avec --concurrency
+requêtes simultanées. Pour chaque endpoint : latences p50 / p95 / p99, débit, erreurs
+et nombre moyen de requêtes SQL par appel.
+
+Les résultats sont enregistrés en JSON (--output) ; --compare affiche l'écart avec un
+fichier de résultats précédent.
+
+Usage : python -m benchmarks.endpoints [--database-url sqlite:////tmp/fisher_fans_bench.db] [--reset]
+        [--users 20] [--concurrency 10] [--requests 200] [--only boats.filter trips.filter]
+        [--output resultats.json] [--compare precedent.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+DEFAULT_DATABASE_URL = "sqlite:////tmp/fisher_fans_bench.db"
+PASSWORD = "bench-password"
+
+
+@dataclass
+class Scenario:
+    """Un endpoint appelé en boucle ; path et body reçoivent le contexte de seed et le numéro d'appel."""
+    name: str
+    method: str
+    path: Callable
+    body: Optional[Callable] = None
+    form: bool = False
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Percentile au rang le plus proche (values trié)."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def seed(args) -> dict:
+    """Crée le schéma et charge les volumes demandés ; retourne les identifiants utiles aux scénarios."""
+    # Imports différés : DATABASE_URL doit être fixée avant le premier import de app.database
+    from sqlalchemy import select, func
+    from app.auth import create_access_token
+    from app.database import Base, SessionLocal, engine
+    import app.main  # noqa: F401  (enregistre tous les modèles)
+    from app.models.boat import Boat
+    from app.models.log import Log
+    from app.models.reservation import Reservation
+    from app.models.trip import Trip
+    from app.models.user import User
+    from app.utils.inventory import rebuild_seat_inventory
+    from app.utils.security import hash_password
+    from app.utils.seed import backfill_log_species, bulk_load, seed_species_catalog
+
+    if args.reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    rng = random.Random(args.seed)
+    first_day = date.today() + timedelta(days=30)
+    password = hash_password(PASSWORD)
+
+    with SessionLocal() as db:
+        if db.execute(select(func.count()).select_from(User)).scalar():
+            raise SystemExit("La base contient déjà des données : relancer avec --reset")
+
+        users = [
+            {"id": i, "name": f"Bench {i}", "firstname": "User", "email": f"bench{i}@example.com",
+             "password": password, "status": "INDIVIDUAL", "role": "user", "boat_license": 100000 + i}
+            for i in range(1, args.users + 1)
+        ]
+        boats = []
+        for user in users:
+            for _ in range(args.boats_per_user):
+                boats.append({
+                    "id": len(boats) + 1, "name": f"Bateau {len(boats) + 1}", "description": "Bateau de pêche côtière",
+                    "brand": "Jeanneau", "fabrication_year": 2015, "photo_url": "boat.jpg", "license": "COASTAL",
+                    "boat_type": "OPEN", "equipment": rng.sample(["GPS", "RADIO", "FISHFINDER", "LADDER"], 2),
+                    "caution": 500.0, "nb_passenger": 6, "nb_seat": 6, "port": "Marseille",
+                    "latitude": 43.0 + rng.random(), "longitude": 5.0 + rng.random(),
+                    "motor": "DIESEL", "motor_power": 150, "owner_id": user["id"],
+                })
+        trips = []
+        for boat in boats:
+            for _ in range(args.trips_per_boat):
+                start = first_day + timedelta(days=rng.randrange(60))
+                trips.append({
+                    "id": len(trips) + 1, "title": f"Sortie {len(trips) + 1}", "description": "Sortie en mer",
+                    "practical_info": "Prévoir des vêtements chauds", "trip_type": "DAILY", "pricing_type": "PER_PERSON",
+                    "dates": [{"start": start.isoformat(), "end": (start + timedelta(days=7)).isoformat()}],
+                    "schedules": [{"departure": "06:00:00", "arrival": "12:00:00"}],
+                    "nb_passengers": 10000, "price": float(rng.randrange(20, 500)),
+                    "organizer_id": boat["owner_id"], "boat_id": boat["id"],
+                })
+        reservations = []
+        for trip in trips:
+            day = date.fromisoformat(trip["dates"][0]["start"])
+            for _ in range(args.reservations_per_trip):
+                reservations.append({
+                    "id": len(reservations) + 1, "trip_id": trip["id"], "user_id": rng.randrange(1, args.users + 1),
+                    "reservation_date": (day + timedelta(days=rng.randrange(7))).isoformat(),
+                    "nb_seats": 1, "total_price": trip["price"],
+                })
+        logs = [
+            {"id": i + 1, "fish_name": rng.choice(["Bar", "Daurade", "Maquereau", "Thon"]), "comment": "Belle prise",
+             "size": 20 + rng.random() * 40, "weight": rng.random() * 5, "location": "Calanques",
+             "catch_date": (date(2024, 1, 1) + timedelta(days=rng.randrange(365))).isoformat(),
+             "released": rng.random() < 0.5, "user_id": user["id"]}
+            for i, user in enumerate(user for user in users for _ in range(args.logs_per_user))
+        ]
+
+        print("Chargement des données :")
+        seed_species_catalog(db)
+        for name, model, records in [("users", User, users), ("boats", Boat, boats), ("trips", Trip, trips),
+                                     ("reservations", Reservation, reservations), ("logs", Log, logs)]:
+            stats = bulk_load(db, model, records)
+            print(f"  {name:<13}{stats['inserted']:>8} lignes en {stats['seconds']}s")
+        backfill_log_species(db)
+        rebuild_seat_inventory(db)
+
+    def owned(rows, key):
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row[key], []).append(row["id"])
+        return grouped
+
+    return {
+        "users": [
+            {"id": user["id"], "email": user["email"],
+             "headers": {"authorization": create_access_token(data={"sub": user["email"], "status": "particulier"})}}
+            for user in users
+        ],
+        "boats": owned(boats, "owner_id"),
+        "trips": owned(trips, "organizer_id"),
+        "trip_days": {trip["id"]: date.fromisoformat(trip["dates"][0]["start"]) for trip in trips},
+        "reservations": owned(reservations, "user_id"),
+        "logs": owned(logs, "user_id"),
+        "first_day": first_day,
+    }
+
+
+def user_for(ctx: dict, i: int) -> dict:
+    return ctx["users"][i % len(ctx["users"])]
+
+
+def owned_id(ctx: dict, resource: str, i: int) -> int:
+    """Une ligne appartenant à l'utilisateur de l'appel i (les droits d'accès sont vérifiés)."""
+    user = user_for(ctx, i)
+    ids = ctx[resource].get(user["id"]) or [1]
+    return ids[(i // len(ctx["users"])) % len(ids)]
+
+
+def any_trip(ctx: dict, i: int) -> int:
+    trip_ids = list(ctx["trip_days"])
+    return trip_ids[i % len(trip_ids)]
+
+
+def build_scenarios() -> list:
+    boat = {
+        "name": "Bench", "boat_type": "OPEN", "description": "d", "brand": "b", "fabrication_year": 2020,
+        "photo_url": "u", "license": "COASTAL", "equipment": ["GPS"], "caution": 1.0, "nb_passenger": 4,
+        "nb_seat": 4, "port": "Marseille", "latitude": 43.29, "longitude": 5.37, "motor": "DIESEL", "motor_power": 100,
+    }
+    return [
+        Scenario("health.healthz", "GET", lambda ctx, i: "/healthz"),
+        Scenario("auth.login", "POST", lambda ctx, i: "/v1/login/",
+                 lambda ctx, i: {"username": user_for(ctx, i)["email"], "password": PASSWORD}, form=True),
+        Scenario("users.get", "GET", lambda ctx, i: f"/v1/users/{user_for(ctx, i)['id']}"),
+        Scenario("users.profile", "GET", lambda ctx, i: f"/v1/users/{user_for(ctx, i)['id']}/profile"),
+        Scenario("users.update", "PUT", lambda ctx, i: f"/v1/users/{user_for(ctx, i)['id']}",
+                 lambda ctx, i: {"phone": f"06{i:08d}"}),
+        Scenario("boats.filter", "GET", lambda ctx, i: "/v1/boats/filter?limit=50"),
+        Scenario("boats.filter_equipment", "GET", lambda ctx, i: "/v1/boats/filter?equipment=GPS&limit=50"),
+        Scenario("boats.nearby", "GET", lambda ctx, i: "/v1/boats/nearby?lat=43.5&lon=5.5&radius_km=30"),
+        Scenario("boats.get", "GET", lambda ctx, i: f"/v1/boats/{owned_id(ctx, 'boats', i)}"),
+        Scenario("boats.create", "POST", lambda ctx, i: "/v1/boats/", lambda ctx, i: boat),
+        Scenario("boats.update", "PUT", lambda ctx, i: f"/v1/boats/{owned_id(ctx, 'boats', i)}",
+                 lambda ctx, i: {"caution": float(i)}),
+        Scenario("trips.filter", "GET", lambda ctx, i: "/v1/trips/filter?min_price=50&max_price=400&limit=50"),
+        Scenario("trips.filter_dates", "GET", lambda ctx, i: (
+            f"/v1/trips/filter?start_date={ctx['first_day']}&end_date={ctx['first_day'] + timedelta(days=10)}")),
+        Scenario("trips.search", "GET", lambda ctx, i: "/v1/trips/search?q=sortie+mer&max_price=400&limit=50"),
+        Scenario("trips.get", "GET", lambda ctx, i: f"/v1/trips/{owned_id(ctx, 'trips', i)}"),
+        Scenario("trips.create", "POST", lambda ctx, i: "/v1/trips/", lambda ctx, i: {
+            "title": "Bench", "description": "d", "practical_info": "p", "trip_type": "DAILY", "pricing_type": "GLOBAL",
+            "dates": [{"start": str(ctx["first_day"]), "end": str(ctx["first_day"] + timedelta(days=2))}],
+            "schedules": [{"departure": "06:00:00", "arrival": "12:00:00"}], "nb_passengers": 4, "price": 100.0,
+            "boat_id": owned_id(ctx, "boats", i),
+        }),
+        Scenario("reservations.filter", "GET", lambda ctx, i: "/v1/reservations/filter?limit=50"),
+        Scenario("reservations.get", "GET", lambda ctx, i: f"/v1/reservations/{owned_id(ctx, 'reservations', i)}"),
+        Scenario("reservations.create", "POST", lambda ctx, i: "/v1/reservations/", lambda ctx, i: {
+            "trip_id": any_trip(ctx, i), "reservation_date": str(ctx["trip_days"][any_trip(ctx, i)]),
+            "nb_seats": 1, "total_price": 100.0,
+        }),
+        Scenario("reservations.export", "GET", lambda ctx, i: "/v1/reservations/export?format=ndjson"),
+        Scenario("logs.filter", "GET", lambda ctx, i: "/v1/logs/filter?limit=50"),
+        Scenario("logs.filter_species", "GET", lambda ctx, i: "/v1/logs/filter?fish_name=loup&limit=50"),
+        Scenario("logs.get", "GET", lambda ctx, i: f"/v1/logs/{owned_id(ctx, 'logs', i)}"),
+        Scenario("logs.create", "POST", lambda ctx, i: "/v1/logs/", lambda ctx, i: {
+            "fish_name": "Bar", "catch_date": "2024-02-25", "released": True,
+        }),
+        Scenario("logs.export", "GET", lambda ctx, i: "/v1/logs/export?format=csv"),
+        Scenario("species.autocomplete", "GET", lambda ctx, i: f"/v1/species/autocomplete?prefix={'bdlmst'[i % 6]}"),
+    ]
+
+
+async def run_scenario(client, scenario: Scenario, ctx: dict, requests: int, concurrency: int) -> dict:
+    """Appelle l'endpoint requests fois avec concurrency workers ; latences et statuts par appel."""
+    from app.database import engine, async_engine
+    from app.utils.query_plan import capture_statements
+
+    latencies = []
+    errors = {}
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            kwargs = {"headers": user_for(ctx, i)["headers"]}
+            if scenario.body:
+                kwargs["data" if scenario.form else "json"] = scenario.body(ctx, i)
+            start = time.perf_counter()
+            response = await client.request(scenario.method, scenario.path(ctx, i), **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    with capture_statements(engine, async_engine) as statements:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "endpoint": scenario.name,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "throughput_rps": round(requests / elapsed, 1),
+        "queries_per_request": round(len(statements) / requests, 2),
+    }
+
+
+async def run(args, ctx: dict) -> list:
+    import httpx
+    from app.main import app
+
+    scenarios = [scenario for scenario in build_scenarios() if not args.only or scenario.name in args.only]
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in scenarios:
+            # Échauffement : caches (utilisateur authentifié, TypeAdapter) et connexions du pool
+            await run_scenario(client, scenario, ctx, min(args.concurrency, args.requests), args.concurrency)
+            result = await run_scenario(client, scenario, ctx, args.requests, args.concurrency)
+            results.append(result)
+            print_row(result)
+    return results
+
+
+COLUMNS = ["endpoint", "p50_ms", "p95_ms", "p99_ms", "throughput_rps", "queries_per_request", "errors"]
+
+
+def print_row(result: dict):
+    values = [result["endpoint"]] + [result[column] for column in COLUMNS[1:-1]] + [sum(result["errors"].values())]
+    print(f"{values[0]:<26}" + "".join(f"{str(value):>20}" for value in values[1:]))
+
+
+def compare(results: list, previous_path: str):
+    """Écart de p50 / p95 et de débit avec un run précédent (ratio nouveau / ancien)."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {result["endpoint"]: result for result in json.load(f)["results"]}
+    print(f"\nComparaison avec {previous_path} (nouveau / ancien) :")
+    print(f"{'endpoint':<26}{'p50':>10}{'p95':>10}{'débit':>10}{'requêtes':>10}")
+    for result in results:
+        old = previous.get(result["endpoint"])
+        if old is None:
+            continue
+
+        def ratio(key):
+            return f"{result[key] / old[key]:.2f}" if old[key] else "-"
+
+        print(f"{result['endpoint']:<26}{ratio('p50_ms'):>10}{ratio('p95_ms'):>10}"
+              f"{ratio('throughput_rps'):>10}{ratio('queries_per_request'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--reset", action="store_true", help="Supprime et recrée les tables avant le chargement")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--boats-per-user", type=int, default=5)
+    parser.add_argument("--trips-per-boat", type=int, default=4)
+    parser.add_argument("--reservations-per-trip", type=int, default=5)
+    parser.add_argument("--logs-per-user", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="Appels mesurés par endpoint")
+    parser.add_argument("--only", nargs="+", help="Endpoints à mesurer (ex: boats.filter trips.get)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine des données générées")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument("--compare", help="Fichier JSON d'un run précédent")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    # Tous les appels viennent du même client : les budgets par IP / utilisateur fausseraient la mesure
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    ctx = seed(args)
+    print()
+    print(f"{'endpoint':<26}" + "".join(f"{column:>20}" for column in COLUMNS[1:]))
+    results = asyncio.run(run(args, ctx))
+
+    report = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "database": args.database_url.partition("://")[0],
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "volumes": {
+                "users": args.users,
+                "boats": args.users * args.boats_per_user,
+                "trips": args.users * args.boats_per_user * args.trips_per_boat,
+                "reservations": args.users * args.boats_per_user * args.trips_per_boat * args.reservations_per_trip,
+                "logs": args.users * args.logs_per_user,
+            },
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
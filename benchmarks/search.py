@@ -0,0 +1,139 @@
+"""
+Micro-benchmark de la recherche plein texte sur des listes de postings très inégales.
+
+Charge --trips sorties dans une base SQLite dédiée (--database) : le mot "peche" est dans
+toutes, "mer" dans une sur deux, "espadon" dans une sur mille ; les sorties sont réparties
+entre --organizers organisateurs. Pour chaque requête, en admin (sans filtre) puis pour un
+organisateur, compare le temps de la première page (meilleur de --repeat) :
+- aggregate : GROUP BY trip_id / HAVING sur tous les postings des mots (ancienne requête) ;
+- driven : comptes plafonnés puis lecture du mot le plus rare par poids décroissant, au plus
+  SEARCH_MAX_CANDIDATES candidats, ou à partir des sorties de l'organisateur
+  (app.models.trip.search_candidates).
+
+Usage : python -m benchmarks.search [--trips 200000] [--organizers 1000] [--repeat 5] [--output resultats.json]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, func, select, text
+from app.models.user import User  # noqa: F401  (configuration des relations)
+from app.models.boat import Boat  # noqa: F401
+from app.models.reservation import Reservation  # noqa: F401
+from app.models.log import Log  # noqa: F401
+from app.models.trip import Trip, TripTerm, search_candidates, term_frequencies
+from app.database import Base
+from app.utils.search import query_terms
+
+QUERIES = ["peche", "peche mer", "peche espadon", "mer espadon"]
+PAGE_SIZE = 20
+BATCH_SIZE = 10000
+
+
+def load(engine, trips: int, organizers: int, seed: int):
+    """Crée trips et trip_terms et les remplit par lots."""
+    Base.metadata.create_all(engine, tables=[Trip.__table__, TripTerm.__table__])
+    rng = random.Random(seed)
+    with engine.begin() as connection:
+        for start in range(1, trips + 1, BATCH_SIZE):
+            ids = range(start, min(start + BATCH_SIZE, trips + 1))
+            connection.execute(Trip.__table__.insert(), [
+                {"id": i, "title": f"Sortie {i}", "trip_type": "DAILY", "pricing_type": "GLOBAL", "nb_passengers": 4,
+                 "price": float(rng.randrange(20, 500)), "organizer_id": rng.randrange(organizers) + 1, "boat_id": 1}
+                for i in ids
+            ])
+            postings = []
+            for i in ids:
+                postings.append({"term": "peche", "trip_id": i, "weight": rng.choice([1, 3, 4])})
+                if i % 2 == 0:
+                    postings.append({"term": "mer", "trip_id": i, "weight": rng.choice([1, 2])})
+                if i % 1000 == 0:
+                    postings.append({"term": "espadon", "trip_id": i, "weight": 3})
+            connection.execute(TripTerm.__table__.insert(), postings)
+        # Statistiques des index, comme sur une base de production (MySQL les tient à jour)
+        connection.execute(text("ANALYZE"))
+
+
+def aggregate_query(terms: list, conditions: list):
+    ranked = (
+        select(TripTerm.trip_id, func.sum(TripTerm.weight).label("score"))
+        .where(TripTerm.term.in_(terms))
+        .group_by(TripTerm.trip_id)
+        .having(func.count(TripTerm.term) == len(terms))
+        .subquery()
+    )
+    return (
+        select(Trip.id, ranked.c.score).join(ranked, ranked.c.trip_id == Trip.id).where(*conditions)
+        .order_by(ranked.c.score.desc(), Trip.id.desc()).limit(PAGE_SIZE + 1)
+    )
+
+
+def driven_page(connection, terms: list, organizer_id: int = None):
+    driver = terms[0]
+    if len(terms) > 1:
+        frequencies = connection.execute(term_frequencies(terms)).one()
+        driver = terms[min(range(len(terms)), key=lambda position: frequencies[position])]
+    ranked = search_candidates(terms, driver, organizer_id=organizer_id)
+    return connection.execute(
+        select(Trip.id, ranked.c.score).join(ranked, ranked.c.trip_id == Trip.id)
+        .order_by(ranked.c.score.desc(), Trip.id.desc()).limit(PAGE_SIZE + 1)
+    ).all()
+
+
+def best_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def run(engine, repeat: int) -> list:
+    results = []
+    with engine.connect() as connection:
+        for q in QUERIES:
+            terms = query_terms(q)
+            for scope, organizer_id in [("admin", None), ("organizer", 1)]:
+                conditions = [] if organizer_id is None else [Trip.organizer_id == organizer_id]
+                aggregate = lambda: connection.execute(aggregate_query(terms, conditions)).all()
+                driven = lambda: driven_page(connection, terms, organizer_id)
+                results.append({
+                    "query": q,
+                    "scope": scope,
+                    "rows": len(driven()),
+                    "aggregate_ms": round(best_ms(aggregate, repeat), 2),
+                    "driven_ms": round(best_ms(driven, repeat), 2),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=200000)
+    parser.add_argument("--organizers", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="Fichier SQLite (temporaire par défaut)")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    path = args.database or os.path.join(tempfile.mkdtemp(), "search_bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        load(engine, args.trips, args.organizers, args.seed)
+    results = run(engine, args.repeat)
+    columns = list(results[0])
+    print(" ".join(f"{column:>14}" for column in columns))
+    for result in results:
+        print(" ".join(f"{str(result[column]):>14}" for column in columns))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Micro-benchmark de la sérialisation des pages de liste.
+
+Compare, sur des lignes ORM construites en mémoire (sans base) :
+- legacy : conversions faites dans l'endpoint, validation, jsonable_encoder puis json.dumps
+  (chemin de FastAPI avant la sérialisation directe par pydantic-core) ;
+- adapter : TypeAdapter précompilé, validation puis dump_json (app.utils.serialization) ;
+- orjson : même validation, encodage par orjson (référence, si installé).
+
+Usage : python -m benchmarks.serialization [--sizes 100 10000] [--repeat 5] [--output resultats.json]
+"""
+import argparse
+import json
+import time
+from functools import partial
+from datetime import date, time as dt_time
+from fastapi.encoders import jsonable_encoder
+from app.models.user import User  # noqa: F401  (configuration des relations)
+from app.models.boat import Boat
+from app.models.trip import Trip
+from app.models.reservation import Reservation  # noqa: F401
+from app.models.log import Log
+from app.models.enum import BoatTypeEnum, LicenseEnum, MotorEnum, PricingTypeEnum, TripTypeEnum
+from app.schemas.boat import BoatResponse
+from app.schemas.trip import TripDate, TripResponse, TripSchedule
+from app.schemas.log import LogResponse
+from app.utils.serialization import dump_json, get_adapter, orjson
+
+
+def make_trips(count: int) -> list:
+    return [
+        Trip(
+            id=i, title=f"Sortie {i}", practical_info="Prévoir des vêtements chauds. " * 5,
+            trip_type=TripTypeEnum.DAILY, pricing_type=PricingTypeEnum.PER_PERSON,
+            dates=[{"start": "2030-02-10", "end": "2030-02-12"}],
+            schedules=[{"departure": "06:00:00", "arrival": "12:00:00"}],
+            nb_passengers=4, price=100.0 + i, boat_id=1, organizer_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+def make_boats(count: int) -> list:
+    return [
+        Boat(
+            id=i, name=f"Bateau {i}", description="Bateau de pêche côtière. " * 5, brand="Jeanneau",
+            fabrication_year=2015, photo_url="boat.jpg", license=LicenseEnum.COASTAL, boat_type=BoatTypeEnum.OPEN,
+            equipment="GPS,RADIO,FISHFINDER", caution=500.0, nb_passenger=6, nb_seat=6, port="Marseille",
+            latitude=43.29, longitude=5.37, motor=MotorEnum.DIESEL, motor_power=150, owner_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+def make_logs(count: int) -> list:
+    return [
+        Log(
+            id=i, fish_name="Bar", picture_url="bar.jpg", comment="Belle prise au lever du jour.", size=52.5,
+            weight=1.8, location="Calanques", catch_date=date(2024, 2, 25), released=True, user_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_trips(rows):
+    # Conversion faite par filter_trips avant la réponse
+    for trip in rows:
+        trip.dates = [TripDate(start=date.fromisoformat(d["start"]), end=date.fromisoformat(d["end"])) for d in trip.dates]
+        trip.schedules = [
+            TripSchedule(departure=dt_time.fromisoformat(s["departure"]), arrival=dt_time.fromisoformat(s["arrival"]))
+            for s in trip.schedules
+        ]
+    return rows
+
+
+def legacy_boats(rows):
+    # equipment est décodé du masque de bits par le modèle : plus de conversion dans l'endpoint
+    return rows
+
+
+CASES = [
+    ("trips", make_trips, TripResponse, legacy_trips),
+    ("boats", make_boats, BoatResponse, legacy_boats),
+    ("logs", make_logs, LogResponse, lambda rows: rows),
+]
+
+
+def legacy_path(rows, schema, prepare) -> bytes:
+    adapter = get_adapter(schema)
+    validated = adapter.validate_python(prepare(rows), from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_path(rows, schema) -> bytes:
+    adapter = get_adapter(schema)
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True)))
+
+
+def best_of(func, make_rows, repeat: int) -> float:
+    """Meilleur temps (ms) sur repeat exécutions, avec des lignes neuves à chaque fois."""
+    timings = []
+    for _ in range(repeat):
+        rows = make_rows()
+        start = time.perf_counter()
+        func(rows)
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def run(sizes, repeat: int) -> list:
+    results = []
+    for name, factory, schema, prepare in CASES:
+        for size in sizes:
+            make_rows = partial(factory, size)
+            result = {
+                "resource": name,
+                "rows": size,
+                "legacy_ms": best_of(lambda rows: legacy_path(rows, schema, prepare), make_rows, repeat),
+                "adapter_ms": best_of(lambda rows: dump_json(rows, schema), make_rows, repeat),
+            }
+            if orjson is not None:
+                result["orjson_ms"] = best_of(lambda rows: orjson_path(rows, schema), make_rows, repeat)
+            result["speedup"] = round(result["legacy_ms"] / result["adapter_ms"], 2)
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    columns = ["resource", "rows", "legacy_ms", "adapter_ms", "orjson_ms", "speedup"]
+    columns = [column for column in columns if column in results[0]]
+    print(" ".join(f"{column:>11}" for column in columns))
+    for result in results:
+        print(" ".join(f"{result[column]:>11}" for column in columns))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,23 @@
-import json
-import os
+import argparse
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.boat import Boat
-from app.models.trip import Trip
-from app.models.reservation import Reservation
+from app.models.trip import Trip, TripDateRange, TripScheduleSlot, TripTerm
+from app.models.reservation import Reservation, TripSeatInventory
 from app.models.log import Log
+from app.utils.seed import SEED_BATCH_SIZE, seed_database
 
 DATA_DIR = "data"
 
-# Fonction pour charger un fichier JSON
-def load_json(filename):
-    file_path = os.path.join(DATA_DIR, filename)
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-def insert_data():
-    """Insère les données dans la base après avoir supprimé les anciennes."""
+def insert_data(data_dir: str = DATA_DIR, batch_size: int = SEED_BATCH_SIZE, append: bool = False):
+    """Insère les données dans la base après avoir supprimé les anciennes (sauf en mode append)."""
     with SessionLocal() as db:
         try:
-            clear_database(db)
-
-            data_files = {
-                "users": (User, "id"),
-                "boats": (Boat, "id"),
-                "trips": (Trip, "id"),
-                "reservations": (Reservation, "id"),
-                "logs": (Log, "id"),
-            }
-
-            for file, (model, key) in data_files.items():
-                insert_if_not_exists(db, file, model, key)
+            if not append:
+                clear_database(db)
 
-            db.commit()
+            seed_database(db, data_dir, batch_size)
             print("✅ Données insérées avec succès !")
 
         except Exception as e:
@@ -47,21 +29,17 @@ def clear_database(db: Session):
     """Supprime les anciennes données en respectant l'ordre des dépendances."""
     print("📥 Suppression des anciennes données dans le bon ordre...")
 
-    for model in [Log, Reservation, Trip, Boat, User]:  # Ordre logique de suppression
+    for model in [Log, Reservation, TripSeatInventory, TripDateRange, TripScheduleSlot, TripTerm, Trip, Boat, User]:  # Ordre logique de suppression
         db.query(model).delete()
 
     db.commit()
     print("✅ Suppression réussie !")
 
 
-def insert_if_not_exists(db: Session, file_name: str, model, key: str):
-    """Insère les données depuis un fichier JSON si elles n'existent pas déjà."""
-    print(f"📥 Insertion des {file_name}...")
-
-    data = load_json(f"{file_name}.json")
-    for entry in data:
-        if not db.query(model).filter(getattr(model, key) == entry[key]).first():
-            db.add(model(**entry))
-
 if __name__ == "__main__":
-    insert_data()
+    parser = argparse.ArgumentParser(description="Charge les fichiers JSON / NDJSON de seed dans la base.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Dossier contenant users, boats, trips, reservations, logs")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE, help="Lignes insérées par lot")
+    parser.add_argument("--append", action="store_true", help="Conserve les données existantes (les clés déjà présentes sont ignorées)")
+    args = parser.parse_args()
+    insert_data(args.data_dir, args.batch_size, args.append)
@@ -1,23 +1,65 @@
+import copy
+import uuid
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+import app.utils.query_budget as query_budget_module
+import app.utils.rate_limit as rate_limit_module
 from app.models.enum import StatusEnum, BoatTypeEnum, MotorEnum, LicenseEnum
 
+USER_DATA = {
+    "name": "Doe",
+    "firstname": "John",
+    "email": "john.doe@example.com",
+    "password": "password123",
+    "phone": "1234567890",
+    "status": StatusEnum.INDIVIDUAL.value,
+    "boat_license": 123456789,
+}
+
+BOAT_DATA = {
+    "name": "Test Boat",
+    "boat_type": BoatTypeEnum.OPEN.value,
+    "description": "A test boat",
+    "brand": "Test Brand",
+    "fabrication_year": 2020,
+    "photo_url": "http://example.com/boat.jpg",
+    "license": LicenseEnum.COASTAL.value,
+    "equipment": ["GPS", "RADIO"],
+    "caution": 1000.0,
+    "nb_passenger": 4,
+    "nb_seat": 4,
+    "port": "Test Port",
+    "latitude": 43.296482,
+    "longitude": 5.369780,
+    "motor": MotorEnum.GASOLINE.value,
+    "motor_power": 150,
+}
+
+@pytest.fixture(scope="session", autouse=True)
+def strict_query_budgets():
+    # Toute route dépassant son @query_budget lève QueryBudgetExceeded dans le test qui l'appelle
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(query_budget_module, "QUERY_BUDGET_STRICT", True)
+        yield
+
+@pytest.fixture(scope="session", autouse=True)
+def rate_limits_disabled():
+    # Les tests créent beaucoup d'utilisateurs depuis la même IP ; tests/test_rate_limit.py les réactive
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(rate_limit_module, "RATE_LIMIT_ENABLED", False)
+        yield
+
 @pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    # Le context manager garde une seule boucle d'événements pour toute la session,
+    # nécessaire pour réutiliser les connexions du pool async entre les requêtes
+    with TestClient(app) as test_client:
+        yield test_client
 
 @pytest.fixture
 def test_user_data():
-    return {
-        "name": "Doe",
-        "firstname": "John",
-        "email": "john.doe@example.com",
-        "password": "password123",
-        "phone": "1234567890",
-        "status": StatusEnum.INDIVIDUAL.value,
-        "boat_license": 123456789
-    }
+    return copy.deepcopy(USER_DATA)
 
 @pytest.fixture
 def test_admin_user_data():
@@ -32,24 +74,7 @@ def test_admin_user_data():
 
 @pytest.fixture
 def test_boat_data():
-    return {
-        "name": "Test Boat",
-        "boat_type": BoatTypeEnum.OPEN.value,
-        "description": "A test boat",
-        "brand": "Test Brand",
-        "fabrication_year": 2020,
-        "photo_url": "http://example.com/boat.jpg",
-        "license": LicenseEnum.COASTAL.value,
-        "equipment": ["GPS", "RADIO"],
-        "caution": 1000.0,
-        "nb_passenger": 4,
-        "nb_seat": 4,
-        "port": "Test Port",
-        "latitude": 43.296482,
-        "longitude": 5.369780,
-        "motor": MotorEnum.GASOLINE.value,
-        "motor_power": 150
-    }
+    return copy.deepcopy(BOAT_DATA)
 
 @pytest.fixture
 def test_trip_data():
@@ -108,3 +133,23 @@ def admin_auth_headers(client, test_admin_user_data):
     assert response.status_code == 201
     token = response.json()["token"]
     return {"authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def create_user(client):
+    """Fabrique d'utilisateurs (données de test_user_data, email unique) ; renvoie leurs en-têtes d'authentification."""
+    def factory(role="user", **fields):
+        data = {**USER_DATA, "email": f"user{uuid.uuid4().hex[:8]}@example.com", "role": role, **fields}
+        response = client.post("/v1/users/", json=data)
+        assert response.status_code == 201, response.text
+        return {"authorization": response.json()["token"]}
+    return factory
+
+@pytest.fixture(scope="session")
+def create_boat(client):
+    """Fabrique de bateaux (données de test_boat_data) ; renvoie la réponse de création, dont l'id du bateau."""
+    def factory(headers, **fields):
+        response = client.post("/v1/boats/", json={**BOAT_DATA, **fields}, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return factory
@@ -0,0 +1,34 @@
+import time
+from app.utils.cache import TTLCache
+
+class TestTTLCache:
+    def test_hits_and_misses(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" devient le moins récemment utilisé
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_ttl_expiration(self):
+        cache = TTLCache(maxsize=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_pop(self):
+        cache = TTLCache()
+        cache.set("a", 1)
+        assert cache.pop("a") == 1
+        assert cache.get("a") is None
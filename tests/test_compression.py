@@ -0,0 +1,81 @@
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.utils.compression import CompressionMiddleware, accepts_gzip
+
+PAYLOAD = b'{"fish_name":"Bar","comment":"Belle prise au lever du jour."}' * 100
+
+@pytest.fixture(scope="module")
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, level=6, content_types=("application/json", "text/csv"))
+
+    @app.get("/large")
+    def large():
+        return Response(PAYLOAD, media_type="application/json")
+
+    @app.get("/tagged")
+    def tagged():
+        return Response(PAYLOAD, media_type="application/json", headers={"ETag": '"7"'})
+
+    @app.get("/small")
+    def small():
+        return Response(b'{"id":1}', media_type="application/json")
+
+    @app.get("/image")
+    def image():
+        return Response(PAYLOAD, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"a,b,c\n" * 50 for _ in range(20)), media_type="text/csv")
+
+    return TestClient(app)
+
+class TestAcceptEncoding:
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        assert accepts_gzip(header) is expected
+
+class TestCompressionMiddleware:
+    def test_large_response_is_compressed(self, compressed_client):
+        response = compressed_client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(PAYLOAD)
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == PAYLOAD
+
+    def test_etag_weakened_when_compressed(self, compressed_client):
+        response = compressed_client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == 'W/"7"'
+        response = compressed_client.get("/tagged", headers={"Accept-Encoding": "identity"})
+        assert response.headers["etag"] == '"7"'
+
+    def test_small_response_is_not_compressed(self, compressed_client):
+        response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"id": 1}
+
+    def test_content_type_allowlist(self, compressed_client):
+        response = compressed_client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_client_without_gzip(self, compressed_client):
+        response = compressed_client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == PAYLOAD
+
+    def test_streaming_response_is_compressed_by_chunk(self, compressed_client):
+        response = compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.content == b"a,b,c\n" * 1000
@@ -0,0 +1,62 @@
+from datetime import datetime
+import pytest
+from starlette.requests import Request
+from app.utils.conditional import http_date, is_not_modified, make_etag
+
+UPDATED_AT = datetime(2026, 10, 18, 12, 30, 15)
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+@pytest.fixture(scope="module")
+def etag_boat(create_user, create_boat):
+    headers = create_user()
+    boat = create_boat(headers)
+    return headers, f"/v1/boats/{boat['id']}"
+
+class TestPreconditions:
+    def test_etag_depends_on_fields(self):
+        assert make_etag(3) == '"3"'
+        assert make_etag(3, ("id", "name")) != make_etag(3, ("id",)) != make_etag(3)
+
+    def test_if_none_match(self):
+        assert is_not_modified(make_request(if_none_match='"2", "3"'), '"3"', UPDATED_AT)
+        assert is_not_modified(make_request(if_none_match='W/"3"'), '"3"', UPDATED_AT)
+        assert is_not_modified(make_request(if_none_match="*"), '"3"', UPDATED_AT)
+        assert not is_not_modified(make_request(if_none_match='"2"'), '"3"', UPDATED_AT)
+
+    def test_if_none_match_takes_precedence(self):
+        request = make_request(if_none_match='"2"', if_modified_since=http_date(UPDATED_AT))
+        assert not is_not_modified(request, '"3"', UPDATED_AT)
+
+    def test_if_modified_since(self):
+        assert is_not_modified(make_request(if_modified_since=http_date(UPDATED_AT)), '"3"', UPDATED_AT)
+        assert not is_not_modified(make_request(if_modified_since="Sun, 18 Oct 2026 12:30:14 GMT"), '"3"', UPDATED_AT)
+        assert not is_not_modified(make_request(if_modified_since="hier"), '"3"', UPDATED_AT)
+        assert not is_not_modified(make_request(if_modified_since=http_date(UPDATED_AT)), '"3"', None)
+
+class TestConditionalGet:
+    def test_not_modified_until_update(self, client, etag_boat):
+        headers, path = etag_boat
+        response = client.get(path, headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"]
+
+        cached = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["etag"] == etag
+
+        assert client.put(path, json={"name": "Renamed"}, headers=headers).status_code == 200
+        refreshed = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag and refreshed.json()["name"] == "Renamed"
+
+    def test_sparse_fields_have_their_own_etag(self, client, etag_boat):
+        headers, path = etag_boat
+        full_etag = client.get(path, headers=headers).headers["etag"]
+        response = client.get(path, params={"fields": "id,name"}, headers={**headers, "If-None-Match": full_etag})
+        assert response.status_code == 200
+        assert client.get(
+            path, params={"fields": "id,name"}, headers={**headers, "If-None-Match": response.headers["etag"]},
+        ).status_code == 304
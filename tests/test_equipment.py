@@ -0,0 +1,74 @@
+import pytest
+from app.database import engine
+from app.models.boat import Boat, EQUIPMENT_BITS, equipment_from_mask, equipment_supersets, equipment_to_mask
+from app.models.enum import EquipmentEnum
+from app.utils.query_plan import capture_statements, full_scans
+
+@pytest.fixture(scope="module")
+def equipment_headers(create_user, create_boat):
+    headers = create_user()
+    for equipment in (["GPS", "RADIO"], ["GPS"], ["FISHFINDER", "GPS", "RADIO"], []):
+        create_boat(headers, equipment=equipment)
+    return headers
+
+class TestEquipmentMask:
+    def test_one_bit_per_value(self):
+        assert len(EQUIPMENT_BITS) == len(EquipmentEnum)
+        assert sum(EQUIPMENT_BITS.values()) == (1 << len(EquipmentEnum)) - 1
+
+    def test_round_trip(self):
+        mask = equipment_to_mask([EquipmentEnum.RADIO, "GPS"])
+        # Décodage dans l'ordre de EquipmentEnum, quel que soit l'ordre d'origine
+        assert equipment_from_mask(mask) == ("GPS", "RADIO")
+        assert equipment_to_mask("GPS, RADIO") == mask
+        assert equipment_to_mask(None) == equipment_to_mask("") == 0
+
+    def test_unknown_value(self):
+        with pytest.raises(ValueError):
+            equipment_to_mask(["GPS", "SONAR"])
+
+    def test_hybrid_property(self):
+        boat = Boat(equipment=["LADDER", "FISHFINDER"])
+        assert boat.equipment_mask == EQUIPMENT_BITS["FISHFINDER"] | EQUIPMENT_BITS["LADDER"]
+        assert boat.equipment == ["FISHFINDER", "LADDER"]
+        boat.equipment = []
+        assert boat.equipment_mask == 0 and boat.equipment == []
+
+    def test_supersets(self):
+        mask = equipment_to_mask(["GPS", "RADIO"])
+        supersets = equipment_supersets(mask)
+        assert supersets == tuple(value for value in range(1 << len(EquipmentEnum)) if value & mask == mask)
+        assert len(equipment_supersets(0)) == 1 << len(EquipmentEnum)
+
+    def test_containment_is_an_indexable_in(self):
+        sql = str(Boat.has_equipment(["GPS", "RADIO"]).compile(compile_kwargs={"literal_binds": True}))
+        assert sql.startswith("boats.equipment_mask IN (40, 41, 42, ")
+
+class TestEquipmentFilter:
+    def test_filter_requires_every_value(self, client, equipment_headers):
+        response = client.get("/v1/boats/filter", params={"equipment": "RADIO,GPS"}, headers=equipment_headers)
+        assert response.status_code == 200, response.text
+        assert sorted(boat["equipment"] for boat in response.json()) == [["FISHFINDER", "GPS", "RADIO"], ["GPS", "RADIO"]]
+
+    def test_unknown_value_is_rejected(self, client, equipment_headers):
+        response = client.get("/v1/boats/filter", params={"equipment": "GPS,SONAR"}, headers=equipment_headers)
+        assert response.status_code == 400
+
+    def test_update_keeps_list_api(self, client, equipment_headers):
+        boat = client.get("/v1/boats/filter", params={"equipment": "FISHFINDER"}, headers=equipment_headers).json()[0]
+        response = client.put(f"/v1/boats/{boat['id']}", json={"equipment": ["LADDER"]}, headers=equipment_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["equipment"] == ["LADDER"]
+        assert client.get(f"/v1/boats/{boat['id']}", params={"fields": "id,equipment"}, headers=equipment_headers).json() == {
+            "id": boat["id"], "equipment": ["LADDER"],
+        }
+
+    def test_filter_uses_mask_index(self, client, create_user, equipment_headers):
+        # Admin : pas de filtre par propriétaire, seul l'index du masque évite le parcours de la table
+        with capture_statements(engine) as statements:
+            response = client.get("/v1/boats/filter", params={"equipment": "FISHFINDER,GPS"}, headers=create_user(role="admin"))
+        assert response.status_code == 200, response.text
+        with engine.connect() as connection:
+            for sql, parameters in statements:
+                if sql.lstrip().upper().startswith("SELECT"):
+                    assert full_scans(connection, sql, parameters) == [], sql
@@ -0,0 +1,20 @@
+from datetime import date
+from app.models.log import Log
+from app.schemas.log import LogResponse
+from app.utils.export import ExportFormatEnum, header_chunk, rows_chunk
+
+def make_log(id):
+    return Log(id=id, fish_name="Bar", comment="a, b", catch_date=date(2025, 2, 10), released=True, user_id=1)
+
+class TestExportSerialization:
+    def test_ndjson(self):
+        assert header_chunk(LogResponse, ExportFormatEnum.NDJSON) == ""
+        lines = rows_chunk([make_log(1), make_log(2)], LogResponse, ExportFormatEnum.NDJSON).splitlines()
+        assert len(lines) == 2
+        assert '"catch_date":"2025-02-10"' in lines[0]
+
+    def test_csv(self):
+        header = header_chunk(LogResponse, ExportFormatEnum.CSV)
+        assert header.strip().split(",") == list(LogResponse.model_fields.keys())
+        body = rows_chunk([make_log(1)], LogResponse, ExportFormatEnum.CSV)
+        assert '"a, b"' in body
@@ -0,0 +1,36 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.models.boat import Boat
+from app.models.log import Log
+from app.schemas.boat import BoatResponse
+from app.schemas.log import LogResponse
+from app.utils.fields import fields_param, sparse_load, sparse_schema
+
+class TestSparseFields:
+    def test_fields_param(self):
+        dependency = fields_param(LogResponse)
+        assert dependency(None) is None
+        # Ordre du schéma, doublons ignorés
+        assert dependency("user_id, fish_name,fish_name") == ("fish_name", "user_id")
+        with pytest.raises(HTTPException) as exc:
+            dependency("fish_name,password")
+        assert exc.value.status_code == 400
+
+    def test_sparse_schema_is_cached_and_keeps_validators(self):
+        model = sparse_schema(BoatResponse, ("id", "equipment"))
+        assert sparse_schema(BoatResponse, ("id", "equipment")) is model
+        assert list(model.model_fields) == ["id", "equipment"]
+        boat = model.model_validate(Boat(id=1, equipment="GPS,RADIO", description="long"))
+        assert boat.model_dump() == {"id": 1, "equipment": ["GPS", "RADIO"]}
+
+    def test_sparse_load_columns(self):
+        query = select(Log).options(sparse_load(Log, ("fish_name", "unknown_attr"), "catch_date"))
+        sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+        assert "logs.fish_name" in sql and "logs.catch_date" in sql and "logs.id" in sql
+        assert "logs.comment" not in sql
+
+    def test_sparse_load_hybrid_property(self):
+        query = select(Boat).options(sparse_load(Boat, ("equipment",)))
+        sql = str(query.compile())
+        assert "boats.equipment_mask" in sql and "boats.name" not in sql
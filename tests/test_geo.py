@@ -0,0 +1,36 @@
+from app.utils.geo import (
+    GEOHASH_PRECISION,
+    cell_size_degrees,
+    encode_geohash,
+    haversine_km,
+    neighborhood,
+    search_precision,
+)
+
+class TestGeohash:
+    def test_encode_known_value(self):
+        assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_prefix_property(self):
+        full = encode_geohash(43.2965, 5.3698)
+        assert len(full) == GEOHASH_PRECISION
+        assert encode_geohash(43.2965, 5.3698, 5) == full[:5]
+
+    def test_search_precision_covers_radius(self):
+        for radius in (0.5, 5, 50, 500):
+            precision = search_precision(43.3, radius)
+            height, _ = cell_size_degrees(precision)
+            assert height * 111.19 >= radius
+        assert search_precision(43.3, 5) > search_precision(43.3, 500)
+
+    def test_neighborhood(self):
+        cells = neighborhood(43.2965, 5.3698, 5)
+        assert len(cells) == 9
+        assert encode_geohash(43.2965, 5.3698, 5) in cells
+        # Point juste au-delà d'une limite de cellule
+        assert encode_geohash(43.2965 + cell_size_degrees(5)[0], 5.3698, 5) in cells
+
+    def test_haversine(self):
+        assert haversine_km(43.2965, 5.3698, 43.2965, 5.3698) == 0
+        # Marseille - Paris ~ 660 km
+        assert 650 < haversine_km(43.2965, 5.3698, 48.8566, 2.3522) < 670
@@ -0,0 +1,16 @@
+class TestHealthEndpoints:
+    def test_healthz(self, client):
+        response = client.get("/healthz")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ok"
+        assert "checked_out" in data["pools"]["sync"]
+        assert "overflow" in data["pools"]["async"]
+
+    def test_readyz(self, client):
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["latency_ms"] >= 0
+        assert data["pools"]["sync"]["saturated"] is False
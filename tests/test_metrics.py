@@ -0,0 +1,47 @@
+import re
+import pytest
+from app.utils.metrics import Histogram, RequestStats, request_stats, timed_serialization
+
+@pytest.fixture(scope="module")
+def metrics_headers(create_user):
+    return create_user()
+
+class TestHistogram:
+    def test_exposition_is_cumulative(self):
+        histogram = Histogram("test_queries", "Requêtes.", ("route",), (1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value, "/v1/boats/{id}")
+        lines = histogram.expose()
+        assert lines[:2] == ["# HELP test_queries Requêtes.", "# TYPE test_queries histogram"]
+        assert 'test_queries_bucket{route="/v1/boats/{id}",le="1"} 2' in lines
+        assert 'test_queries_bucket{route="/v1/boats/{id}",le="5"} 3' in lines
+        assert 'test_queries_bucket{route="/v1/boats/{id}",le="+Inf"} 4' in lines
+        assert 'test_queries_count{route="/v1/boats/{id}"} 4' in lines
+
+    def test_serialization_time_is_scoped_to_request(self):
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        try:
+            with timed_serialization():
+                sum(range(1000))
+        finally:
+            request_stats.reset(token)
+        assert stats.serialize_seconds > 0
+        with timed_serialization():
+            pass  # hors requête : ignoré
+
+class TestServerTiming:
+    def test_header_counts_queries(self, client, metrics_headers):
+        response = client.get("/v1/boats/filter", headers=metrics_headers)
+        timing = response.headers["server-timing"]
+        assert re.fullmatch(
+            r'db;dur=[\d.]+, db-count;desc="\d+", serialize;dur=[\d.]+, total;dur=[\d.]+', timing
+        ), timing
+        assert int(re.search(r'db-count;desc="(\d+)"', timing).group(1)) >= 1
+
+    def test_metrics_endpoint_uses_route_templates(self, client, metrics_headers):
+        client.get("/v1/boats/123456", headers=metrics_headers)
+        body = client.get("/metrics").text
+        assert "# TYPE http_request_db_queries histogram" in body
+        assert 'http_request_duration_seconds_count{method="GET",route="/v1/boats/{id}",status="404"}' in body
+        assert "/v1/boats/123456" not in body
@@ -0,0 +1,20 @@
+from datetime import date
+import pytest
+from fastapi import HTTPException
+from app.models.log import Log
+from app.models.trip import Trip
+from app.utils.pagination import encode_cursor, decode_cursor
+
+class TestCursor:
+    def test_roundtrip_date(self):
+        cursor = encode_cursor(date(2025, 2, 10), 42)
+        assert decode_cursor(cursor, Log.catch_date) == (date(2025, 2, 10), 42)
+
+    def test_roundtrip_float(self):
+        cursor = encode_cursor(99.5, 7)
+        assert decode_cursor(cursor, Trip.price) == (99.5, 7)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor("not-a-cursor", Trip.price)
+        assert exc.value.status_code == 400
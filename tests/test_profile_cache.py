@@ -0,0 +1,44 @@
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.user import User
+from app.models.log import Log
+from app.models.enum import StatusEnum
+from app.utils.profile_cache import cache_profile, evict_profile, get_cached_profile, profile_generation
+
+SECTIONS = ("logs",)
+
+class TestProfileCache:
+    def test_evict_changes_generation(self):
+        generation = profile_generation(1001)
+        cache_profile(1001, generation, SECTIONS, b"{}")
+        assert get_cached_profile(1001, generation, SECTIONS) == b"{}"
+        evict_profile(1001)
+        assert profile_generation(1001) != generation
+        assert get_cached_profile(1001, profile_generation(1001), SECTIONS) is None
+
+    def test_stale_profile_not_cached(self):
+        generation = profile_generation(1002)
+        evict_profile(1002)  # modification pendant la construction du profil
+        cache_profile(1002, generation, SECTIONS, b"{}")
+        assert get_cached_profile(1002, profile_generation(1002), SECTIONS) is None
+
+    def test_commit_evicts_owner(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(User(id=7, email="p@example.com", password="x", status=StatusEnum.INDIVIDUAL))
+            db.commit()
+            generation = profile_generation(7)
+            db.add(Log(fish_name="Bar", catch_date=date(2024, 2, 25), user_id=7))
+            db.flush()
+            assert profile_generation(7) == generation  # rien n'est invalidé avant le commit
+            db.commit()
+            assert profile_generation(7) != generation
+
+            generation = profile_generation(7)
+            db.add(Log(fish_name="Dorade", catch_date=date(2024, 2, 26), user_id=7))
+            db.flush()
+            db.rollback()
+            assert profile_generation(7) == generation
@@ -0,0 +1,82 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.database import engine
+from app.main import app
+from app.utils.metrics import MetricsMiddleware
+from app.utils.query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, query_budget, route_budget
+
+TRIP = {
+    "title": "T", "description": "d", "practical_info": "p", "trip_type": "DAILY", "pricing_type": "GLOBAL",
+    "dates": [{"start": "2030-02-10", "end": "2030-02-12"}], "schedules": [{"departure": "06:00:00", "arrival": "12:00:00"}],
+    "nb_passengers": 4, "price": 100.0,
+}
+
+def reserve(client, headers, trip_id, nb_seats):
+    return client.post("/v1/reservations/", json={
+        "trip_id": trip_id, "reservation_date": "2030-02-11", "nb_seats": nb_seats, "total_price": 100.0,
+    }, headers=headers)
+
+def budget_app(strict):
+    """Application minimale : une route au budget d'une requête qui en émet trois."""
+    test_app = FastAPI()
+    test_app.add_middleware(QueryBudgetMiddleware, strict=strict)
+    test_app.add_middleware(MetricsMiddleware)
+
+    @test_app.get("/items/{id}")
+    @query_budget(1)
+    def get_item(id: int):
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+        return {"id": id}
+
+    return test_app
+
+class TestRouteBudgets:
+    def test_every_route_declares_a_budget(self):
+        missing = [
+            f"{sorted(route.methods)} {route.path}" for route in app.routes
+            if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("app.routers")
+            and route_budget(route) is None
+        ]
+        assert missing == []
+
+class TestQueryBudgetMiddleware:
+    def test_strict_mode_raises_with_statements(self):
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            TestClient(budget_app(strict=True)).get("/items/1")
+        assert excinfo.value.route == "/items/{id}"
+        assert excinfo.value.count == 3
+        assert "3 x SELECT 1" in str(excinfo.value)
+
+    def test_lenient_mode_logs_warning(self, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.utils.query_budget"):
+            response = TestClient(budget_app(strict=False)).get("/items/1")
+        assert response.status_code == 200
+        assert "GET /items/{id} issued 3 SQL statements (budget 1)" in caplog.text
+
+class TestDeleteUserBudget:
+    def test_cascade_does_not_scale_with_rows(self, client, create_user, create_boat):
+        organizer = create_user()
+        organizer_boat = create_boat(organizer)
+        organizer_trip = client.post("/v1/trips/", json={**TRIP, "boat_id": organizer_boat["id"]}, headers=organizer).json()
+
+        member = create_user()
+        for _ in range(3):
+            boat = create_boat(member)
+            for _ in range(2):
+                trip = client.post("/v1/trips/", json={**TRIP, "boat_id": boat["id"]}, headers=member).json()
+                assert reserve(client, member, trip["id"], 1).status_code == 200
+            client.post("/v1/logs/", json={"fish_name": "Bar", "catch_date": "2024-02-25", "released": True}, headers=member)
+        assert reserve(client, member, organizer_trip["id"], 4).status_code == 200
+        member_id = client.get("/v1/logs/filter", headers=member).json()[0]["user_id"]
+
+        # Le budget strict de delete_user fait échouer la requête si la cascade redevient N+1
+        response = client.delete(f"/v1/users/{member_id}", headers=create_user(role="admin"))
+        assert response.status_code == 200, response.text
+        # Places libérées sur la sortie d'un autre organisateur
+        assert reserve(client, organizer, organizer_trip["id"], 4).status_code == 200
@@ -0,0 +1,38 @@
+import pytest
+from app.database import engine, async_engine
+from app.utils.query_plan import capture_statements, full_scans
+
+# Requêtes typiques des endpoints /filter pour un utilisateur non admin
+FILTER_REQUESTS = [
+    ("/v1/boats/filter", {"limit": 10}),
+    ("/v1/trips/filter", {"min_price": 10, "max_price": 500, "start_date": "2030-02-10", "end_date": "2030-02-11"}),
+    ("/v1/reservations/filter", {"min_date": "2030-01-01"}),
+    ("/v1/logs/filter", {"start_date": "2024-01-01"}),
+    ("/v1/logs/filter", {"fish_name": "loup de mer"}),
+    ("/v1/trips/search", {"q": "thon rouge", "max_price": 500}),
+]
+
+@pytest.fixture(scope="module")
+def plan_headers(client, create_user, create_boat):
+    headers = create_user()
+    boat = create_boat(headers)
+    trip = client.post("/v1/trips/", json={
+        "title": "T", "description": "d", "practical_info": "p", "trip_type": "DAILY", "pricing_type": "GLOBAL",
+        "dates": [{"start": "2030-02-10", "end": "2030-02-12"}], "schedules": [{"departure": "06:00:00", "arrival": "12:00:00"}],
+        "nb_passengers": 4, "price": 100.0, "boat_id": boat["id"],
+    }, headers=headers).json()
+    client.post("/v1/reservations/", json={"trip_id": trip["id"], "reservation_date": "2030-02-11", "nb_seats": 1}, headers=headers)
+    client.post("/v1/logs/", json={"fish_name": "Bar", "catch_date": "2024-02-25", "released": True}, headers=headers)
+    return headers
+
+class TestFilterQueryPlans:
+    @pytest.mark.parametrize("path,params", FILTER_REQUESTS)
+    def test_no_full_table_scan(self, client, plan_headers, path, params):
+        with capture_statements(engine, async_engine) as statements:
+            response = client.get(path, params=params, headers=plan_headers)
+        assert response.status_code == 200, response.text
+        selects = [(sql, parameters) for sql, parameters in statements if sql.lstrip().upper().startswith("SELECT")]
+        assert selects
+        with engine.connect() as connection:
+            for sql, parameters in selects:
+                assert full_scans(connection, sql, parameters) == [], sql
@@ -0,0 +1,106 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import app.utils.rate_limit as rate_limit_module
+from app.utils.rate_limit import (
+    ConcurrencyLimiter, LoadSheddingMiddleware, MemoryBackend, SharedBackend,
+    login_rate_limit, parse_rate, take_token, write_rate_limit,
+)
+
+class LocalSharedClient:
+    """Remplaçant local d'un client Redis : même contrat que TOKEN_BUCKET_SCRIPT, seaux en mémoire."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.calls = []
+
+    async def eval(self, script, numkeys, key, capacity, refill_rate, cost):
+        self.calls.append(key)
+        now = time.time()
+        tokens, updated_at = self.buckets.get(key, (capacity, now))
+        tokens, updated_at, retry_after = take_token(tokens, updated_at, now, capacity, refill_rate, cost)
+        self.buckets[key] = (tokens, updated_at)
+        return str(retry_after)
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_ENABLED", True)
+    for limit in (login_rate_limit, write_rate_limit):
+        monkeypatch.setattr(limit, "backend", MemoryBackend())
+    monkeypatch.setattr(write_rate_limit, "capacity", 2)
+
+class TestTokenBucket:
+    def test_parse_rate(self):
+        assert parse_rate("10/minute") == (10, 10 / 60)
+        assert parse_rate("5/second") == (5, 5)
+        for rate in ("10", "ten/minute", "10/day", "0/minute"):
+            with pytest.raises(ValueError):
+                parse_rate(rate)
+
+    def test_refill_is_capped_at_capacity(self):
+        assert take_token(0, 0, 1000, capacity=3, refill_rate=1) == (2, 1000, 0.0)
+        tokens, _, retry_after = take_token(0.5, 10, 10, capacity=3, refill_rate=0.5)
+        assert tokens == 0.5 and retry_after == 1.0
+
+    def test_memory_backend_rejects_burst(self):
+        backend = MemoryBackend()
+        results = [asyncio.run(backend.take("k", 2, 1 / 60)) for _ in range(3)]
+        assert results[:2] == [0.0, 0.0]
+        assert 59 < results[2] <= 60
+
+    def test_memory_backend_is_bounded(self):
+        backend = MemoryBackend(maxsize=2)
+        for key in ("a", "b", "c"):
+            asyncio.run(backend.take(key, 1, 1))
+        assert list(backend._buckets) == ["b", "c"]
+
+    def test_shared_backend_counts_across_workers(self):
+        client = LocalSharedClient()
+        workers = [SharedBackend(client), SharedBackend(client)]
+        results = [asyncio.run(workers[i % 2].take("login:ip:1.2.3.4", 2, 1 / 60)) for i in range(3)]
+        assert results[2] > 0
+        assert client.calls == ["rate-limit:login:ip:1.2.3.4"] * 3
+
+class TestRateLimitedRoutes:
+    def test_login_returns_429_with_retry_after(self, client, rate_limits):
+        form = {"username": "nobody@example.com", "password": "wrong"}
+        statuses = [client.post("/v1/login/", data=form).status_code for _ in range(login_rate_limit.capacity)]
+        assert set(statuses) == {401}
+        response = client.post("/v1/login/", data=form)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+
+    def test_writes_are_limited_per_user(self, client, create_user, rate_limits):
+        first, second = create_user(), create_user()
+        log = {"fish_name": "Bar", "catch_date": "2024-02-25", "released": True}
+        assert [client.post("/v1/logs/", json=log, headers=first).status_code for _ in range(2)] == [200, 200]
+        assert client.post("/v1/logs/", json=log, headers=first).status_code == 429
+        assert client.post("/v1/logs/", json=log, headers=second).status_code == 200
+
+class TestLoadShedding:
+    def shedding_app(self, limiter):
+        test_app = FastAPI()
+        test_app.add_middleware(LoadSheddingMiddleware, limiter=limiter)
+
+        @test_app.get("/work")
+        def work():
+            return {"in_flight": limiter.in_flight}
+
+        @test_app.get("/healthz")
+        def healthz():
+            return {"status": "ok"}
+
+        return test_app
+
+    def test_sheds_when_saturated(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1)
+        test_client = TestClient(self.shedding_app(limiter))
+        assert test_client.get("/work").json() == {"in_flight": 1}
+        limiter.in_flight = 1  # une requête en cours
+        response = test_client.get("/work")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert test_client.get("/healthz").status_code == 200
+        assert limiter.status() == {"in_flight": 1, "max_concurrent": 1, "rejected": 1}
@@ -0,0 +1,88 @@
+import uuid
+import pytest
+from sqlalchemy import text
+from app.database import Base, SessionLocal
+from app.models.user import User
+from app.utils import replicas
+from app.utils.profile_cache import profile_cache
+from app.utils.replicas import ReplicaSet, recent_writers, wrote_recently
+
+@pytest.fixture
+def stand_ins(tmp_path):
+    """Deux réplicas SQLite vides (schéma seul), distincts de la base principale."""
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path / 'replica1.db'}", f"sqlite:///{tmp_path / 'replica2.db'}"])
+    for replica in replica_set.replicas:
+        Base.metadata.create_all(replica.engine)
+    yield replica_set
+    for replica in replica_set.replicas:
+        replica.engine.dispose()
+
+class TestReplicaSet:
+    def test_round_robin(self, stand_ins):
+        picked = [stand_ins.pick() for _ in range(4)]
+        assert picked == stand_ins.replicas * 2
+
+    def test_unhealthy_replica_is_skipped(self, stand_ins, tmp_path):
+        broken = ReplicaSet([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"]).replicas[0]
+        stand_ins.replicas.insert(0, broken)
+        assert all(stand_ins.pick() is not broken for _ in range(4))
+        assert broken.status() == {"healthy": False, "failures": 1}
+
+    def test_fallback_to_primary(self, tmp_path):
+        broken = ReplicaSet([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+        assert broken.pick() is None
+        assert ReplicaSet([]).pick() is None
+
+    def test_replica_sessions_are_read_only(self, stand_ins):
+        from app.models.log import Log
+        with stand_ins.replicas[0].SessionLocal() as session:
+            assert session.execute(text("SELECT 1")).scalar() == 1
+            session.add(Log(fish_name="Bar", user_id=1))
+            with pytest.raises(RuntimeError):
+                session.flush()
+
+class TestReadRouting:
+    def test_reads_go_to_replica_except_after_own_write(self, client, create_user, create_boat, stand_ins, monkeypatch):
+        monkeypatch.setattr(replicas, "replica_set", stand_ins)
+        headers = create_user()
+        # Le principal est lu sur le primaire ; la liste, vide sur les réplicas
+        assert client.get("/v1/boats/filter", headers=headers).json() == []
+
+        create_boat(headers, name="Replica")
+        assert [boat["name"] for boat in client.get("/v1/boats/filter", headers=headers).json()] == ["Replica"]
+
+        # Fenêtre écoulée : retour sur les réplicas
+        recent_writers.clear()
+        assert client.get("/v1/boats/filter", headers=headers).json() == []
+
+    def test_user_update_records_writer(self, client, create_user):
+        email = f"writer{uuid.uuid4().hex[:8]}@example.com"
+        headers = create_user(email=email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        recent_writers.clear()
+        response = client.put(f"/v1/users/{user_id}", json={"name": "Writer"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert wrote_recently(user_id)
+
+    def test_profile_read_on_replica_is_not_cached(self, client, create_user, stand_ins, monkeypatch):
+        email = f"lag{uuid.uuid4().hex[:8]}@example.com"
+        headers = create_user(email=email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        # Réplicas en retard : ils portent encore l'ancien nom de l'utilisateur
+        for replica in stand_ins.replicas:
+            with replica.engine.begin() as connection:
+                connection.execute(User.__table__.insert().values(
+                    id=user_id, name="Stale", firstname="John", email=email, password="x", status="INDIVIDUAL",
+                ))
+            replica.record_check(True)  # contrôle de santé déjà fait : hors budget de la route
+        monkeypatch.setattr(replicas, "replica_set", stand_ins)
+        recent_writers.clear()
+
+        assert client.get(f"/v1/users/{user_id}/profile", headers=headers).json()["name"] == "Stale"
+        assert not any(key[0] == user_id for key in profile_cache._data)
+        for replica in stand_ins.replicas:
+            with replica.engine.begin() as connection:
+                connection.execute(User.__table__.update().values(name="Fresh"))
+        assert client.get(f"/v1/users/{user_id}/profile", headers=headers).json()["name"] == "Fresh"
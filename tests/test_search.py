@@ -0,0 +1,115 @@
+import uuid
+import pytest
+from app.models.trip import build_search_terms, search_candidates
+from app.utils.search import normalize, tokenize, term_weights, query_terms, MAX_OCCURRENCES, MAX_QUERY_TERMS
+
+TRIP = {
+    "description": "d", "trip_type": "DAILY", "pricing_type": "GLOBAL",
+    "dates": [{"start": "2030-02-10", "end": "2030-02-12"}], "schedules": [{"departure": "06:00:00", "arrival": "12:00:00"}],
+    "nb_passengers": 4,
+}
+class TestTokenizer:
+    def test_normalize_strips_accents(self):
+        assert normalize("Pêche en Mer à Sète") == "peche en mer a sete"
+
+    def test_tokenize_drops_stopwords_and_single_letters(self):
+        assert tokenize("Sortie pêche au thon, à l'aube") == ["sortie", "peche", "thon", "aube"]
+
+    def test_tokenize_none(self):
+        assert tokenize(None) == []
+
+    def test_title_weighs_more(self):
+        weights = term_weights({"title": "Thon rouge", "description": "thon", "practical_info": None})
+        assert weights == {"thon": 4, "rouge": 3}
+
+    def test_occurrences_capped(self):
+        weights = term_weights({"description": "thon " * 10})
+        assert weights["thon"] == MAX_OCCURRENCES
+
+    def test_query_terms_distinct_and_capped(self):
+        assert query_terms("Thon THON thon rouge") == ["thon", "rouge"]
+        assert len(query_terms(" ".join(f"mot{i}" for i in range(20)))) == MAX_QUERY_TERMS
+
+    def test_build_search_terms(self):
+        rows = build_search_terms({"title": "Thon", "description": "bar", "practical_info": ""}, trip_id=5)
+        assert {(row.term, row.trip_id, row.weight) for row in rows} == {("thon", 5, 3), ("bar", 5, 1)}
+
+    def test_candidates_bounded_by_driver(self):
+        sql = str(search_candidates(["thon", "rouge"], "rouge", cap=50).compile(compile_kwargs={"literal_binds": True}))
+        assert "trip_terms_1.term = 'rouge'" in sql
+        assert "ORDER BY trip_terms_1.weight DESC, trip_terms_1.trip_id DESC" in sql
+        assert "LIMIT 50" in sql
+
+    def test_organizer_candidates_unbounded(self):
+        sql = str(search_candidates(["thon"], "thon", organizer_id=7).compile(compile_kwargs={"literal_binds": True}))
+        assert "trips.organizer_id = 7" in sql
+        assert "LIMIT" not in sql
+
+
+@pytest.fixture(scope="module")
+def search_setup(client, create_user, create_boat):
+    # Mots uniques au module : la base de test est partagée avec les autres fichiers
+    word, other = f"w{uuid.uuid4().hex[:8]}", f"x{uuid.uuid4().hex[:8]}"
+    headers = create_user()
+    boat_id = create_boat(headers)["id"]
+    ids = {}
+    for key, title, info, price in [
+        ("title", f"Pêche {word} {other}", "", 100.0),
+        ("info", "Sortie", f"{word.upper()} garanti", 50.0),
+        ("both", f"Sortie {word}", f"{word} garanti", 80.0),
+    ]:
+        trip = client.post("/v1/trips/", json={**TRIP, "title": title, "practical_info": info, "price": price, "boat_id": boat_id}, headers=headers)
+        assert trip.status_code == 200, trip.text
+        ids[key] = trip.json()["id"]
+    return headers, word, other, ids
+
+
+class TestSearchEndpoint:
+    def search(self, client, headers, **params):
+        response = client.get("/v1/trips/search", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        return [trip["id"] for trip in response.json()]
+
+    def test_ranked_by_score(self, client, search_setup):
+        headers, word, _, ids = search_setup
+        assert self.search(client, headers, q=word) == [ids["both"], ids["title"], ids["info"]]
+
+    def test_all_words_required(self, client, search_setup):
+        headers, word, other, ids = search_setup
+        assert self.search(client, headers, q=f"{word} {other}") == [ids["title"]]
+
+    def test_word_order_does_not_change_driver_result(self, client, create_user, search_setup):
+        _, word, other, ids = search_setup
+        admin = create_user(role="admin")
+        assert self.search(client, admin, q=f"{word} {other}") == self.search(client, admin, q=f"{other} {word}") == [ids["title"]]
+
+    def test_filters(self, client, search_setup):
+        headers, word, _, ids = search_setup
+        assert self.search(client, headers, q=word, max_price=90) == [ids["both"], ids["info"]]
+
+    def test_cursor_pagination(self, client, search_setup):
+        headers, word, _, ids = search_setup
+        first = client.get("/v1/trips/search", params={"q": word, "limit": 2}, headers=headers)
+        cursor = first.headers["x-next-cursor"]
+        second = self.search(client, headers, q=word, limit=2, cursor=cursor)
+        assert [trip["id"] for trip in first.json()] + second == [ids["both"], ids["title"], ids["info"]]
+
+    def test_scoped_to_organizer(self, client, create_user, search_setup):
+        _, word, _, ids = search_setup
+        assert self.search(client, create_user(), q=word) == []
+        assert self.search(client, create_user(role="admin"), q=word) == [ids["both"], ids["title"], ids["info"]]
+
+    def test_stopwords_only(self, client, search_setup):
+        headers = search_setup[0]
+        response = client.get("/v1/trips/search", params={"q": "le la de"}, headers=headers)
+        assert response.status_code == 400
+
+    def test_reindexed_on_update_and_delete(self, client, search_setup):
+        headers, word, _, ids = search_setup
+        fresh = f"y{uuid.uuid4().hex[:8]}"
+        response = client.put(f"/v1/trips/{ids['info']}", json={"title": f"Sortie {fresh}"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert self.search(client, headers, q=fresh) == [ids["info"]]
+        assert client.delete(f"/v1/trips/{ids['info']}", headers=headers).status_code == 200
+        assert self.search(client, headers, q=fresh) == []
+        assert ids["info"] not in self.search(client, headers, q=word)
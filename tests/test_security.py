@@ -0,0 +1,53 @@
+import asyncio
+import uuid
+import pytest
+from fastapi import HTTPException
+from app.database import SessionLocal
+from app.models.user import User
+from app.routers import users
+from app.utils import security
+
+class TestPasswordHashing:
+    def test_hash_and_verify(self):
+        hashed = security.hash_password("secret", rounds=4)
+        assert security.verify_password("secret", hashed)
+        assert not security.verify_password("wrong", hashed)
+
+    def test_needs_rehash(self):
+        hashed = security.hash_password("secret", rounds=4)
+        assert security.needs_rehash(hashed) == (security.BCRYPT_ROUNDS != 4)
+        assert not security.needs_rehash(security.hash_password("secret"))
+        assert security.needs_rehash("not-a-bcrypt-hash")
+
+class TestHashPool:
+    def test_full_queue_rejected(self, monkeypatch):
+        monkeypatch.setattr(security, "_pending", security.HASH_POOL_WORKERS + security.HASH_POOL_QUEUE_DEPTH)
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(security.run_in_hash_pool(security.hash_password, "secret", 4))
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+        assert security._pending == security.HASH_POOL_WORKERS + security.HASH_POOL_QUEUE_DEPTH
+
+    def test_full_queue_returns_503(self, client, test_user_data, monkeypatch):
+        monkeypatch.setattr(security, "_pending", security.HASH_POOL_WORKERS + security.HASH_POOL_QUEUE_DEPTH)
+        response = client.post("/v1/users/", json={**test_user_data, "email": f"busy{uuid.uuid4().hex[:8]}@example.com"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    def test_password_update_hashed_in_pool(self, client, create_user, monkeypatch):
+        email = f"rehash{uuid.uuid4().hex[:8]}@example.com"
+        headers = create_user(email=email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        calls = []
+
+        async def spy(password):
+            calls.append(password)
+            return await security.hash_password_async(password)
+
+        monkeypatch.setattr(users, "hash_password_async", spy)
+        response = client.put(f"/v1/users/{user_id}", json={"password": "new-pw-123"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert calls == ["new-pw-123"]
+        response = client.post("/v1/login/", data={"username": email, "password": "new-pw-123"})
+        assert response.status_code == 200
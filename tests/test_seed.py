@@ -0,0 +1,77 @@
+import json
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.user import User
+from app.models.boat import Boat
+from app.models.log import Log
+from app.models.trip import Trip, TripDateRange, TripTerm
+from app.utils import seed
+from app.models.species import Species
+from app.utils.seed import backfill_log_species, bulk_load, chunked, iter_records, prepare_rows, seed_species_catalog
+
+class TestSeedReader:
+    def test_json_array_streamed_in_small_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(seed, "READ_CHUNK_SIZE", 7)
+        records = [{"id": i, "price": 1234.5 * i, "name": "bateau [%d], \"x\"" % i} for i in range(20)]
+        path = tmp_path / "boats.json"
+        path.write_text(json.dumps(records, indent=4), encoding="utf-8")
+        assert list(iter_records(str(path))) == records
+
+    def test_ndjson(self, tmp_path):
+        path = tmp_path / "boats.ndjson"
+        path.write_text('{"id": 1}\n\n{"id": 2}\n', encoding="utf-8")
+        assert list(iter_records(str(path))) == [{"id": 1}, {"id": 2}]
+
+    def test_chunked(self):
+        assert [len(batch) for batch in chunked(range(5), 2)] == [2, 2, 1]
+
+    def test_prepare_rows(self):
+        rows = prepare_rows(Log, [{"id": 1, "catch_date": "2024-02-25T12:00:00", "user_id": 1}])
+        assert rows[0]["catch_date"] == date(2024, 2, 25)
+        boat = prepare_rows(Boat, [{"id": 1, "latitude": 43.2965, "longitude": 5.3698, "trips": []}])[0]
+        assert boat["geohash"].startswith("spey")
+        assert "trips" not in boat
+
+class TestBulkLoad:
+    def test_skips_existing_keys_and_builds_calendar(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        users = [{"id": i, "name": "n", "firstname": "f", "email": f"u{i}@example.com", "password": "x", "status": "INDIVIDUAL"} for i in range(1, 6)]
+        trip = {
+            "id": 1, "title": "Thon", "trip_type": "DAILY", "pricing_type": "GLOBAL", "nb_passengers": 2, "price": 10.0,
+            "dates": ["2024-03-01", "2024-03-05"], "schedules": ["08:00", "18:00"], "organizer_id": 1, "boat_id": 1,
+        }
+        with Session(engine) as db:
+            report = bulk_load(db, User, iter(users[:3]), batch_size=2)
+            assert report["inserted"] == 3
+            report = bulk_load(db, User, iter(users), batch_size=2)
+            assert (report["inserted"], report["skipped"]) == (2, 3)
+            assert db.query(User).count() == 5
+
+            bulk_load(db, Boat, iter([{"id": 1, "owner_id": 1}]))
+            bulk_load(db, Trip, iter([trip]))
+            ranges = db.query(TripDateRange).all()
+            assert [(r.trip_id, r.start, r.end) for r in ranges] == [(1, date(2024, 3, 1), date(2024, 3, 5))]
+            assert [(t.trip_id, t.term, t.weight) for t in db.query(TripTerm).all()] == [(1, "thon", 3)]
+
+    def test_species_catalog_and_log_backfill(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        logs = [
+            {"id": i, "fish_name": name, "catch_date": "2024-02-25", "user_id": 1}
+            for i, name in enumerate(["Bar", "loup ", "Saumon  atlantique", "?"], start=1)
+        ]
+        with Session(engine) as db:
+            seed_species_catalog(db)
+            seed_species_catalog(db)
+            catalog_size = db.query(Species).count()
+            bulk_load(db, User, iter([{"id": 1, "name": "n", "firstname": "f", "email": "u@example.com", "password": "x", "status": "INDIVIDUAL"}]))
+            bulk_load(db, Log, iter(logs))
+            backfill_log_species(db)
+            rows = [(log.fish_name, log.species_id is not None) for log in db.query(Log).order_by(Log.id)]
+            assert rows == [("Bar", True), ("Bar", True), ("Saumon atlantique", True), ("?", False)]
+            assert db.query(Species).count() == catalog_size + 1
+            # Catalogue initial validé ; l'espèce ajoutée depuis un carnet ne l'est pas
+            assert db.query(Species).filter(Species.curated).count() == catalog_size
@@ -0,0 +1,51 @@
+import json
+from datetime import date
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from app.utils import serialization
+from app.models.log import Log
+from app.models.trip import Trip
+from app.models.enum import PricingTypeEnum, TripTypeEnum
+from app.schemas.log import LogResponse
+from app.schemas.trip import TripResponse
+from app.utils.serialization import FastJSONResponse, dump_json, get_adapter, json_response
+
+def make_trip(id):
+    return Trip(
+        id=id, title="T", trip_type=TripTypeEnum.DAILY, pricing_type=PricingTypeEnum.GLOBAL,
+        dates=[{"start": "2030-02-10", "end": "2030-02-12"}], schedules=[{"departure": "06:00:00", "arrival": "12:00:00"}],
+        nb_passengers=4, price=100.0, boat_id=1, organizer_id=1,
+    )
+
+class TestSerialization:
+    def test_adapter_is_compiled_once(self):
+        assert get_adapter(LogResponse) is get_adapter(LogResponse)
+        assert get_adapter(LogResponse, False) is not get_adapter(LogResponse)
+
+    def test_dump_json_matches_schema(self):
+        data = json.loads(dump_json([make_trip(1), make_trip(2)], TripResponse))
+        assert [trip["id"] for trip in data] == [1, 2]
+        assert data[0]["dates"] == [{"start": "2030-02-10", "end": "2030-02-12"}]
+        assert data[0]["trip_type"] == "DAILY"
+        assert json.loads(dump_json(make_trip(3), TripResponse)) == TripResponse.model_validate(make_trip(3)).model_dump(mode="json")
+
+    def test_json_response_keeps_headers(self):
+        injected = Response()
+        injected.headers["X-Next-Cursor"] = "abc"
+        log = Log(id=1, fish_name="Bar", catch_date=date(2024, 2, 25), released=False, user_id=1)
+        response = json_response([log], LogResponse, injected)
+        assert response.headers["x-next-cursor"] == "abc"
+        assert json.loads(response.body)[0]["catch_date"] == "2024-02-25"
+
+    def test_default_response_class(self):
+        assert json.loads(FastJSONResponse({"message": "ok", "count": 1}).body) == {"message": "ok", "count": 1}
+
+    def test_fast_path_is_opt_in(self, monkeypatch):
+        trips = [make_trip(1), make_trip(2)]
+        monkeypatch.setattr(serialization, "FAST_SERIALIZATION", False)
+        legacy = json_response(trips, TripResponse)
+        assert isinstance(legacy, JSONResponse)
+        monkeypatch.setattr(serialization, "FAST_SERIALIZATION", True)
+        fast = json_response(trips, TripResponse)
+        assert not isinstance(fast, JSONResponse)
+        assert json.loads(fast.body) == json.loads(legacy.body)
@@ -0,0 +1,65 @@
+import json
+import pytest
+from sqlalchemy import create_engine, text
+from app.utils.slow_queries import SlowQueryLog, redact_parameters, slow_query_log
+
+@pytest.fixture
+def recording():
+    # Seuil à 0 : toutes les requêtes sont enregistrées le temps du test
+    threshold = slow_query_log.threshold_ms
+    slow_query_log.threshold_ms = 0
+    slow_query_log.clear()
+    try:
+        yield slow_query_log
+    finally:
+        slow_query_log.threshold_ms = threshold
+        slow_query_log.wait(5)
+        slow_query_log.clear()
+
+class TestRedaction:
+    def test_strings_are_masked(self):
+        assert redact_parameters(("%bar%", 3, None, True)) == ["<str>", 3, None, True]
+        assert redact_parameters({"email": "a@b.c", "limit": 10}) == {"email": "<str>", "limit": 10}
+
+class TestSlowQueryLog:
+    def test_records_plan_and_ndjson(self, tmp_path):
+        db_engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+        log = SlowQueryLog(threshold_ms=0, maxsize=2, log_file=str(tmp_path / "slow.ndjson"))
+        log.install(db_engine)
+        with db_engine.begin() as connection:
+            connection.execute(text("CREATE TABLE fish (id INTEGER PRIMARY KEY, name TEXT)"))
+            connection.execute(text("SELECT * FROM fish WHERE name LIKE :name"), {"name": "%bar%"})
+        log.wait(5)
+        entries = log.entries()
+        # Tampon borné ; l'EXPLAIN lui-même n'est pas enregistré
+        assert log.recorded == 2
+        assert len(entries) == 2
+        select = entries[0]
+        assert select["statement"].startswith("SELECT")
+        assert select["parameters"] == ["<str>"]
+        assert select["route"] is None
+        assert select["plan"] and "fish" in select["plan"][0]["detail"]
+        assert entries[1]["plan"] is None  # CREATE TABLE : pas de plan
+        lines = [json.loads(line) for line in (tmp_path / "slow.ndjson").read_text().splitlines()]
+        assert sorted(line["statement"].split()[0] for line in lines) == ["CREATE", "SELECT"]
+        log.shutdown()
+        db_engine.dispose()
+
+class TestSlowQueriesEndpoint:
+    def test_requires_admin(self, client, create_user):
+        response = client.get("/v1/admin/slow-queries", headers=create_user())
+        assert response.status_code == 403
+
+    def test_entries_carry_route(self, client, create_user, recording):
+        admin_headers = create_user(role="admin")
+        assert client.get("/v1/logs/filter", params={"fish_name": "bar"}, headers=admin_headers).status_code == 200
+        recording.wait(5)
+        response = client.get("/v1/admin/slow-queries", headers=admin_headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["threshold_ms"] == 0
+        logs_entries = [entry for entry in body["entries"] if entry["route"] == "/v1/logs/filter"]
+        assert logs_entries
+        select = next(entry for entry in logs_entries if "fish_name" in entry["statement"])
+        assert "<str>" in select["parameters"]
+        assert select["plan"] is not None
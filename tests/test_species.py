@@ -0,0 +1,167 @@
+import uuid
+import pytest
+from app.models.species import build_species, species_index
+from app.utils.species import SpeciesIndex, display_name, species_key
+
+def log_data(fish_name):
+    return {"fish_name": fish_name, "catch_date": "2024-02-25", "released": True}
+
+class TestSpeciesKey:
+    def test_case_accents_and_spacing(self):
+        assert species_key("  Loup de  MER ") == "loup de mer"
+        assert species_key("Mérou-brun") == "merou brun"
+
+    def test_no_word(self):
+        assert species_key("?!") == ""
+
+    def test_display_name(self):
+        assert display_name("  saumon   atlantique ") == "Saumon atlantique"
+
+    def test_build_species_dedupes_aliases(self):
+        species = build_species("Bar", "Dicentrarchus labrax", ["Loup", "loup ", "BAR"])
+        assert [(alias.key, alias.name) for alias in species.aliases] == [("bar", "Bar"), ("loup", "Loup")]
+
+class TestSpeciesIndex:
+    ROWS = [
+        ("thon rouge", "Thon rouge", 1, "Thon rouge"),
+        ("thon", "Thon", 1, "Thon rouge"),
+        ("bar", "Bar", 2, "Bar"),
+        ("loup de mer", "Loup de mer", 2, "Bar"),
+        ("rouget", "Rouget", 3, "Rouget"),
+    ]
+
+    def index(self):
+        index = SpeciesIndex()
+        index.build(self.ROWS)
+        return index
+
+    def test_prefix_one_entry_per_species(self):
+        assert self.index().complete("THO") == [{"id": 1, "name": "Thon rouge", "alias": "Thon"}]
+
+    def test_matches_inner_words(self):
+        assert [item["id"] for item in self.index().complete("rou")] == [1, 3]
+        assert self.index().complete("mer") == [{"id": 2, "name": "Bar", "alias": "Loup de mer"}]
+
+    def test_limit_and_empty_prefix(self):
+        assert len(self.index().complete("r", limit=1)) == 1
+        assert self.index().complete("--") == []
+
+    def test_refresh_after_invalidate(self):
+        calls = []
+        index = SpeciesIndex(loader=lambda db: calls.append(db) or self.ROWS, ttl=3600)
+        index.refresh("db")
+        index.refresh("db")
+        assert len(calls) == 1
+        index.invalidate()
+        index.refresh("db")
+        assert len(calls) == 2
+
+    def test_invalidated_while_loading_stays_stale(self):
+        index = SpeciesIndex(ttl=3600)
+        index.loader = lambda db: index.invalidate() or self.ROWS
+        index.refresh(None)
+        index.loader = lambda db: self.ROWS
+        index.refresh(None)
+        assert index.refreshes == 2
+
+
+@pytest.fixture(scope="module")
+def admin_headers(create_user):
+    return create_user(role="admin")
+
+@pytest.fixture
+def tag():
+    # Mot unique au test : la base de test est partagée avec les autres fichiers
+    return f"q{uuid.uuid4().hex[:8]}"
+
+class TestSpeciesEndpoints:
+    def test_create_requires_admin(self, client, create_user):
+        response = client.post("/v1/species/", json={"name": "Interdit"}, headers=create_user())
+        assert response.status_code == 403
+
+    def test_create_and_autocomplete(self, client, admin_headers, tag):
+        response = client.post("/v1/species/", json={
+            "name": f"Sole {tag}", "scientific_name": "Solea solea", "aliases": [f"Perdrix {tag}"],
+        }, headers=admin_headers)
+        assert response.status_code == 201, response.text
+        species = response.json()
+        assert species["aliases"] == [f"Perdrix {tag}"]
+
+        suggestions = client.get("/v1/species/autocomplete", params={"prefix": tag[:6]}, headers=admin_headers).json()
+        assert [item["id"] for item in suggestions] == [species["id"]]
+        suggestions = client.get("/v1/species/autocomplete", params={"prefix": f"perdrix {tag}"}, headers=admin_headers).json()
+        assert suggestions == [{"id": species["id"], "name": f"Sole {tag}", "alias": f"Perdrix {tag}"}]
+
+    def test_duplicate_name_conflicts(self, client, admin_headers, tag):
+        assert client.post("/v1/species/", json={"name": f"Raie {tag}"}, headers=admin_headers).status_code == 201
+        response = client.post("/v1/species/", json={"name": f"RAIE  {tag}"}, headers=admin_headers)
+        assert response.status_code == 409
+
+    def test_get_species(self, client, create_user, admin_headers, tag):
+        created = client.post("/v1/species/", json={"name": f"Vive {tag}"}, headers=admin_headers).json()
+        response = client.get(f"/v1/species/{created['id']}", headers=create_user())
+        assert response.status_code == 200
+        assert response.json()["name"] == f"Vive {tag}"
+        assert client.get("/v1/species/999999", headers=admin_headers).status_code == 404
+
+class TestLogSpecies:
+    def test_log_resolved_to_canonical_name(self, client, create_user, admin_headers, tag):
+        species = client.post("/v1/species/", json={"name": f"Bar {tag}", "aliases": [f"Loup {tag}"]}, headers=admin_headers).json()
+        headers = create_user()
+        response = client.post("/v1/logs/", json=log_data(f"  loup {tag.upper()} "), headers=headers)
+        assert response.status_code == 200, response.text
+        assert (response.json()["fish_name"], response.json()["species_id"]) == (f"Bar {tag}", species["id"])
+
+        for name in (f"bar {tag}", f"LOUP {tag}"):
+            logs = client.get("/v1/logs/filter", params={"fish_name": name}, headers=headers).json()
+            assert [log["id"] for log in logs] == [response.json()["id"]]
+        logs = client.get("/v1/logs/filter", params={"species_id": species["id"]}, headers=headers).json()
+        assert len(logs) == 1
+
+    def test_unknown_name_kept_private(self, client, create_user, admin_headers, tag):
+        headers = create_user()
+        response = client.post("/v1/logs/", json=log_data(f"sériole {tag}"), headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["fish_name"] == f"Sériole {tag}"
+        species_id = response.json()["species_id"]
+        # Espèce non validée : ni suggérée ni visible des autres utilisateurs
+        for user_headers in (headers, create_user()):
+            assert client.get("/v1/species/autocomplete", params={"prefix": tag}, headers=user_headers).json() == []
+            assert client.get(f"/v1/species/{species_id}", headers=user_headers).status_code == 404
+        assert client.get(f"/v1/species/{species_id}", headers=admin_headers).status_code == 200
+
+    def test_invalid_fish_name(self, client, create_user):
+        response = client.post("/v1/logs/", json=log_data("?!"), headers=create_user())
+        assert response.status_code == 400
+
+    def test_update_resolves_species(self, client, create_user, tag):
+        headers = create_user()
+        log = client.post("/v1/logs/", json=log_data(f"Dorade {tag}"), headers=headers).json()
+        response = client.put(f"/v1/logs/{log['id']}", json={"fish_name": f"Pagre {tag}"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["species_id"] != log["species_id"]
+
+    def test_alias_merges_species(self, client, create_user, admin_headers, tag):
+        headers = create_user()
+        target = client.post("/v1/species/", json={"name": f"Mulet {tag}"}, headers=admin_headers).json()
+        # Espèce ajoutée depuis un carnet sous un nom local
+        log = client.post("/v1/logs/", json=log_data(f"Muge {tag}"), headers=headers).json()
+        assert log["species_id"] != target["id"]
+
+        response = client.post(f"/v1/species/{target['id']}/aliases", json={"name": f"muge {tag}"}, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["aliases"] == [f"Muge {tag}"]
+        merged = client.get(f"/v1/logs/{log['id']}", headers=headers).json()
+        assert (merged["fish_name"], merged["species_id"]) == (f"Mulet {tag}", target["id"])
+        suggestions = client.get("/v1/species/autocomplete", params={"prefix": f"muge {tag}"}, headers=headers).json()
+        assert [item["id"] for item in suggestions] == [target["id"]]
+        assert client.get(f"/v1/species/{log['species_id']}", headers=admin_headers).status_code == 404
+
+    def test_index_reloaded_once_per_change(self, client, admin_headers, tag):
+        client.get("/v1/species/autocomplete", params={"prefix": "a"}, headers=admin_headers)
+        refreshes = species_index.refreshes
+        client.get("/v1/species/autocomplete", params={"prefix": "b"}, headers=admin_headers)
+        assert species_index.refreshes == refreshes
+        client.post("/v1/species/", json={"name": f"Sar {tag}"}, headers=admin_headers)
+        client.get("/v1/species/autocomplete", params={"prefix": "c"}, headers=admin_headers)
+        assert species_index.refreshes == refreshes + 1
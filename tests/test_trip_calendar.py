@@ -0,0 +1,24 @@
+from datetime import date, time
+from app.models.trip import build_date_ranges, build_schedule_slots
+from app.schemas.trip import TripDate, TripSchedule
+
+class TestTripCalendarRows:
+    def test_date_ranges_from_schema(self):
+        rows = build_date_ranges([TripDate(start="2025-02-10", end="2025-02-12")], trip_id=3)
+        assert len(rows) == 1
+        assert rows[0].trip_id == 3
+        assert (rows[0].start, rows[0].end) == (date(2025, 2, 10), date(2025, 2, 12))
+
+    def test_date_ranges_from_json(self):
+        rows = build_date_ranges([{"start": "2025-02-10", "end": "2025-02-12"}, {"start": "2025-03-01", "end": "2025-03-02"}])
+        assert [row.start for row in rows] == [date(2025, 2, 10), date(2025, 3, 1)]
+
+    def test_legacy_flat_format(self):
+        rows = build_date_ranges(["2024-03-01", "2024-03-05"])
+        assert (rows[0].start, rows[0].end) == (date(2024, 3, 1), date(2024, 3, 5))
+        slots = build_schedule_slots(["08:00", "18:00"])
+        assert (slots[0].departure, slots[0].arrival) == (time(8, 0), time(18, 0))
+
+    def test_schedule_slots_from_schema(self):
+        slots = build_schedule_slots([TripSchedule(departure="06:00:00", arrival="12:00:00")], trip_id=1)
+        assert slots[0].departure == time(6, 0)